@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import sys
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
@@ -12,6 +13,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", "dev-secret-key")
 DEBUG = os.getenv("DJANGO_DEBUG", "false").lower() == "true"
+TESTING = sys.argv[1:2] == ["test"]
 
 ALLOWED_HOSTS = [h.strip() for h in os.getenv("DJANGO_ALLOWED_HOSTS", "*").split(",") if h.strip()]
 
@@ -27,6 +29,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "permitpulse.middleware.RequestLatencyMiddleware",
+    "permitpulse.middleware.ProfilingMiddleware",
+    "permitpulse.middleware.QueryMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -34,6 +39,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "permitpulse.middleware.PrimaryPinningMiddleware",
     "permitpulse.middleware.OrganizationResolverMiddleware",
 ]
 
@@ -58,16 +64,22 @@ WSGI_APPLICATION = "config.wsgi.application"
 ASGI_APPLICATION = "config.asgi.application"
 
 
-def _database_config() -> dict:
-    database_url = os.getenv("SUPABASE_DB_URL") or os.getenv("DATABASE_URL")
-    if not database_url:
-        return {
-            "default": {
-                "ENGINE": "django.db.backends.sqlite3",
-                "NAME": BASE_DIR / "db.sqlite3",
-            }
-        }
+def _pooler_mode(parsed, query: dict) -> str:
+    """Returns "transaction", "session" or "" for the PgBouncer pool mode behind a URL."""
+    explicit = os.getenv("DB_POOLER_MODE", "").lower()
+    if explicit in {"transaction", "session"}:
+        return explicit
+    if explicit == "none":
+        return ""
+    if (query.get("pgbouncer") or [""])[0].lower() == "true":
+        return "transaction"
+    if (parsed.hostname or "").endswith(".pooler.supabase.com"):
+        # Supavisor serves transaction mode on 6543 and session mode on 5432.
+        return "transaction" if parsed.port == 6543 else "session"
+    return ""
 
+
+def _database_from_url(database_url: str) -> dict:
     parsed = urlparse(database_url)
     engine = "django.db.backends.postgresql"
     if parsed.scheme.startswith("sqlite"):
@@ -84,10 +96,8 @@ def _database_config() -> dict:
         else:
             db_name = raw_path
         return {
-            "default": {
-                "ENGINE": engine,
-                "NAME": db_name,
-            }
+            "ENGINE": engine,
+            "NAME": db_name,
         }
 
     query = parse_qs(parsed.query)
@@ -99,21 +109,58 @@ def _database_config() -> dict:
         options["sslmode"] = "require"
 
     config = {
-        "default": {
-            "ENGINE": engine,
-            "NAME": parsed.path.lstrip("/"),
-            "USER": parsed.username,
-            "PASSWORD": parsed.password,
-            "HOST": parsed.hostname,
-            "PORT": parsed.port or 5432,
-        }
+        "ENGINE": engine,
+        "NAME": parsed.path.lstrip("/"),
+        "USER": parsed.username,
+        "PASSWORD": parsed.password,
+        "HOST": parsed.hostname,
+        "PORT": parsed.port or 5432,
+        # Persistent connections skip the TLS handshake to the pooler on every request;
+        # health checks drop connections the pooler closed while the function was idle.
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "true").lower() == "true",
     }
+    if _pooler_mode(parsed, query) == "transaction":
+        # PgBouncer in transaction mode hands each transaction to a different server connection,
+        # so named cursors and prepared statements cannot outlive a single transaction.
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+        options["prepare_threshold"] = None
+        options["server_side_binding"] = False
     if options:
-        config["default"]["OPTIONS"] = options
+        config["OPTIONS"] = options
+    return config
+
+
+def _database_config() -> dict:
+    database_url = os.getenv("SUPABASE_DB_URL") or os.getenv("DATABASE_URL")
+    if database_url:
+        config = {"default": _database_from_url(database_url)}
+    else:
+        config = {
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": BASE_DIR / "db.sqlite3",
+            }
+        }
+
+    replica_url = os.getenv("SUPABASE_DB_REPLICA_URL") or os.getenv("DATABASE_REPLICA_URL")
+    if replica_url:
+        replica = _database_from_url(replica_url)
+    elif TESTING:
+        # Tests always get a replica alias, so replica routing runs against a real second connection.
+        replica = dict(config["default"])
+    else:
+        return config
+    # The replica is read-only: tests read through the primary instead of building a second database.
+    replica["TEST"] = {"MIRROR": "default"}
+    config["replica"] = replica
     return config
 
 
 DATABASES = _database_config()
+DATABASE_ROUTERS = ["permitpulse.db_router.ReadReplicaRouter"]
+# Seconds a client keeps reading from the primary after a write (read-your-writes across requests).
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "15"))
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -130,6 +177,19 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Fetched city documents are archived compressed under their content hash. The backend can be any Django
+# storage (e.g. storages.backends.s3.S3Storage); RAW_ARCHIVE_LOCATION is its directory or key prefix.
+RAW_ARCHIVE_LOCATION = os.getenv("RAW_ARCHIVE_LOCATION") or str(BASE_DIR / "raw_archive")
+RAW_ARCHIVE_CODEC = os.getenv("RAW_ARCHIVE_CODEC", "zstd")
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "raw_documents": {
+        "BACKEND": os.getenv("RAW_ARCHIVE_STORAGE_BACKEND", "django.core.files.storage.FileSystemStorage"),
+        "OPTIONS": {"location": RAW_ARCHIVE_LOCATION},
+    },
+}
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
@@ -138,13 +198,90 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.BasicAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
+    "DEFAULT_RENDERER_CLASSES": [
+        "permitpulse.fast_json.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "permitpulse.fast_json.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
-PERMITPULSE_CITY_CODES = ["NYC", "LA", "SF"]
+# Cities and their sources live in the City/CitySource tables (Django admin). Sources are fetched on shared
+# pools of CITY_FETCH_MAX_WORKERS threads, at most CITY_FETCH_PER_HOST_LIMIT at a time per host; ingestion
+# runs download up to CITY_FETCH_PREFETCH cities ahead of the one being parsed.
+CITY_REGISTRY_CACHE_SECONDS = float(os.getenv("CITY_REGISTRY_CACHE_SECONDS", "60"))
+CITY_FETCH_MAX_WORKERS = int(os.getenv("CITY_FETCH_MAX_WORKERS", "32"))
+CITY_FETCH_PER_HOST_LIMIT = int(os.getenv("CITY_FETCH_PER_HOST_LIMIT", "4"))
+CITY_FETCH_PREFETCH = int(os.getenv("CITY_FETCH_PREFETCH", "8"))
+CITY_FETCH_TIMEOUT_SECONDS = float(os.getenv("CITY_FETCH_TIMEOUT_SECONDS", "15"))
+# Larger responses are abandoned mid-download and the ingest is reported as "oversized".
+CITY_FETCH_MAX_BYTES = int(os.getenv("CITY_FETCH_MAX_BYTES", str(10 * 1024 * 1024)))
+# Circuit breakers per city host and for OpenAI: CIRCUIT_FAILURE_THRESHOLD consecutive timeouts/5xx open the
+# circuit, calls fail fast for CIRCUIT_OPEN_SECONDS, then a single probe decides whether it closes again.
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_OPEN_SECONDS = int(os.getenv("CIRCUIT_OPEN_SECONDS", "600"))
+CIRCUIT_PROBE_TIMEOUT_SECONDS = int(os.getenv("CIRCUIT_PROBE_TIMEOUT_SECONDS", "120"))
 PERMITPULSE_CONFIDENCE_THRESHOLD = float(os.getenv("PERMITPULSE_CONFIDENCE_THRESHOLD", "0.8"))
+# New AddressChecks store clause references instead of copies of the clause text.
+PERMITPULSE_COMPACT_EVIDENCE = os.getenv("PERMITPULSE_COMPACT_EVIDENCE", "true").lower() == "true"
+CLAUSE_CACHE_MAX_ENTRIES = int(os.getenv("CLAUSE_CACHE_MAX_ENTRIES", "50000"))
+# HTML-to-text backend for rule parsing: auto (selectolax, then lxml, when installed), selectolax, lxml or stdlib.
+# All produce the same text, so switching does not change snapshot checksums.
+HTML_NORMALIZER_BACKEND = os.getenv("HTML_NORMALIZER_BACKEND", "auto")
+# Rule-based extraction: a JSON registry of clause templates and the phrases that trigger them, matched in one
+# pass. Each clause keeps the offsets and sentences of its first RULE_EVIDENCE_PER_CLAUSE matches as evidence.
+RULE_PATTERNS_FILE = os.getenv("RULE_PATTERNS_FILE") or str(BASE_DIR / "permitpulse" / "parsers" / "rule_patterns.json")
+RULE_EVIDENCE_PER_CLAUSE = int(os.getenv("RULE_EVIDENCE_PER_CLAUSE", "3"))
+# Pages whose text is at least this similar (estimated Jaccard over word shingles) to the active snapshot's, with
+# the same numbers and rule-matched sentences, are treated as cosmetic edits: nothing is extracted or published.
+# 0 disables the check.
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.99"))
 AUTONOMY_TARGET_AVAILABILITY = float(os.getenv("AUTONOMY_TARGET_AVAILABILITY", "99.9"))
 AUTONOMY_TARGET_AUTO_RECOVERY = float(os.getenv("AUTONOMY_TARGET_AUTO_RECOVERY", "95"))
 CRON_SHARED_SECRET = os.getenv("CRON_SHARED_SECRET", "")
+# Per-city ingestion scheduling: each city is checked SCHEDULER_CHECKS_PER_CHANGE times per interval between
+# the rule changes seen over SCHEDULER_HISTORY_DAYS, within [MIN, MAX]. Failed ingests retry after
+# SCHEDULER_RETRY_BASE_SECONDS, doubling per consecutive failure. Maintenance cycles are SCHEDULER_CYCLE_SECONDS
+# long, aligned to the epoch (keep it at or under the minimum interval and run the cron at least once per cycle);
+# each ingests the cities due before the next one, at most SCHEDULER_MAX_CITIES_PER_CYCLE (0 = all).
+SCHEDULER_HISTORY_DAYS = int(os.getenv("SCHEDULER_HISTORY_DAYS", "90"))
+SCHEDULER_CHECKS_PER_CHANGE = float(os.getenv("SCHEDULER_CHECKS_PER_CHANGE", "4"))
+SCHEDULER_MIN_INTERVAL_SECONDS = int(os.getenv("SCHEDULER_MIN_INTERVAL_SECONDS", "21600"))
+SCHEDULER_MAX_INTERVAL_SECONDS = int(os.getenv("SCHEDULER_MAX_INTERVAL_SECONDS", "604800"))
+SCHEDULER_RETRY_BASE_SECONDS = int(os.getenv("SCHEDULER_RETRY_BASE_SECONDS", "900"))
+SCHEDULER_CYCLE_SECONDS = int(os.getenv("SCHEDULER_CYCLE_SECONDS", "3600"))
+SCHEDULER_MAX_CITIES_PER_CYCLE = int(os.getenv("SCHEDULER_MAX_CITIES_PER_CYCLE", "0"))
+# Maintenance stops starting new work once this many seconds have passed (keep it under the function
+# timeout); the next cron invocation resumes from the checkpoint. A city whose ingest was cut off this many
+# times is marked TIMED_OUT for the cycle.
+MAINTENANCE_TIME_BUDGET_SECONDS = float(os.getenv("MAINTENANCE_TIME_BUDGET_SECONDS", "45"))
+MAINTENANCE_CITY_MAX_ATTEMPTS = int(os.getenv("MAINTENANCE_CITY_MAX_ATTEMPTS", "2"))
+MAINTENANCE_LEASE_GRACE_SECONDS = int(os.getenv("MAINTENANCE_LEASE_GRACE_SECONDS", "60"))
+# With the job queue enabled, alert fan-out and portfolio imports are queued for `manage.py run_workers`
+# instead of running inside the request or ingestion that triggered them.
+JOB_QUEUE_ENABLED = os.getenv("JOB_QUEUE_ENABLED", "false").lower() == "true"
+JOB_RETRY_BASE_SECONDS = int(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+JOB_RETRY_MAX_SECONDS = int(os.getenv("JOB_RETRY_MAX_SECONDS", "3600"))
+# Running jobs locked for longer than this are assumed orphaned by a dead worker and queued again.
+JOB_LOCK_TIMEOUT_SECONDS = int(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", "3600"))
+LATENCY_METRICS_ENABLED = os.getenv("LATENCY_METRICS_ENABLED", "true").lower() == "true"
+LATENCY_FLUSH_INTERVAL_SECONDS = int(os.getenv("LATENCY_FLUSH_INTERVAL_SECONDS", "60"))
+LATENCY_TARGET_P95_MS = float(os.getenv("LATENCY_TARGET_P95_MS", "750"))
+QUERY_METRICS_ENABLED = os.getenv("QUERY_METRICS_ENABLED", "true").lower() == "true"
+# Profiling is off unless enabled; then a PROFILING_SAMPLE_RATE fraction of requests, or requests carrying
+# X-Profile-Token: <PROFILING_TOKEN>, are profiled. The token also guards the profile download endpoints.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+QUERY_METRICS_HEADERS = (os.getenv("QUERY_METRICS_HEADERS") or str(DEBUG)).lower() == "true"
+
+# Tracing: none | console | file | otlp (otlp also reads the standard OTEL_EXPORTER_OTLP_* variables).
+OTEL_TRACES_EXPORTER = os.getenv("OTEL_TRACES_EXPORTER", "none")
+OTEL_TRACES_FILE = os.getenv("OTEL_TRACES_FILE") or str(BASE_DIR / "traces.jsonl")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "permitpulse-api")
 
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY", "")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
@@ -156,6 +293,17 @@ STRIPE_PRICE_IDS = {
 
 FRONTEND_ORIGIN = os.getenv("FRONTEND_ORIGIN", "http://localhost:3000")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# Per-process limits for LLM extraction (set them to the account's limits divided by the number of processes).
+# Callers queue for up to OPENAI_MAX_QUEUE_SECONDS; a 429 is retried OPENAI_MAX_RETRIES times after its
+# Retry-After, or exponential backoff from OPENAI_RETRY_BASE_SECONDS. Only a call still throttled after its last retry
+# counts against the openai circuit.
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000"))
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "4"))
+OPENAI_MAX_QUEUE_SECONDS = float(os.getenv("OPENAI_MAX_QUEUE_SECONDS", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+OPENAI_RETRY_BASE_SECONDS = float(os.getenv("OPENAI_RETRY_BASE_SECONDS", "2"))
+OPENAI_RETRY_MAX_SECONDS = float(os.getenv("OPENAI_RETRY_MAX_SECONDS", "60"))
 SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL", "")
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY", "")
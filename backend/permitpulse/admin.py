@@ -8,19 +8,55 @@ class OrganizationAdmin(admin.ModelAdmin):
     list_display = ("slug", "plan", "billing_email", "created_at")
 
 
+class CitySourceInline(admin.TabularInline):
+    model = models.CitySource
+    extra = 1
+
+
+@admin.register(models.City)
+class CityAdmin(admin.ModelAdmin):
+    list_display = ("code", "name", "is_active")
+    list_filter = ("is_active",)
+    inlines = [CitySourceInline]
+
+
+@admin.register(models.CircuitBreaker)
+class CircuitBreakerAdmin(admin.ModelAdmin):
+    list_display = ("name", "state", "consecutive_failures", "opened_at", "retry_at")
+    list_filter = ("state",)
+
+
 @admin.register(models.RuleSnapshot)
 class RuleSnapshotAdmin(admin.ModelAdmin):
     list_display = ("city_code", "version", "status", "validation_score", "is_active")
     list_filter = ("city_code", "status", "is_active")
 
 
+@admin.register(models.RawDocument)
+class RawDocumentAdmin(admin.ModelAdmin):
+    list_display = ("content_hash", "city_code", "codec", "raw_size", "compressed_size", "last_fetched_at")
+    list_filter = ("city_code", "codec")
+
+
 @admin.register(models.AddressCheck)
 class AddressCheckAdmin(admin.ModelAdmin):
     list_display = ("id", "city_code", "result_grade", "decision_mode", "confidence", "created_at")
     list_filter = ("city_code", "result_grade", "decision_mode")
 
 
-admin.site.register(models.RuleClause)
+@admin.register(models.RuleClause)
+class RuleClauseAdmin(admin.ModelAdmin):
+    list_display = ("clause_id", "snapshot", "body", "confidence")
+    list_select_related = ("snapshot", "body")
+    raw_id_fields = ("snapshot", "body")
+
+
+@admin.register(models.ClauseBody)
+class ClauseBodyAdmin(admin.ModelAdmin):
+    list_display = ("content_hash", "category", "created_at")
+    search_fields = ("content_hash", "requirement_text")
+
+
 admin.site.register(models.DecisionTrace)
 admin.site.register(models.PortfolioImport)
 admin.site.register(models.Alert)
@@ -29,3 +65,10 @@ admin.site.register(models.AutonomyEvent)
 admin.site.register(models.RollbackEvent)
 admin.site.register(models.CustomerPolicyAction)
 admin.site.register(models.SLOMetric)
+admin.site.register(models.EndpointLatencyRollup)
+
+
+@admin.register(models.ProfileRecord)
+class ProfileRecordAdmin(admin.ModelAdmin):
+    list_display = ("request_id", "kind", "label", "duration_ms", "created_at")
+    exclude = ("data",)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class PermitpulseConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "permitpulse"
+
+    def ready(self):
+        from permitpulse import tasks  # noqa: F401  (registers job handlers)
+        from permitpulse.tracing import configure_tracing
+
+        configure_tracing()
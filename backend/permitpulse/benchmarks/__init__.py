@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from permitpulse.benchmarks import (
+    db_connections,
+    decision,
+    html_normalize,
+    json_render,
+    latency_middleware,
+    rule_parser,
+    slo,
+)
+from permitpulse.benchmarks.harness import BenchmarkResult
+
+# Each suite runs as suite(iterations, scale=...); `scale` multiplies the size of the seeded dataset.
+SUITES: dict[str, Callable[..., list[BenchmarkResult]]] = {
+    db_connections.SUITE: db_connections.run,
+    json_render.SUITE: json_render.run,
+    latency_middleware.SUITE: latency_middleware.run,
+    decision.SUITE: decision.run,
+    html_normalize.SUITE: html_normalize.run,
+    rule_parser.SUITE: rule_parser.run,
+    slo.SUITE: slo.run,
+}
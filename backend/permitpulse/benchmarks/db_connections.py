@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core import signals
+from django.db import connection
+
+from permitpulse.benchmarks.harness import BenchmarkResult, measure
+
+SUITE = "db_connections"
+
+
+def _simulated_request() -> None:
+    # Mirrors the request lifecycle: close_old_connections runs on both signals,
+    # which is where CONN_MAX_AGE decides whether the connection survives.
+    signals.request_started.send(sender=None)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    signals.request_finished.send(sender=None)
+
+
+def run(iterations: int, scale: float = 1.0) -> list[BenchmarkResult]:
+    configured_max_age = settings.DATABASES["default"].get("CONN_MAX_AGE", 0) or 60
+    modes = {
+        "per_request_connections": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+        "persistent_connections": {"CONN_MAX_AGE": configured_max_age, "CONN_HEALTH_CHECKS": True},
+    }
+    original = {key: connection.settings_dict.get(key) for key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS")}
+    results = []
+    try:
+        for name, overrides in modes.items():
+            connection.close()
+            connection.settings_dict.update(overrides)
+            results.append(
+                measure(
+                    SUITE,
+                    name,
+                    _simulated_request,
+                    iterations,
+                    vendor=connection.vendor,
+                    conn_max_age=overrides["CONN_MAX_AGE"],
+                )
+            )
+    finally:
+        connection.close()
+        connection.settings_dict.update(original)
+    return results
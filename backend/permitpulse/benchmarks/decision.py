@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import random
+
+from permitpulse.benchmarks.generators import condition_tree, leaf_condition, sample_context, seed_snapshot
+from permitpulse.benchmarks.harness import BenchmarkResult, measure
+from permitpulse.services.decision_engine import (
+    DecisionInput,
+    compile_condition,
+    evaluate_condition,
+    run_address_decision,
+)
+
+SUITE = "decision"
+SEED = 35
+CLAUSE_COUNT = 500
+
+
+def run(iterations: int, scale: float = 1.0) -> list[BenchmarkResult]:
+    rng = random.Random(SEED)
+    contexts = [sample_context(rng) for _ in range(64)]
+
+    deep = leaf_condition(rng)
+    for _ in range(40):
+        deep = {"not": {"all": [deep, {"field": "host.registered", "op": "exists"}]}}
+    # Nothing matches until the last leaf, so `any` walks every branch.
+    wide = [{"field": "property.units", "op": "gte", "value": 1000} for _ in range(255)]
+    wide.append({"field": "property.units", "op": "gte", "value": 0})
+    expressions = {"deep": deep, "wide": {"any": wide}, "mixed": condition_tree(rng, depth=4, width=5)}
+
+    results = []
+    for name, expression in expressions.items():
+        results.append(
+            measure(
+                SUITE,
+                f"evaluate_condition:{name}",
+                lambda expression=expression: [evaluate_condition(expression, context) for context in contexts],
+                iterations,
+                contexts=len(contexts),
+            )
+        )
+        predicate = compile_condition(expression)
+        results.append(
+            measure(
+                SUITE,
+                f"compiled_condition:{name}",
+                lambda predicate=predicate: [predicate(context) for context in contexts],
+                iterations,
+                contexts=len(contexts),
+            )
+        )
+
+    clause_count = max(1, int(CLAUSE_COUNT * scale))
+    seed_snapshot(rng, "NYC", clause_count)
+    counter = iter(range(10**9))
+    results.append(
+        measure(
+            SUITE,
+            "run_address_decision",
+            lambda: run_address_decision(
+                DecisionInput(address=f"{next(counter)} Bench St", city_code="NYC", context=rng.choice(contexts))
+            ),
+            iterations,
+            clauses=clause_count,
+        )
+    )
+    return results
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import itertools
+import random
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable, Iterator, Optional
+
+from django.db import models
+from django.db.models import Max
+from django.utils import timezone
+
+from permitpulse.models import (
+    AddressCheck,
+    AutonomyEvent,
+    ClauseBody,
+    DecisionTrace,
+    RollbackEvent,
+    RuleClause,
+    RuleSnapshot,
+    SLOMetric,
+)
+
+CONTEXT_FIELDS = (
+    "property.units",
+    "property.is_primary_residence",
+    "property.zoning",
+    "host.nights_per_year",
+    "host.registered",
+    "listing.max_guests",
+)
+ZONING = ("R1", "R2", "R3", "C1", "M1")
+CATEGORIES = ("requirement", "prohibition", "tax", "registration", "advisory")
+# What the suites insert, children first so protected foreign keys never block the cleanup.
+SEEDED_MODELS = (DecisionTrace, AddressCheck, AutonomyEvent, RollbackEvent, SLOMetric, RuleSnapshot, ClauseBody)
+ORDINANCE_SENTENCES = (
+    "Hosts must register with the Office of Special Enforcement before listing a unit.",
+    "Short-term rentals are permitted only in the host's primary residence.",
+    "Transient occupancy tax must be collected and remitted monthly.",
+    "No more than two paying guests may stay at one time.",
+    "Violations are subject to fines of up to $5,000 per occurrence.",
+    "The registration number must appear on every listing.",
+    "Units subject to rent stabilization may not be offered for short-term stays.",
+)
+
+
+def sample_context(rng: random.Random) -> dict[str, Any]:
+    return {
+        "property": {
+            "units": rng.randint(1, 12),
+            "is_primary_residence": rng.random() < 0.6,
+            "zoning": rng.choice(ZONING),
+        },
+        "host": {"nights_per_year": rng.randint(0, 365), "registered": rng.random() < 0.7},
+        "listing": {"max_guests": rng.randint(1, 10)},
+    }
+
+
+def leaf_condition(rng: random.Random) -> dict[str, Any]:
+    field = rng.choice(CONTEXT_FIELDS)
+    if field == "property.zoning":
+        return {"field": field, "op": rng.choice(("in", "not_in")), "value": rng.sample(ZONING, 2)}
+    if field in {"property.is_primary_residence", "host.registered"}:
+        return {"field": field, "op": rng.choice(("eq", "neq")), "value": True}
+    return {"field": field, "op": rng.choice(("gte", "lte")), "value": rng.randint(1, 200)}
+
+
+def condition_tree(rng: random.Random, depth: int, width: int) -> dict[str, Any]:
+    """Random all/any/not tree with `width` children per node and `depth` levels."""
+    if depth <= 0:
+        return leaf_condition(rng)
+    if rng.random() < 0.15:
+        return {"not": condition_tree(rng, depth - 1, width)}
+    return {rng.choice(("all", "any")): [condition_tree(rng, depth - 1, width) for _ in range(width)]}
+
+
+def ordinance_html(rng: random.Random, target_bytes: int) -> str:
+    """City-page-like HTML (nav, scripts, nested sections, tables) of roughly `target_bytes`."""
+    parts = [
+        "<html><head><title>Short-Term Rental Rules</title>",
+        "<style>body{font-family:sans-serif}</style><script>window.analytics=[];</script></head><body>",
+        "<nav>" + "".join(f'<a href="/section/{index}">Section {index}</a>' for index in range(30)) + "</nav>",
+    ]
+    size = sum(len(part) for part in parts)
+    section = 0
+    while size < target_bytes:
+        section += 1
+        sentences = " ".join(rng.choice(ORDINANCE_SENTENCES) for _ in range(rng.randint(3, 8)))
+        rows = "".join(
+            f"<tr><td>{rng.choice(ZONING)}</td><td>{rng.randint(1, 90)} nights</td></tr>" for _ in range(3)
+        )
+        chunk = (
+            f'<section id="s{section}"><h2>&sect; {section}. Regulations</h2>'
+            f"<div><p>{sentences}</p><ul><li>{rng.choice(ORDINANCE_SENTENCES)}</li></ul></div>"
+            f"<table>{rows}</table></section>\n"
+        )
+        parts.append(chunk)
+        size += len(chunk)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def next_version(city_code: str) -> int:
+    """A snapshot version the city has not used yet, so seeding never collides with existing snapshots."""
+    latest = RuleSnapshot.objects.filter(city_code=city_code).aggregate(latest=Max("version"))["latest"]
+    return (latest or 0) + 1
+
+
+def seed_snapshot(
+    rng: random.Random,
+    city_code: str,
+    clause_count: int,
+    version: Optional[int] = None,
+    depth: int = 3,
+    width: int = 3,
+) -> RuleSnapshot:
+    if version is None:
+        version = next_version(city_code)
+    snapshot = RuleSnapshot.objects.create(
+        city_code=city_code,
+        version=version,
+        checksum=f"bench-{city_code}-{version}",
+        effective_date=date.today(),
+        validation_score=0.9,
+        source_urls=["https://example.com/rules"],
+    )
+    RuleClause.objects.create_for_snapshot(
+        snapshot,
+        [
+            {
+                "clause_id": f"bench-{index}",
+                "category": rng.choice(CATEGORIES),
+                "condition_expr": condition_tree(rng, depth, width),
+                "requirement_text": rng.choice(ORDINANCE_SENTENCES),
+                "penalty_text": rng.choice(ORDINANCE_SENTENCES),
+                "confidence": round(rng.uniform(0.6, 0.95), 3),
+            }
+            for index in range(clause_count)
+        ],
+    )
+    return snapshot
+
+
+@contextmanager
+def discarding_seeded_rows() -> Iterator[None]:
+    """Deletes the SEEDED_MODELS rows inserted inside the block, so suites can run against a long-lived database
+    more than once. New rows are told apart by primary key, so keep other writers off the database meanwhile."""
+    watermarks = {model: model.objects.aggregate(latest=Max("pk"))["latest"] or 0 for model in SEEDED_MODELS}
+    try:
+        yield
+    finally:
+        for model in SEEDED_MODELS:
+            rows = model.objects.filter(pk__gt=watermarks[model])
+            if model is ClauseBody:
+                # Bodies are shared across snapshots; keep any that a snapshot outside the benchmark now uses.
+                rows = rows.filter(memberships__isnull=True)
+            rows.delete()
+
+
+@contextmanager
+def explicit_timestamps(model: type[models.Model]) -> Iterator[None]:
+    """Lets bulk inserts keep the created_at/updated_at values set on the instances."""
+    fields = [model._meta.get_field("created_at"), model._meta.get_field("updated_at")]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def bulk_insert(model: type[models.Model], objs: Iterable[models.Model], batch_size: int = 5000) -> int:
+    """bulk_create over an iterator in fixed-size chunks, so large seeds never sit in memory at once."""
+    inserted = 0
+    iterator = iter(objs)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        model.objects.bulk_create(batch, batch_size=batch_size)
+        inserted += len(batch)
+    return inserted
+
+
+def spread_timestamps(rng: random.Random, count: int, span: timedelta, end: Optional[datetime] = None) -> Iterator[datetime]:
+    end = end or timezone.now()
+    seconds = span.total_seconds()
+    for _ in range(count):
+        yield end - timedelta(seconds=rng.random() * seconds)
+
+
+def timeline(rng: random.Random, count: int, span: timedelta, end: Optional[datetime] = None) -> Iterator[datetime]:
+    """Increasing timestamps over `span` with jitter, so ids and created_at correlate like real inserts."""
+    end = end or timezone.now()
+    step = span.total_seconds() / max(count, 1)
+    start = end - span
+    for index in range(count):
+        yield start + timedelta(seconds=(index + rng.random()) * step)
+
+
+def autonomy_events(rng: random.Random, timestamps: Iterable[datetime]) -> Iterator[AutonomyEvent]:
+    """Decision- and ops-loop events at the given times, shaped like what the SLO queries filter on."""
+    kinds = (
+        ("decision_loop", "address_check", "evaluate", "healthy"),
+        ("decision_loop", "address_check", "evaluate", "degraded"),
+        ("ops_loop", "cron:daily", "daily_maintenance_cycle", "healthy"),
+        ("ops_loop", "cron:daily", "daily_maintenance_cycle", "degraded"),
+        ("ops_loop", "slo_breach", "auto_rollback", "recovered"),
+    )
+    weights = (80, 4, 10, 3, 3)
+    for created_at in timestamps:
+        event_type, trigger, action_taken, outcome = rng.choices(kinds, weights)[0]
+        yield AutonomyEvent(
+            event_type=event_type,
+            trigger=trigger,
+            action_taken=action_taken,
+            outcome=outcome,
+            details={"city_code": rng.choice(("NYC", "LA", "SF"))},
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+
+def seed_autonomy_events(rng: random.Random, count: int, span: timedelta = timedelta(days=7)) -> int:
+    with explicit_timestamps(AutonomyEvent):
+        return bulk_insert(AutonomyEvent, autonomy_events(rng, spread_timestamps(rng, count, span)))
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile over an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+@dataclass
+class BenchmarkResult:
+    suite: str
+    name: str
+    samples_ms: list[float]
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    def summary(self) -> dict[str, Any]:
+        ordered = sorted(self.samples_ms)
+        count = len(ordered)
+        return {
+            "suite": self.suite,
+            "name": self.name,
+            "iterations": count,
+            "mean_ms": round(sum(ordered) / count, 6) if count else 0.0,
+            "min_ms": round(ordered[0], 6) if count else 0.0,
+            "p50_ms": round(percentile(ordered, 50), 6),
+            "p95_ms": round(percentile(ordered, 95), 6),
+            "p99_ms": round(percentile(ordered, 99), 6),
+            "max_ms": round(ordered[-1], 6) if count else 0.0,
+            **self.extra,
+        }
+
+
+def measure(
+    suite: str,
+    name: str,
+    fn: Callable[[], Any],
+    iterations: int,
+    warmup: int = 3,
+    number: int = 1,
+    **extra: Any,
+) -> BenchmarkResult:
+    """Times `fn` `iterations` times; each sample is the mean of `number` back-to-back calls."""
+    for _ in range(warmup):
+        fn()
+    samples: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) * 1000 / number)
+    return BenchmarkResult(suite=suite, name=name, samples_ms=samples, extra=extra)
+
+
+def compare_reports(baseline: dict[str, Any], current: dict[str, Any], metric: str = "p50_ms") -> list[dict[str, Any]]:
+    """Pairs results by (suite, name) and reports the relative change of `metric`; positive means slower."""
+    previous = {(row["suite"], row["name"]): row for row in baseline.get("results", [])}
+    rows = []
+    for row in current.get("results", []):
+        before = previous.get((row["suite"], row["name"]))
+        if before is None or metric not in before:
+            continue
+        change = (row[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+        rows.append(
+            {
+                "suite": row["suite"],
+                "name": row["name"],
+                f"baseline_{metric}": before[metric],
+                metric: row[metric],
+                "change_pct": round(change, 2),
+            }
+        )
+    return rows
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import random
+
+from permitpulse.benchmarks.generators import ordinance_html
+from permitpulse.benchmarks.harness import BenchmarkResult, measure
+from permitpulse.parsers.html_text import BACKENDS
+
+SUITE = "html_normalize"
+SEED = 48
+# Fixture pages: a typical ordinance page and a large consolidated code.
+PAGE_BYTES = {"page_100k": 100_000, "page_2m": 2_000_000}
+
+
+def run(iterations: int, scale: float = 1.0) -> list[BenchmarkResult]:
+    """Throughput of every installed HTML-to-text backend; `matches_stdlib` confirms they agree."""
+    pages = {
+        name: ordinance_html(random.Random(SEED), max(1, int(size * scale))) for name, size in PAGE_BYTES.items()
+    }
+    reference = {name: BACKENDS["stdlib"](html) for name, html in pages.items()}
+    # Large pages take a while per pass; fewer samples keep the suite runtime in line with the others.
+    iterations = max(1, iterations // 10)
+
+    results = []
+    for backend, to_text in BACKENDS.items():
+        for name, html in pages.items():
+            result = measure(
+                SUITE,
+                f"{backend}:{name}",
+                lambda: to_text(html),
+                iterations,
+                warmup=1,
+                input_bytes=len(html),
+                matches_stdlib=to_text(html) == reference[name],
+            )
+            p50_ms = result.summary()["p50_ms"]
+            result.extra["mb_per_s"] = round(len(html) / 1e6 / (p50_ms / 1000), 2) if p50_ms else 0.0
+            results.append(result)
+    return results
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from permitpulse.benchmarks.generators import next_version
+from permitpulse.benchmarks.harness import BenchmarkResult, measure
+from permitpulse.fast_json import FastJSONRenderer
+from permitpulse.models import AddressCheck, AutonomyEvent, RuleClause, RuleSnapshot
+from permitpulse.serializers import AddressCheckSerializer, RuleSnapshotSerializer
+from permitpulse.services.runbook import autonomy_status_payload
+
+SUITE = "json_render"
+CLAUSE_COUNT = 500
+CHECK_COUNT = 200
+
+
+def _seed(scale: float) -> RuleSnapshot:
+    snapshot = RuleSnapshot.objects.create(
+        city_code="NYC",
+        version=next_version("NYC"),
+        checksum="bench-json",
+        effective_date=date.today(),
+        validation_score=0.9,
+        source_urls=["https://example.com/rules"],
+    )
+    clauses = RuleClause.objects.create_for_snapshot(
+        snapshot,
+        [
+            {
+                "clause_id": f"bench-clause-{index}",
+                "category": ("requirement", "prohibition", "tax")[index % 3],
+                "condition_expr": {"all": [{"field": "property.units", "op": "gte", "value": index % 7}]},
+                "requirement_text": f"Requirement {index}: hosts must register and display a permit number. " * 3,
+                "penalty_text": f"Penalty {index}: fines up to $1,000 per day.",
+                "confidence": 0.85,
+            }
+            for index in range(max(1, int(CLAUSE_COUNT * scale)))
+        ],
+    )
+    evidence = [
+        {
+            "clause_id": clause.clause_id,
+            "category": clause.category,
+            "requirement_text": clause.requirement_text,
+            "penalty_text": clause.penalty_text,
+        }
+        for clause in clauses[:40]
+    ]
+    AddressCheck.objects.bulk_create(
+        [
+            AddressCheck(
+                address=f"{index} Benchmark Ave",
+                city_code="NYC",
+                result_grade="YELLOW",
+                decision_mode="AUTO_CONFIDENT",
+                required_actions=[item["requirement_text"] for item in evidence],
+                evidence=evidence,
+                snapshot=snapshot,
+                confidence=0.85,
+            )
+            for index in range(max(1, int(CHECK_COUNT * scale)))
+        ]
+    )
+    AutonomyEvent.objects.bulk_create(
+        [
+            AutonomyEvent(
+                event_type="ops_loop",
+                trigger="bench:json",
+                action_taken="daily_maintenance_cycle",
+                outcome="healthy",
+                details={
+                    "cities_processed": [{"city_code": code, "snapshot_id": index} for code in ("NYC", "LA", "SF")],
+                    "started_at": (timezone.now() - timedelta(minutes=index)).isoformat(),
+                    "score": 0.9,
+                },
+            )
+            for index in range(20)
+        ]
+    )
+    return snapshot
+
+
+def run(iterations: int, scale: float = 1.0) -> list[BenchmarkResult]:
+    snapshot = _seed(scale)
+    checks = list(AddressCheck.objects.filter(snapshot=snapshot).select_related("snapshot"))
+    status_payload = autonomy_status_payload()
+    status_payload["budget"] = Decimal("12.50")
+    payloads = {
+        "rule_snapshot": RuleSnapshotSerializer(snapshot).data,
+        "address_checks": AddressCheckSerializer(checks, many=True).data,
+        "autonomy_status": status_payload,
+    }
+
+    results = []
+    for payload_name, data in payloads.items():
+        size = len(JSONRenderer().render(data))
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            results.append(
+                measure(
+                    SUITE,
+                    f"{payload_name}:{type(renderer).__name__}",
+                    lambda renderer=renderer, data=data: renderer.render(data),
+                    iterations,
+                    payload_bytes=size,
+                )
+            )
+    return results
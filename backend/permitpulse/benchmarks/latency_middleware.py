@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve
+
+from permitpulse.benchmarks.harness import BenchmarkResult, measure
+from permitpulse.middleware import RequestLatencyMiddleware
+from permitpulse.services.latency import LatencyRecorder
+
+SUITE = "latency_middleware"
+CALLS_PER_SAMPLE = 1000
+
+
+def run(iterations: int, scale: float = 1.0) -> list[BenchmarkResult]:
+    request = RequestFactory().get("/api/v1/alerts")
+    request.resolver_match = resolve("/api/v1/alerts")
+    response = HttpResponse()
+
+    def view(_request):
+        return response
+
+    middleware = RequestLatencyMiddleware(view)
+    # A private recorder keeps the benchmark out of the process-wide rollups.
+    middleware.recorder = LatencyRecorder()
+
+    baseline = measure(SUITE, "bare_view", lambda: view(request), iterations, number=CALLS_PER_SAMPLE)
+    wrapped = measure(
+        SUITE,
+        "with_latency_middleware",
+        lambda: middleware(request),
+        iterations,
+        number=CALLS_PER_SAMPLE,
+    )
+
+    baseline_ms = baseline.summary()["p50_ms"]
+    wrapped.extra["overhead_us_p50"] = round((wrapped.summary()["p50_ms"] - baseline_ms) * 1000, 3)
+    record_only = measure(
+        SUITE,
+        "histogram_record",
+        lambda: middleware.recorder.record("GET /api/v1/alerts", 12345, 200),
+        iterations,
+        number=CALLS_PER_SAMPLE,
+    )
+    return [baseline, wrapped, record_only]
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import importlib.util
+import io
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+from unittest.mock import patch
+from urllib.parse import urlencode
+
+import requests
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.test import override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+
+from permitpulse.benchmarks.generators import ordinance_html, sample_context, seed_snapshot
+from permitpulse.benchmarks.harness import percentile
+from permitpulse.connectors.city_sources import RawRuleDocument, SourceFetcher
+from permitpulse.models import Organization, RuleSnapshot
+from permitpulse.services.city_registry import active_city_codes
+
+LOAD_ORG_PREFIX = "load-org-"
+LOAD_ORG_COUNT = 20
+PORTFOLIO_ROWS = 5
+DEFAULT_MIX = {
+    "address_check": 45,
+    "rules_latest": 20,
+    "alerts": 15,
+    "address_check_list": 10,
+    "portfolio_upload": 8,
+    "cron": 2,
+}
+
+
+@dataclass
+class LoadRequest:
+    method: str
+    path: str
+    query: dict[str, str] = field(default_factory=dict)
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    content_type: str = ""
+
+
+def _json_request(method: str, path: str, payload: dict, headers: Optional[dict] = None) -> LoadRequest:
+    return LoadRequest(method, path, headers=headers or {}, body=json.dumps(payload).encode(), content_type="application/json")
+
+
+def _org_header(rng: random.Random) -> dict[str, str]:
+    return {"X-Org-Slug": f"{LOAD_ORG_PREFIX}{rng.randrange(LOAD_ORG_COUNT)}"}
+
+
+def _address_check(rng: random.Random) -> LoadRequest:
+    payload = {
+        "address": f"{rng.randint(1, 9999)} Load Test Ave",
+        "city_code": rng.choice(active_city_codes()),
+        "context": sample_context(rng),
+    }
+    # Anonymous checks skip the plan quota, so long runs don't degrade into 402s.
+    return _json_request("POST", "/api/v1/address-checks", payload)
+
+
+def _portfolio_upload(rng: random.Random) -> LoadRequest:
+    rows = ["address,city_code,is_primary_residence"]
+    rows += [
+        f"{rng.randint(1, 9999)} Portfolio St,{rng.choice(active_city_codes())},{rng.choice(('yes', 'no'))}"
+        for _ in range(PORTFOLIO_ROWS)
+    ]
+    upload = io.BytesIO("\n".join(rows).encode())
+    upload.name = "portfolio.csv"
+    return LoadRequest(
+        "POST",
+        "/api/v1/portfolio/import",
+        headers=_org_header(rng),
+        body=encode_multipart(BOUNDARY, {"file": upload}),
+        content_type=MULTIPART_CONTENT,
+    )
+
+
+def _rules_latest(rng: random.Random) -> LoadRequest:
+    return LoadRequest("GET", f"/api/v1/cities/{rng.choice(active_city_codes())}/rules/latest")
+
+
+def _alerts(rng: random.Random) -> LoadRequest:
+    return LoadRequest("GET", "/api/v1/alerts", headers=_org_header(rng))
+
+
+def _address_check_list(rng: random.Random) -> LoadRequest:
+    return LoadRequest("GET", "/api/v1/address-checks", query={"limit": "50"})
+
+
+def _cron(rng: random.Random) -> LoadRequest:
+    return LoadRequest(
+        "POST",
+        "/api/v1/internal/cron/daily-maintenance",
+        headers={"Authorization": f"Bearer {settings.CRON_SHARED_SECRET}"},
+    )
+
+
+SCENARIOS: dict[str, Callable[[random.Random], LoadRequest]] = {
+    "address_check": _address_check,
+    "portfolio_upload": _portfolio_upload,
+    "rules_latest": _rules_latest,
+    "alerts": _alerts,
+    "address_check_list": _address_check_list,
+    "cron": _cron,
+}
+
+
+def parse_mix(raw: Optional[str]) -> dict[str, int]:
+    """Parses "address_check=50,alerts=10" into scenario weights."""
+    if not raw:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in raw.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}'. Available: {', '.join(SCENARIOS)}")
+        mix[name] = int(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("Request mix needs at least one positive weight")
+    return mix
+
+
+class WSGITransport:
+    """Calls a WSGI app directly, the way a WSGI server worker would."""
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    def send(self, request: LoadRequest) -> tuple[int, dict[str, str]]:
+        environ = {
+            "REQUEST_METHOD": request.method,
+            "PATH_INFO": request.path,
+            "QUERY_STRING": urlencode(request.query),
+            "SERVER_NAME": "loadtest",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "CONTENT_TYPE": request.content_type,
+            "CONTENT_LENGTH": str(len(request.body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(request.body),
+            "wsgi.errors": io.StringIO(),
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in request.headers.items():
+            environ[f"HTTP_{name.upper().replace('-', '_')}"] = value
+        captured: dict[str, Any] = {}
+
+        def start_response(status: str, headers: list, exc_info=None):
+            captured["status"] = int(status.split(" ", 1)[0])
+            captured["headers"] = {key.lower(): value for key, value in headers}
+
+        body = self.app(environ, start_response)
+        try:
+            for _ in body:
+                pass
+        finally:
+            if hasattr(body, "close"):
+                body.close()
+        return captured["status"], captured["headers"]
+
+
+class HTTPTransport:
+    """Sends requests to a running server (e.g. runserver) with one keep-alive session per worker thread."""
+
+    def __init__(self, base_url: str, timeout: float = 60) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def send(self, request: LoadRequest) -> tuple[int, dict[str, str]]:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        headers = dict(request.headers)
+        if request.content_type:
+            headers["Content-Type"] = request.content_type
+        response = session.request(
+            request.method,
+            self.base_url + request.path,
+            params=request.query,
+            data=request.body or None,
+            headers=headers,
+            timeout=self.timeout,
+        )
+        return response.status_code, {key.lower(): value for key, value in response.headers.items()}
+
+
+def load_wsgi_app() -> Callable:
+    """The production entry point (api/index.py), so the measured stack matches the deployed one."""
+    path = settings.BASE_DIR.parent / "api" / "index.py"
+    spec = importlib.util.spec_from_file_location("permitpulse_load_entrypoint", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def prepare_load_data(seed: int, clauses: int = 200) -> None:
+    """Load-test organizations plus an active snapshot per city, created only when missing."""
+    rng = random.Random(seed)
+    Organization.objects.bulk_create(
+        [
+            Organization(name=f"Load Org {index}", slug=f"{LOAD_ORG_PREFIX}{index}", plan="team")
+            for index in range(LOAD_ORG_COUNT)
+        ],
+        ignore_conflicts=True,
+    )
+    for city_code in active_city_codes():
+        if not RuleSnapshot.objects.filter(city_code=city_code, is_active=True).exists():
+            seed_snapshot(rng, city_code, clauses)
+
+
+@contextmanager
+def offline_stubs(cron_secret: str) -> Iterator[None]:
+    """Replaces the city fetch and the OpenAI call so in-process runs never leave the machine."""
+    documents = {
+        city_code: RawRuleDocument(
+            city_code=city_code,
+            source_url=f"https://load.invalid/{city_code.lower()}",
+            content=ordinance_html(random.Random(city_code), 50_000),
+        )
+        for city_code in active_city_codes()
+    }
+    llm_clauses = [
+        {
+            "clause_id": "llm-display-registration",
+            "category": "requirement",
+            "condition_expr": {},
+            "requirement_text": "Display the registration number on every listing.",
+            "penalty_text": "Listings may be removed.",
+            "confidence": 0.8,
+        }
+    ]
+    with ExitStack() as stack:
+        # Patched at the fetcher, so direct and prefetched ingestion are both covered.
+        stack.enter_context(
+            patch.object(SourceFetcher, "fetch_city", lambda self, city_code, *args, **kwargs: documents[city_code])
+        )
+        stack.enter_context(patch("permitpulse.parsers.rule_parser._request_llm_clauses", return_value=llm_clauses))
+        stack.enter_context(
+            override_settings(OPENAI_API_KEY="offline", CRON_SHARED_SECRET=cron_secret, QUERY_METRICS_HEADERS=True)
+        )
+        yield
+
+
+@dataclass
+class _Sample:
+    scenario: str
+    status: int
+    latency_ms: float
+    queries: Optional[int]
+
+
+def _summarize(name: str, samples: list[_Sample], elapsed: float) -> dict[str, Any]:
+    latencies = sorted(sample.latency_ms for sample in samples)
+    queries = [sample.queries for sample in samples if sample.queries is not None]
+    return {
+        "scenario": name,
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if sample.status >= 500),
+        "non_2xx": sum(1 for sample in samples if not 200 <= sample.status < 300),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+        "avg_queries": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def run_load(
+    transport: WSGITransport | HTTPTransport,
+    mix: dict[str, int],
+    total_requests: int,
+    concurrency: int,
+    seed: int = 37,
+) -> dict[str, Any]:
+    """Sends `total_requests` drawn from the weighted mix over `concurrency` worker threads."""
+    rng = random.Random(seed)
+    names = [name for name, weight in mix.items() if weight > 0]
+    plan = rng.choices(names, weights=[mix[name] for name in names], k=total_requests)
+    requests_to_send = [(name, SCENARIOS[name](rng)) for name in plan]
+    cursor = itertools.count()
+    lock = threading.Lock()
+    samples: list[_Sample] = []
+
+    def worker() -> None:
+        try:
+            while (index := next(cursor)) < total_requests:
+                name, request = requests_to_send[index]
+                request.headers.setdefault("X-Request-ID", uuid.uuid4().hex)
+                started = time.perf_counter()
+                try:
+                    status, headers = transport.send(request)
+                except requests.RequestException:
+                    status, headers = 599, {}
+                latency_ms = (time.perf_counter() - started) * 1000
+                raw_queries = headers.get("x-db-query-count")
+                with lock:
+                    samples.append(_Sample(name, status, latency_ms, int(raw_queries) if raw_queries else None))
+        finally:
+            # Worker threads own their DB connections; close them like request_finished would.
+            close_old_connections()
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    by_scenario: dict[str, list[_Sample]] = {}
+    for sample in samples:
+        by_scenario.setdefault(sample.scenario, []).append(sample)
+    return {
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": _summarize("all", samples, elapsed),
+        "scenarios": [_summarize(name, by_scenario[name], elapsed) for name in sorted(by_scenario)],
+    }
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import random
+import string
+from unittest.mock import patch
+
+from django.test import override_settings
+
+from permitpulse.benchmarks.generators import ordinance_html
+from permitpulse.benchmarks.harness import BenchmarkResult, measure
+from permitpulse.connectors.city_sources import RawRuleDocument
+from permitpulse.parsers import rule_parser
+from permitpulse.parsers.patterns import DEFAULT_PATTERNS_FILE, PatternMatcher, PatternRule, load_pattern_rules
+from permitpulse.parsers.rule_parser import _normalize_text, _rule_based_extract, parse_rule_document
+
+SUITE = "rule_parser"
+SEED = 35
+DOCUMENT_BYTES = 1_000_000
+LARGE_REGISTRY_PHRASES = 500
+STUB_LLM_CLAUSES = [
+    {
+        "clause_id": f"llm-{index}",
+        "category": "requirement",
+        "condition_expr": {},
+        "requirement_text": "Display the registration number on the listing.",
+        "penalty_text": "",
+        "confidence": 0.8,
+    }
+    for index in range(12)
+]
+
+
+def large_registry(rng: random.Random, phrases: int) -> PatternMatcher:
+    """The bundled rules plus `phrases` synthetic ones, to show extraction cost does not grow per phrase."""
+    rules = load_pattern_rules(DEFAULT_PATTERNS_FILE)
+    for index in range(phrases):
+        words = " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(2))
+        rules.append(
+            PatternRule(
+                template={"clause_id": f"synthetic-{index}", "category": "requirement", "requirement_text": words},
+                phrases=(words,),
+            )
+        )
+    return PatternMatcher(rules)
+
+
+def run(iterations: int, scale: float = 1.0) -> list[BenchmarkResult]:
+    html = ordinance_html(random.Random(SEED), max(1, int(DOCUMENT_BYTES * scale)))
+    text = _normalize_text(html)
+    document = RawRuleDocument(city_code="NYC", source_url="https://example.com/rules", content=html)
+    # Parsing a 1MB page is slow; fewer samples keep the suite runtime in line with the others.
+    iterations = max(1, iterations // 10)
+
+    results = [
+        measure(SUITE, "normalize_text", lambda: _normalize_text(html), iterations, warmup=1, input_bytes=len(html)),
+        measure(SUITE, "rule_based_extract", lambda: _rule_based_extract(text), iterations, input_chars=len(text)),
+    ]
+    matcher = large_registry(random.Random(SEED), LARGE_REGISTRY_PHRASES)
+    results.append(
+        measure(
+            SUITE,
+            f"rule_based_extract_{LARGE_REGISTRY_PHRASES}_phrases",
+            lambda: matcher.extract(text, 3),
+            iterations,
+            input_chars=len(text),
+            phrases=matcher.phrase_count,
+        )
+    )
+    # The LLM call is stubbed so only parsing and merge cost is measured.
+    with override_settings(OPENAI_API_KEY="bench"), patch.object(
+        rule_parser, "_request_llm_clauses", return_value=STUB_LLM_CLAUSES
+    ):
+        results.append(
+            measure(
+                SUITE,
+                "parse_rule_document",
+                lambda: parse_rule_document(document),
+                iterations,
+                warmup=1,
+                input_bytes=len(html),
+            )
+        )
+    return results
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import itertools
+import json
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from permitpulse.benchmarks.generators import autonomy_events, explicit_timestamps, seed_snapshot, timeline
+from permitpulse.models import (
+    AddressCheck,
+    AutonomyEvent,
+    DecisionTrace,
+    Organization,
+    RuleClause,
+    RuleSnapshot,
+    SLOMetric,
+)
+from permitpulse.services.city_registry import active_city_codes
+from permitpulse.services.evidence import EVIDENCE_BODY_FIELDS
+
+PLANS = ("starter", "pro", "team")
+GRADES = ("GREEN", "YELLOW", "RED", "UNDETERMINED")
+STREETS = ("Main", "Oak", "Pine", "Elm", "Cedar", "Maple")
+SLO_METRICS = (
+    ("api_availability", 99.9, 99.5, 100.0),
+    ("auto_recovery_rate", 95.0, 80.0, 100.0),
+    ("latency_p95_ms:GET /api/v1/address-checks", 750.0, 120.0, 900.0),
+)
+
+
+@dataclass
+class ScaleConfig:
+    organizations: int = 50
+    versions: int = 5
+    clauses: int = 2000
+    checks: int = 1_000_000
+    events: int = 500_000
+    days: int = 180
+    seed: int = 36
+    batch_size: int = 10_000
+    use_copy: bool = True
+
+
+def _copy_rows(model: type[models.Model], objs: list[models.Model]) -> None:
+    fields = [item for item in model._meta.concrete_fields if not (item.primary_key and objs[0].pk is None)]
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(item.column) for item in fields)
+    json_fields = {item.attname for item in fields if isinstance(item, models.JSONField)}
+    with connection.cursor() as cursor, cursor.cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+        for obj in objs:
+            copy.write_row(
+                [
+                    json.dumps(getattr(obj, item.attname), cls=DjangoJSONEncoder)
+                    if item.attname in json_fields
+                    else getattr(obj, item.attname)
+                    for item in fields
+                ]
+            )
+
+
+class ChunkLoader:
+    """Writes model instances in fixed-size chunks: COPY on PostgreSQL, bulk_create elsewhere."""
+
+    def __init__(self, config: ScaleConfig, progress: Optional[Callable[[str], None]] = None) -> None:
+        self.batch_size = config.batch_size
+        self.use_copy = config.use_copy and connection.vendor == "postgresql"
+        self.progress = progress or (lambda message: None)
+
+    def write(self, model: type[models.Model], objs: list[models.Model]) -> None:
+        if not objs:
+            return
+        if self.use_copy:
+            _copy_rows(model, objs)
+        else:
+            with explicit_timestamps(model):
+                model.objects.bulk_create(objs, batch_size=self.batch_size)
+
+    def stream(self, model: type[models.Model], objs: Iterable[models.Model]) -> int:
+        loaded = 0
+        iterator = iter(objs)
+        while batch := list(itertools.islice(iterator, self.batch_size)):
+            with transaction.atomic():
+                self.write(model, batch)
+            loaded += len(batch)
+            self.progress(f"{model.__name__}: {loaded}")
+        return loaded
+
+
+def _seed_organizations(rng: random.Random, count: int) -> list[Organization]:
+    Organization.objects.bulk_create(
+        [
+            Organization(
+                name=f"Scale Org {index}",
+                slug=f"scale-org-{index}",
+                billing_email=f"ops+{index}@scale.example.com",
+                plan=rng.choice(PLANS),
+            )
+            for index in range(count)
+        ],
+        ignore_conflicts=True,
+    )
+    return list(Organization.objects.filter(slug__startswith="scale-org-").order_by("id")[:count])
+
+
+def _seed_snapshots(rng: random.Random, config: ScaleConfig) -> dict[str, tuple[RuleSnapshot, list[dict]]]:
+    """`versions` snapshots per city; only the newest stays active, like a real publish history."""
+    latest = {}
+    for city_code in active_city_codes():
+        snapshots = [seed_snapshot(rng, city_code, config.clauses) for _ in range(config.versions)]
+        RuleSnapshot.objects.filter(city_code=city_code).exclude(pk=snapshots[-1].pk).update(
+            is_active=False, status="STALE"
+        )
+        evidence_pool = list(
+            RuleClause.objects.filter(snapshot=snapshots[-1]).values("clause_id", **EVIDENCE_BODY_FIELDS)[:200]
+        )
+        latest[city_code] = (snapshots[-1], evidence_pool)
+    return latest
+
+
+def _address_check(
+    rng: random.Random,
+    check_id: int,
+    created_at: datetime,
+    organizations: list[Organization],
+    snapshots: dict[str, tuple[RuleSnapshot, list[dict]]],
+) -> tuple[AddressCheck, DecisionTrace]:
+    city_code = rng.choice(list(snapshots))
+    snapshot, pool = snapshots[city_code]
+    evidence = rng.sample(pool, min(len(pool), rng.randint(0, 5)))
+    confidence = round(rng.uniform(0.5, 0.98), 3)
+    check = AddressCheck(
+        id=check_id,
+        organization_id=rng.choice(organizations).pk if organizations else None,
+        address=f"{rng.randint(1, 9999)} {rng.choice(STREETS)} St #{check_id}",
+        city_code=city_code,
+        result_grade=rng.choice(GRADES),
+        decision_mode="AUTO_CONFIDENT" if confidence >= 0.75 else "AUTO_CONSERVATIVE",
+        blocker_flags=[item["requirement_text"] for item in evidence if item["category"] == "prohibition"],
+        required_actions=[item["requirement_text"] for item in evidence if item["category"] != "prohibition"],
+        evidence=evidence,
+        snapshot_id=snapshot.pk,
+        confidence=confidence,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+    trace = DecisionTrace(
+        address_check_id=check_id,
+        snapshot_id=snapshot.pk,
+        rule_ids=[item["clause_id"] for item in evidence],
+        confidence=confidence,
+        generated_at=created_at,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+    return check, trace
+
+
+def _slo_metrics(rng: random.Random, days: int) -> Iterator[SLOMetric]:
+    now = timezone.now().replace(minute=0, second=0, microsecond=0)
+    for hour in range(days * 24, 0, -1):
+        window_end = now - timedelta(hours=hour - 1)
+        for name, target, low, high in SLO_METRICS:
+            value = round(rng.uniform(low, high), 3)
+            breached = value > target if name.startswith("latency") else value < target
+            yield SLOMetric(
+                metric_name=name,
+                metric_value=value,
+                target_value=target,
+                window_start=window_end - timedelta(hours=24),
+                window_end=window_end,
+                status="breached" if breached else "healthy",
+                created_at=window_end,
+                updated_at=window_end,
+            )
+
+
+def seed_scale_data(config: ScaleConfig, progress: Optional[Callable[[str], None]] = None) -> dict[str, Any]:
+    """Seeds a production-shaped dataset; the same config and seed yield the same rows, with timestamps relative to now."""
+    rng = random.Random(config.seed)
+    loader = ChunkLoader(config, progress)
+    span = timedelta(days=config.days)
+
+    organizations = _seed_organizations(rng, config.organizations)
+    snapshots = _seed_snapshots(rng, config)
+
+    # Ids are assigned up front so each chunk's DecisionTraces can reference their checks without a read-back.
+    first_id = (AddressCheck.objects.aggregate(latest=Max("id"))["latest"] or 0) + 1
+    times = timeline(rng, config.checks, span)
+    for start in range(0, config.checks, config.batch_size):
+        pairs = [
+            _address_check(rng, first_id + offset, next(times), organizations, snapshots)
+            for offset in range(start, min(start + config.batch_size, config.checks))
+        ]
+        with transaction.atomic():
+            loader.write(AddressCheck, [check for check, _ in pairs])
+            loader.write(DecisionTrace, [trace for _, trace in pairs])
+        loader.progress(f"AddressCheck: {start + len(pairs)}")
+    with connection.cursor() as cursor:
+        for statement in connection.ops.sequence_reset_sql(no_style(), [AddressCheck]):
+            cursor.execute(statement)
+
+    events = loader.stream(AutonomyEvent, autonomy_events(rng, timeline(rng, config.events, span)))
+    metrics = loader.stream(SLOMetric, _slo_metrics(rng, config.days))
+    return {
+        "method": "copy" if loader.use_copy else "bulk_create",
+        "organizations": len(organizations),
+        "snapshots": config.versions * len(snapshots),
+        "clauses": config.versions * len(snapshots) * config.clauses,
+        "address_checks": config.checks,
+        "decision_traces": config.checks,
+        "autonomy_events": events,
+        "slo_metrics": metrics,
+    }
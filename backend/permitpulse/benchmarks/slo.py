@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import random
+
+from permitpulse.benchmarks.generators import seed_autonomy_events
+from permitpulse.benchmarks.harness import BenchmarkResult, measure
+from permitpulse.services.runbook import autonomy_status_payload, record_slo_metrics
+
+SUITE = "slo"
+SEED = 35
+EVENT_COUNT = 1_000_000
+
+
+def run(iterations: int, scale: float = 1.0) -> list[BenchmarkResult]:
+    events = seed_autonomy_events(random.Random(SEED), max(1, int(EVENT_COUNT * scale)))
+    # Each record_slo_metrics call scans the 24h window; cap samples so a full-size run stays in minutes.
+    slow_iterations = max(1, iterations // 20)
+    return [
+        measure(SUITE, "record_slo_metrics", record_slo_metrics, slow_iterations, warmup=1, events=events),
+        measure(SUITE, "autonomy_status_payload", autonomy_status_payload, iterations, events=events),
+    ]
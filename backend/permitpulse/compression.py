@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import gzip
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; gzip is always available.
+    zstandard = None
+
+CODEC_EXTENSIONS = {"zstd": "zst", "gzip": "gz"}
+
+
+def available_codec(preferred: str) -> str:
+    """The preferred codec when it can be used here, otherwise gzip."""
+    if preferred == "zstd" and zstandard is None:
+        return "gzip"
+    if preferred not in CODEC_EXTENSIONS:
+        raise ValueError(f"Unknown codec '{preferred}'. Available: {', '.join(CODEC_EXTENSIONS)}")
+    return preferred
+
+
+def compress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    if codec == "gzip":
+        # mtime=0 keeps the output byte-identical for identical input.
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    raise ValueError(f"Unknown codec '{codec}'")
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Reading zstd archives requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    raise ValueError(f"Unknown codec '{codec}'")
@@ -1,8 +1,39 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import io
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from html import escape
+from typing import Any, Iterator, Optional
+from urllib.parse import urlsplit
 
 import requests
+from django.conf import settings
+from requests.compat import chardet
+
+from permitpulse.tracing import start_span
+
+logger = logging.getLogger(__name__)
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class IncompleteDocumentError(requests.RequestException):
+    """The response body could not be used whole; `outcome` is how ingestion reports it."""
+
+    outcome = "incomplete"
+
+
+class DocumentTooLargeError(IncompleteDocumentError):
+    outcome = "oversized"
+
+
+class DocumentTruncatedError(IncompleteDocumentError, requests.ConnectionError):
+    outcome = "truncated"
 
 
 @dataclass
@@ -10,17 +41,186 @@ class RawRuleDocument:
     city_code: str
     source_url: str
     content: str
+    # Every source merged into `content`, in order; source_url is the first.
+    source_urls: list[str] = field(default_factory=list)
+    # sha256 of each source's raw response bytes, by URL.
+    source_hashes: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class SourceSpec:
+    url: str
+    kind: str = "html"
+    optional: bool = False
+    options: dict[str, Any] = field(default_factory=dict)
+
+
+def _pdf_text(content: bytes) -> str:
+    # Imported lazily: pdfplumber is heavy and only PDF sources need it.
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages)
+
+
+def _api_text(payload: Any, options: dict[str, Any]) -> str:
+    """String values from a JSON payload, limited to the keys in options["text_fields"] when given."""
+    wanted = set(options.get("text_fields") or ())
+    strings: list[str] = []
+
+    def walk(value: Any, key: str = "") -> None:
+        if isinstance(value, dict):
+            for child_key, child in value.items():
+                walk(child, child_key)
+        elif isinstance(value, list):
+            for child in value:
+                walk(child, key)
+        elif isinstance(value, str) and (not wanted or key in wanted):
+            strings.append(value)
+
+    walk(payload)
+    return "\n".join(strings)
+
+
+def read_body(response: requests.Response, max_bytes: int) -> tuple[bytearray, str]:
+    """Streams the body, hashing as it goes; never holds more than `max_bytes` of it."""
+    declared = response.headers.get("Content-Length", "")
+    # With a content encoding, Content-Length counts compressed bytes; only the decoded size is checked then.
+    plain = response.headers.get("Content-Encoding", "identity").lower() in {"", "identity"}
+    if plain and declared.isdigit() and int(declared) > max_bytes:
+        raise DocumentTooLargeError(f"{response.url} declares {declared} bytes, over the {max_bytes} byte limit")
+    body = bytearray()
+    digest = hashlib.sha256()
+    try:
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+            body += chunk
+            digest.update(chunk)
+            if len(body) > max_bytes:
+                raise DocumentTooLargeError(f"{response.url} is over the {max_bytes} byte limit")
+    except requests.exceptions.ChunkedEncodingError as exc:
+        raise DocumentTruncatedError(f"{response.url} ended after {len(body)} bytes") from exc
+    if plain and declared.isdigit() and len(body) < int(declared):
+        raise DocumentTruncatedError(f"{response.url} ended after {len(body)} of {declared} bytes")
+    return body, digest.hexdigest()
+
+
+def decode_body(response: requests.Response, body: bytearray) -> str:
+    encoding = response.encoding or chardet.detect(bytes(body)).get("encoding") or "utf-8"
+    return body.decode(encoding, errors="replace")
+
+
+def merge_sections(sections: list[tuple[SourceSpec, str]]) -> str:
+    """One HTML document with a section per source; the parser's text normalization sees only their text."""
+    parts = []
+    for source, body in sections:
+        if source.kind != "html":
+            body = f"<pre>{escape(body)}</pre>"
+        parts.append(f'<section data-source="{escape(source.url)}">{body}</section>')
+    return "\n".join(parts)
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class SourceFetcher:
+    """Fetches city sources on shared thread pools with at most `per_host` requests in flight per host.
+
+    City-level work (`submit_city`) runs on its own pool, so it can wait on source fetches without starving them.
+    """
+
+    def __init__(self, max_workers: int, per_host: int) -> None:
+        self.per_host = per_host
+        self._source_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="city-source")
+        self._city_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="city-fetch")
+        self._hosts: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def _host_slot(self, url: str) -> Iterator[None]:
+        host = host_of(url)
+        with self._lock:
+            slot = self._hosts.get(host)
+            if slot is None:
+                slot = self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+        with slot:
+            yield
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def fetch_source(
+        self, city_code: str, source: SourceSpec, timeout: float, outcomes: Optional[list] = None
+    ) -> tuple[str, str]:
+        """The source's text and the sha256 of its raw bytes.
+
+        `outcomes` collects (host, error or None) per request, for the caller's circuit breakers.
+        """
+        with (
+            self._host_slot(source.url),
+            start_span("city_source.fetch", city_code=city_code, source_url=source.url, kind=source.kind) as span,
+        ):
+            try:
+                with self._session().get(source.url, timeout=timeout, stream=True) as response:
+                    span.set_attribute("http.status_code", response.status_code)
+                    response.raise_for_status()
+                    body, sha256 = read_body(response, settings.CITY_FETCH_MAX_BYTES)
+            except Exception as exc:
+                if outcomes is not None:
+                    outcomes.append((host_of(source.url), exc))
+                raise
+            if outcomes is not None:
+                outcomes.append((host_of(source.url), None))
+            span.set_attribute("bytes", len(body))
+            span.set_attribute("sha256", sha256)
+        if source.kind == "pdf":
+            return _pdf_text(bytes(body)), sha256
+        if source.kind == "api":
+            return _api_text(json.loads(body), source.options), sha256
+        return decode_body(response, body), sha256
 
+    def fetch_city(
+        self, city_code: str, sources: list[SourceSpec], timeout: float, outcomes: Optional[list] = None
+    ) -> RawRuleDocument:
+        """Fetches every source concurrently and merges them in order; a failing required source fails the city."""
+        if not sources:
+            raise ValueError(f"No active sources are registered for {city_code}")
+        futures = [
+            self._source_pool.submit(self.fetch_source, city_code, source, timeout, outcomes) for source in sources
+        ]
+        sections: list[tuple[SourceSpec, str]] = []
+        hashes: dict[str, str] = {}
+        try:
+            for source, future in zip(sources, futures):
+                try:
+                    text, hashes[source.url] = future.result()
+                    sections.append((source, text))
+                except Exception:
+                    if not source.optional:
+                        raise
+                    logger.warning("optional source %s for %s failed", source.url, city_code, exc_info=True)
+        finally:
+            for future in futures:
+                future.cancel()
+        if not sections:
+            raise ValueError(f"Every source for {city_code} failed")
+        urls = [source.url for source, _ in sections]
+        return RawRuleDocument(
+            city_code=city_code,
+            source_url=urls[0],
+            content=merge_sections(sections),
+            source_urls=urls,
+            source_hashes=hashes,
+        )
 
-CITY_SOURCES = {
-    "NYC": "https://www.nyc.gov/site/specialenforcement/registration-law/registration-for-hosts.page",
-    "LA": "https://planning.lacity.gov/plans-policies/initiatives-policies/home-sharing",
-    "SF": "https://www.sf.gov/short-term-rentals",
-}
+    def submit_city(
+        self, city_code: str, sources: list[SourceSpec], timeout: float, outcomes: Optional[list] = None
+    ) -> Future:
+        return self._city_pool.submit(self.fetch_city, city_code, sources, timeout, outcomes)
 
 
-def fetch_city_document(city_code: str, timeout: int = 15) -> RawRuleDocument:
-    source_url = CITY_SOURCES[city_code]
-    response = requests.get(source_url, timeout=timeout)
-    response.raise_for_status()
-    return RawRuleDocument(city_code=city_code, source_url=source_url, content=response.text)
+source_fetcher = SourceFetcher(settings.CITY_FETCH_MAX_WORKERS, settings.CITY_FETCH_PER_HOST_LIMIT)
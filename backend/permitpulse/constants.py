@@ -1,7 +1,7 @@
-CITY_CHOICES = (
-    ("NYC", "New York City"),
-    ("LA", "Los Angeles"),
-    ("SF", "San Francisco"),
+SOURCE_KINDS = (
+    ("html", "HTML page"),
+    ("pdf", "PDF document"),
+    ("api", "JSON API"),
 )
 
 RESULT_GRADES = (
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator
+
+from django.conf import settings
+from django.db import connections
+
+REPLICA_ALIAS = "replica"
+PRIMARY_ALIAS = "default"
+
+_replica_reads: ContextVar[bool] = ContextVar("permitpulse_replica_reads", default=False)
+_pinned_to_primary: ContextVar[bool] = ContextVar("permitpulse_pinned_to_primary", default=False)
+_wrote: ContextVar[bool] = ContextVar("permitpulse_wrote", default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def read_from_replica() -> Iterator[None]:
+    """Routes reads inside the block to the replica unless the current request is pinned."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def pin_to_primary() -> None:
+    _pinned_to_primary.set(True)
+
+
+def is_pinned_to_primary() -> bool:
+    return _pinned_to_primary.get()
+
+
+def has_written() -> bool:
+    return _wrote.get()
+
+
+def begin_request(pinned: bool) -> tuple[Token, Token]:
+    return _pinned_to_primary.set(pinned), _wrote.set(False)
+
+
+def end_request(tokens: tuple[Token, Token]) -> None:
+    pinned_token, wrote_token = tokens
+    _pinned_to_primary.reset(pinned_token)
+    _wrote.reset(wrote_token)
+
+
+class ReadReplicaRouter:
+    """Sends opted-in reads to the replica; any write pins the rest of the request to the primary, and reads
+    inside a primary transaction stay there so they see the transaction's own snapshot."""
+
+    def db_for_read(self, model, **hints):
+        if (
+            _replica_reads.get()
+            and not _pinned_to_primary.get()
+            and replica_configured()
+            and not connections[PRIMARY_ALIAS].in_atomic_block
+        ):
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        _pinned_to_primary.set(True)
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Datetimes are passed through to DRF's encoder so "Z"-suffixed UTC timestamps and
+# microsecond handling stay byte-for-byte identical to the stdlib renderer.
+ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+UTF8_ENCODINGS = {"utf-8", "utf8"}
+
+
+def _finite(data: Any) -> Any:
+    """Copy of `data` with NaN and +/-Infinity replaced by None, as orjson writes them."""
+    if isinstance(data, float):
+        return data if math.isfinite(data) else None
+    if isinstance(data, dict):
+        return {key: _finite(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_finite(value) for value in data]
+    return data
+
+
+class FastJSONRenderer(JSONRenderer):
+    """orjson-backed JSONRenderer; falls back to the stdlib renderer when orjson can't handle a payload.
+
+    NaN and +/-Infinity render as null on both paths rather than failing the response.
+    """
+
+    # Lets the stdlib path write non-finite floats as tokens, which _render_stdlib then turns into null.
+    strict = False
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return self._render_stdlib(data, accepted_media_type, renderer_context)
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is not None or not self.compact or self.ensure_ascii:
+            return self._render_stdlib(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError, ValueError):
+            # e.g. integers beyond 64 bits; the stdlib path raises the canonical error if any.
+            return self._render_stdlib(data, accepted_media_type, renderer_context)
+
+        # Same strict-javascript-subset escaping as JSONRenderer.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+    def _render_stdlib(self, data, accepted_media_type, renderer_context):
+        ret = super().render(data, accepted_media_type, renderer_context)
+        # Only payloads with a NaN/Infinity token (or a string containing one) pay for the second pass.
+        if b"NaN" in ret or b"Infinity" in ret:
+            ret = super().render(_finite(data), accepted_media_type, renderer_context)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """orjson-backed JSONParser for UTF-8 bodies; other encodings use the stdlib parser."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or encoding.lower() not in UTF8_ENCODINGS:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from permitpulse.models import AddressCheck, RuleClause
+from permitpulse.services.evidence import EVIDENCE_BODY_FIELDS, derive_flags
+
+
+class Command(BaseCommand):
+    help = "Rewrites inline AddressCheck evidence as clause references (rows that can't be matched exactly are kept)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        last_id = 0
+        compacted = skipped = 0
+        clauses: dict[int, dict[str, tuple[int, dict]]] = {}
+        while True:
+            batch = list(
+                AddressCheck.objects.filter(id__gt=last_id, evidence_compact=False, snapshot__isnull=False)
+                .order_by("id")
+                .only("id", "snapshot_id", "evidence", "blocker_flags", "required_actions")[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            missing = {check.snapshot_id for check in batch} - clauses.keys()
+            for snapshot_id in missing:
+                clauses[snapshot_id] = {}
+            rows = RuleClause.objects.filter(snapshot_id__in=missing).values(
+                "pk", "snapshot_id", "clause_id", **EVIDENCE_BODY_FIELDS
+            )
+            for row in rows:
+                pk, snapshot_id = row.pop("pk"), row.pop("snapshot_id")
+                clauses[snapshot_id][row["clause_id"]] = (pk, row)
+
+            updates = []
+            for check in batch:
+                lookup = clauses[check.snapshot_id]
+                matches = [lookup.get(item.get("clause_id")) for item in check.evidence]
+                # Only rewrite rows whose stored values would be reproduced exactly on read.
+                if (
+                    None in matches
+                    or [evidence for _, evidence in matches] != check.evidence
+                    or derive_flags(check.evidence) != (check.blocker_flags, check.required_actions)
+                ):
+                    skipped += 1
+                    continue
+                ids = [pk for pk, _ in matches]
+                check.evidence_compact = True
+                check.evidence_clause_ids = ids
+                check.evidence, check.blocker_flags, check.required_actions = [], [], []
+                updates.append(check)
+
+            if updates and not options["dry_run"]:
+                with transaction.atomic():
+                    AddressCheck.objects.bulk_update(
+                        updates,
+                        ["evidence_compact", "evidence_clause_ids", "evidence", "blocker_flags", "required_actions"],
+                    )
+            compacted += len(updates)
+            if len(clauses) > 100:
+                clauses.clear()
+
+        prefix = "would compact" if options["dry_run"] else "compacted"
+        self.stdout.write(self.style.SUCCESS(f"{prefix}={compacted} skipped={skipped}"))
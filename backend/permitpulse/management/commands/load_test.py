@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import tempfile
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from permitpulse.benchmarks.load import (
+    HTTPTransport,
+    WSGITransport,
+    load_wsgi_app,
+    offline_stubs,
+    parse_mix,
+    prepare_load_data,
+    run_load,
+)
+
+
+class Command(BaseCommand):
+    help = "Drives the API with a weighted request mix (in-process WSGI or a running server) and reports latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Total requests to send")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--mix", help="Scenario weights, e.g. address_check=50,rules_latest=20,cron=1")
+        parser.add_argument("--seed", type=int, default=37)
+        parser.add_argument("--url", help="Base URL of a running server; omit to call api/index.py in-process")
+        parser.add_argument("--cron-secret", default="", help="CRON_SHARED_SECRET of the server under --url")
+        parser.add_argument(
+            "--current-db",
+            action="store_true",
+            help="Use the configured database instead of an isolated test database (implied by --url)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Allow --current-db/--url when DJANGO_DEBUG is off (never point this at production)",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this path instead of stdout")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive")
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        remote = bool(options["url"])
+        if remote or options["current_db"]:
+            if not settings.DEBUG and not options["force"]:
+                raise CommandError("Refusing to load test the configured database with DJANGO_DEBUG off; pass --force")
+            # The cron scenario runs real maintenance, which can publish snapshots and alert every organization.
+            if mix.pop("cron", None) is not None:
+                self.stderr.write("dropping the cron scenario: it only runs against an isolated test database")
+            if not mix:
+                raise CommandError("--mix has no scenarios left to run")
+        old_config = None
+        if not (remote or options["current_db"]):
+            if connection.vendor == "sqlite":
+                # The default shared-cache in-memory test DB fails concurrent writers with "table is locked"
+                # instead of waiting on the busy timeout, which would show up as 500s under load.
+                test_name = os.path.join(tempfile.gettempdir(), f"permitpulse-load-{os.getpid()}.sqlite3")
+                connection.settings_dict["TEST"]["NAME"] = test_name
+            old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with ExitStack() as stack:
+                if remote:
+                    # The server has its own stubs/config; only the cron secret is needed to build requests.
+                    stack.enter_context(override_settings(CRON_SHARED_SECRET=options["cron_secret"]))
+                    transport = HTTPTransport(options["url"])
+                else:
+                    stack.enter_context(offline_stubs(secrets.token_hex(16)))
+                    transport = WSGITransport(load_wsgi_app())
+                prepare_load_data(options["seed"])
+                report = run_load(transport, mix, options["requests"], options["concurrency"], options["seed"])
+        finally:
+            if old_config is not None:
+                teardown_databases(old_config, verbosity=0)
+
+        report = {
+            "generated_at": timezone.now().isoformat(),
+            "target": options["url"] or "in-process",
+            "mix": mix,
+            **report,
+        }
+        rendered = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.write(rendered)
+            self.stdout.write(self.style.SUCCESS(f"wrote load report to {options['output']}"))
+        else:
+            self.stdout.write(rendered)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from permitpulse.profiling import profile_summary, profiled
+
+
+class Command(BaseCommand):
+    help = "Runs another management command under cProfile and stores the profile (e.g. profile_command run_data_loop)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("command_name")
+        parser.add_argument("command_args", nargs="*")
+        parser.add_argument("--summary", action="store_true", help="Print the top functions by cumulative time")
+
+    def handle(self, *args, **options):
+        name = options["command_name"]
+        command_args = options["command_args"]
+        with profiled("command", " ".join([name, *command_args])) as state:
+            call_command(name, *command_args, stdout=self.stdout, stderr=self.stderr)
+
+        record = state["record"]
+        if record is None:
+            self.stderr.write("profile could not be stored")
+            return
+        if options["summary"]:
+            self.stdout.write(profile_summary(record))
+        self.stdout.write(
+            self.style.SUCCESS(f"profile_id={record.request_id} duration_ms={record.duration_ms} raw_size={record.raw_size}")
+        )
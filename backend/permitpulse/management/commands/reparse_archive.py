@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from permitpulse.models import RuleSnapshot
+from permitpulse.parsers.reparse import init_worker, reparse_archived
+from permitpulse.services.archive import diff_snapshot_clauses, read_archive_bytes
+
+
+class Command(BaseCommand):
+    help = "Re-runs the rule parser over archived city documents and reports clause diffs against stored snapshots"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--city", action="append", dest="cities", help="Limit to a city code (repeatable)")
+        parser.add_argument("--all-versions", action="store_true", help="Include inactive snapshots")
+        parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="0 parses in-process")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        snapshots = RuleSnapshot.objects.filter(raw_document__isnull=False).select_related("raw_document")
+        if options["cities"]:
+            snapshots = snapshots.filter(city_code__in=[city.upper() for city in options["cities"]])
+        if not options["all_versions"]:
+            snapshots = snapshots.filter(is_active=True)
+        snapshots = list(snapshots.order_by("city_code", "version"))
+
+        # Each archived document is parsed once, however many snapshot versions were built from it.
+        raw_documents = {snapshot.raw_document_id: snapshot.raw_document for snapshot in snapshots}
+        jobs = (
+            {
+                "raw_document_id": raw.pk,
+                "codec": raw.codec,
+                "data": read_archive_bytes(raw),
+                "city_code": raw.city_code,
+                "source_url": raw.source_url,
+            }
+            for raw in raw_documents.values()
+        )
+        if options["processes"] > 0 and len(raw_documents) > 1:
+            # Forked workers must not inherit open database sockets.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options["processes"], initializer=init_worker) as pool:
+                results = list(pool.map(reparse_archived, jobs))
+        else:
+            results = [reparse_archived(job) for job in jobs]
+        parsed = {result["raw_document_id"]: result for result in results}
+
+        diffs = []
+        for snapshot in snapshots:
+            result = parsed[snapshot.raw_document_id]
+            diff = diff_snapshot_clauses(snapshot, result["checksum"], result["clauses"])
+            diff["raw_document"] = snapshot.raw_document.content_hash
+            diffs.append(diff)
+        report = {
+            "documents": len(raw_documents),
+            "snapshots": len(diffs),
+            "snapshots_with_changes": sum(1 for diff in diffs if diff["added"] or diff["removed"] or diff["changed"]),
+            "diffs": diffs,
+        }
+
+        rendered = json.dumps(report, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(rendered + "\n", encoding="utf-8")
+        self.stdout.write(rendered)
@@ -2,13 +2,21 @@ from __future__ import annotations
 
 from django.core.management.base import BaseCommand
 
+from permitpulse.services.jobs import enqueue
 from permitpulse.services.runbook import record_slo_metrics, run_autonomous_recovery_cycle
 
 
 class Command(BaseCommand):
     help = "Runs autonomous ops loop: SLO evaluation + automated recovery"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--enqueue", action="store_true", help="Queue the SLO rollup and recovery for run_workers")
+
     def handle(self, *args, **options):
+        if options["enqueue"]:
+            jobs = [enqueue("slo_rollup"), enqueue("autonomous_recovery")]
+            self.stdout.write(self.style.SUCCESS(f"jobs={[job.id for job in jobs]}"))
+            return
         metrics = record_slo_metrics()
         recovery = run_autonomous_recovery_cycle()
         self.stdout.write(self.style.SUCCESS(f"slo_metrics={len(metrics)} recovery={recovery}"))
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from permitpulse.benchmarks import SUITES
+from permitpulse.benchmarks.generators import discarding_seeded_rows
+from permitpulse.benchmarks.harness import compare_reports
+
+
+class Command(BaseCommand):
+    help = "Runs performance benchmarks against an isolated test database and emits JSON results"
+
+    def add_arguments(self, parser):
+        parser.add_argument("suites", nargs="*", help=f"Suites to run (default: all). Available: {', '.join(SUITES)}")
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiplier for seeded dataset sizes (e.g. 0.01 for a quick smoke run)",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this path instead of stdout")
+        parser.add_argument("--compare", help="Baseline JSON report (e.g. from another commit) to diff p50 against")
+        parser.add_argument(
+            "--current-db",
+            action="store_true",
+            help="Run against the configured database instead of creating an isolated test database",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Allow --current-db when DJANGO_DEBUG is off (never point this at production)",
+        )
+
+    def handle(self, *args, **options):
+        suite_names = options["suites"] or list(SUITES)
+        unknown = [name for name in suite_names if name not in SUITES]
+        if unknown:
+            raise CommandError(f"Unknown benchmark suites: {', '.join(unknown)}")
+        if options["current_db"] and not settings.DEBUG and not options["force"]:
+            raise CommandError("Refusing to benchmark the configured database with DJANGO_DEBUG off; pass --force")
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"], encoding="utf-8") as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline report: {exc}") from exc
+
+        old_config = None if options["current_db"] else setup_databases(verbosity=0, interactive=False)
+        try:
+            results = []
+            for name in suite_names:
+                # Suites seed the database they run on; the configured one gets its rows back as they were.
+                with discarding_seeded_rows() if options["current_db"] else nullcontext():
+                    suite_results = SUITES[name](options["iterations"], scale=options["scale"])
+                results.extend(result.summary() for result in suite_results)
+                self.stderr.write(f"{name}: done")
+        finally:
+            if old_config is not None:
+                teardown_databases(old_config, verbosity=0)
+
+        report = {
+            "generated_at": timezone.now().isoformat(),
+            "database_vendor": connection.vendor,
+            "scale": options["scale"],
+            "results": results,
+        }
+        if baseline is not None:
+            report["comparison"] = compare_reports(baseline, report)
+            for row in report["comparison"]:
+                self.stderr.write(
+                    f"{row['suite']}:{row['name']} p50 {row['baseline_p50_ms']:.4f} -> {row['p50_ms']:.4f} ms "
+                    f"({row['change_pct']:+.1f}%)"
+                )
+        rendered = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.write(rendered)
+            self.stdout.write(self.style.SUCCESS(f"wrote {len(results)} results to {options['output']}"))
+        else:
+            self.stdout.write(rendered)
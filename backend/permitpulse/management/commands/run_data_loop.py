@@ -1,15 +1,33 @@
 from __future__ import annotations
 
-from django.conf import settings
+from contextlib import closing
+
 from django.core.management.base import BaseCommand
 
+from permitpulse.services.city_registry import active_city_codes, iter_prefetched
 from permitpulse.services.ingestion import ingest_city_rules
+from permitpulse.services.jobs import enqueue
+from permitpulse.services.scheduler import due_cities
 
 
 class Command(BaseCommand):
     help = "Runs one full data loop: fetch -> parse -> validate -> publish"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--enqueue", action="store_true", help="Queue one ingest_city job per city for run_workers")
+        parser.add_argument("--due", action="store_true", help="Only cities the scheduler has due, most urgent first")
+        parser.add_argument("--limit", type=int, default=0, help="With --due, at most this many cities")
+
     def handle(self, *args, **options):
-        for city_code in settings.PERMITPULSE_CITY_CODES:
-            snapshot = ingest_city_rules(city_code)
-            self.stdout.write(self.style.SUCCESS(f"{city_code}: snapshot={getattr(snapshot, 'id', None)}"))
+        city_codes = active_city_codes()
+        if options["due"]:
+            city_codes = due_cities(limit=options["limit"] or None)
+        if options["enqueue"]:
+            for city_code in city_codes:
+                job = enqueue("ingest_city", {"city_code": city_code})
+                self.stdout.write(self.style.SUCCESS(f"{city_code}: job={job.id}"))
+            return
+        with closing(iter_prefetched(city_codes)) as fetches:
+            for city_code, fetch in fetches:
+                snapshot = ingest_city_rules(city_code, fetch)
+                self.stdout.write(self.style.SUCCESS(f"{city_code}: snapshot={getattr(snapshot, 'id', None)}"))
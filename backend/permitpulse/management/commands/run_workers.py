@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from permitpulse.services.jobs import JOB_TYPES, requeue_stale_jobs, supports_skip_locked, work
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Runs a pool of job-queue workers until interrupted (or, with --burst, until the queue is drained)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Worker threads in this process")
+        parser.add_argument("--job-type", action="append", dest="job_types", help="Only run these types (repeatable)")
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is runnable")
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        job_types = options["job_types"] or list(JOB_TYPES)
+        unknown = set(job_types) - JOB_TYPES.keys()
+        if unknown:
+            raise CommandError(f"Unknown job type(s): {', '.join(sorted(unknown))}. Available: {', '.join(JOB_TYPES)}")
+
+        workers = max(1, options["workers"])
+        if not supports_skip_locked() and workers > 1:
+            # Without SKIP LOCKED (SQLite) concurrent claimers would just serialize on the database lock.
+            self.stderr.write(f"{connection.vendor} has no SKIP LOCKED; running a single worker")
+            workers = 1
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"requeued {requeued} stale job(s)")
+
+        stop = threading.Event()
+        previous_handlers = {sig: signal.signal(sig, lambda *_: stop.set()) for sig in (signal.SIGINT, signal.SIGTERM)}
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+        def run(index: int) -> int:
+            try:
+                return work(f"{prefix}:{index}", stop, job_types, options["burst"], options["poll_interval"])
+            except Exception:
+                logger.exception("worker %s:%s crashed", prefix, index)
+                stop.set()
+                raise
+            finally:
+                connections.close_all()
+
+        try:
+            if workers == 1:
+                processed = work(f"{prefix}:0", stop, job_types, options["burst"], options["poll_interval"])
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(run, index) for index in range(workers)]
+                    processed = sum(future.result() for future in futures)
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+        self.stdout.write(self.style.SUCCESS(f"workers={workers} processed={processed}"))
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from permitpulse.benchmarks.scale_data import ScaleConfig, seed_scale_data
+
+
+class Command(BaseCommand):
+    help = "Seeds a deterministic, production-sized dataset for scale testing (COPY on PostgreSQL)"
+
+    def add_arguments(self, parser):
+        defaults = ScaleConfig()
+        parser.add_argument("--organizations", type=int, default=defaults.organizations)
+        parser.add_argument("--versions", type=int, default=defaults.versions, help="Snapshot versions per city")
+        parser.add_argument("--clauses", type=int, default=defaults.clauses, help="Clauses per snapshot")
+        parser.add_argument("--checks", type=int, default=defaults.checks, help="AddressChecks (one DecisionTrace each)")
+        parser.add_argument("--events", type=int, default=defaults.events, help="AutonomyEvents")
+        parser.add_argument("--days", type=int, default=defaults.days, help="Time span the rows are spread over")
+        parser.add_argument("--seed", type=int, default=defaults.seed)
+        parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+        parser.add_argument("--no-copy", action="store_true", help="Use bulk_create even on PostgreSQL")
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Allow seeding when DJANGO_DEBUG is off (never point this at production)",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("Refusing to seed scale data with DJANGO_DEBUG off; pass --force if this is intended")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        config = ScaleConfig(
+            organizations=options["organizations"],
+            versions=max(1, options["versions"]),
+            clauses=options["clauses"],
+            checks=options["checks"],
+            events=options["events"],
+            days=max(1, options["days"]),
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            use_copy=not options["no_copy"],
+        )
+        started = time.perf_counter()
+        progress = (lambda message: self.stderr.write(message)) if options["verbosity"] > 1 else None
+        counts = seed_scale_data(config, progress=progress)
+        counts["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+        self.stdout.write(json.dumps(counts))
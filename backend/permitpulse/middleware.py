@@ -1,8 +1,120 @@
 from __future__ import annotations
 
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 from django.http import HttpRequest
 
+from permitpulse import db_router
 from permitpulse.models import Organization
+from permitpulse.profiling import profiled, request_id_for, should_profile
+from permitpulse.query_metrics import QUERY_BUDGETS, count_queries
+from permitpulse.services.latency import recorder
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_PIN_COOKIE = "pp_primary_pin"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RequestLatencyMiddleware:
+    """Records per-route latency into the in-process histograms and flushes them periodically."""
+
+    def __init__(self, get_response):
+        if not settings.LATENCY_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.recorder = recorder
+
+    def __call__(self, request: HttpRequest):
+        started = time.perf_counter_ns()
+        response = self.get_response(request)
+        duration_us = (time.perf_counter_ns() - started) // 1000
+
+        match = request.resolver_match
+        endpoint = f"{request.method} /{match.route}" if match else f"{request.method} unmatched"
+        self.recorder.record(endpoint, duration_us, response.status_code, getattr(request, "query_stats", None))
+        if self.recorder.flush_due():
+            try:
+                self.recorder.flush()
+            except Exception:  # noqa: BLE001
+                logger.exception("latency rollup flush failed")
+        return response
+
+
+class QueryMetricsMiddleware:
+    """Counts queries and DB time per request; optionally reports them in response headers."""
+
+    def __init__(self, get_response):
+        if not settings.QUERY_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        with count_queries() as stats:
+            response = self.get_response(request)
+        request.query_stats = stats
+
+        match = request.resolver_match
+        budget = QUERY_BUDGETS.get((match.url_name, request.method)) if match else None
+        if budget is not None and stats.count > budget:
+            logger.warning(
+                "query budget exceeded for %s %s: %s > %s", request.method, match.url_name, stats.count, budget
+            )
+        if settings.QUERY_METRICS_HEADERS:
+            response["X-DB-Query-Count"] = str(stats.count)
+            response["X-DB-Time-Ms"] = f"{stats.duration_ms:.3f}"
+        return response
+
+
+class ProfilingMiddleware:
+    """Profiles sampled or explicitly requested requests; not installed at all unless PROFILING_ENABLED."""
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        if not should_profile(request):
+            return self.get_response(request)
+
+        with profiled("request", f"{request.method} {request.path}", request_id_for(request)) as state:
+            response = self.get_response(request)
+        if state["record"] is not None:
+            response["X-Profile-Id"] = state["request_id"]
+        return response
+
+
+class PrimaryPinningMiddleware:
+    """Keeps read-your-writes when replica reads are enabled.
+
+    Unsafe requests read from the primary for their whole lifetime. A request that wrote sets a
+    short-lived cookie so the client's follow-up reads also stay on the primary while the replica
+    catches up.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        pinned = request.method not in SAFE_METHODS or PRIMARY_PIN_COOKIE in request.COOKIES
+        tokens = db_router.begin_request(pinned)
+        try:
+            response = self.get_response(request)
+            if db_router.has_written() and db_router.replica_configured():
+                response.set_cookie(
+                    PRIMARY_PIN_COOKIE,
+                    "1",
+                    max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True,
+                    samesite="Lax",
+                )
+            return response
+        finally:
+            db_router.end_request(tokens)
 
 
 class OrganizationResolverMiddleware:
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('permitpulse', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='addresscheck',
+            index=models.Index(fields=['organization', '-created_at', '-id'], name='addrcheck_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='addresscheck',
+            index=models.Index(fields=['-created_at', '-id'], name='addrcheck_created_idx'),
+        ),
+    ]
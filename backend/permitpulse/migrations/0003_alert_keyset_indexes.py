@@ -0,0 +1,25 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('permitpulse', '0002_address_check_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['organization', '-created_at', '-id'], name='alert_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['-created_at', '-id'], name='alert_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['organization', 'id'], name='alert_org_id_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:32
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('permitpulse', '0003_alert_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EndpointLatencyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('endpoint', models.CharField(max_length=128)),
+                ('window_start', models.DateTimeField(default=django.utils.timezone.now)),
+                ('window_end', models.DateTimeField(default=django.utils.timezone.now)),
+                ('request_count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('p50_ms', models.FloatField(default=0.0)),
+                ('p95_ms', models.FloatField(default=0.0)),
+                ('p99_ms', models.FloatField(default=0.0)),
+                ('max_ms', models.FloatField(default=0.0)),
+                ('histogram', models.JSONField(default=dict)),
+            ],
+            options={
+                'ordering': ['-window_end'],
+                'indexes': [models.Index(fields=['window_end'], name='latency_rollup_window_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('permitpulse', '0004_endpoint_latency_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='endpointlatencyrollup',
+            name='db_time_ms',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='endpointlatencyrollup',
+            name='query_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('permitpulse', '0005_latency_rollup_query_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('request_id', models.CharField(max_length=64, unique=True)),
+                ('kind', models.CharField(default='request', max_length=16)),
+                ('label', models.CharField(max_length=255)),
+                ('duration_ms', models.FloatField(default=0.0)),
+                ('raw_size', models.PositiveIntegerField(default=0)),
+                ('data', models.BinaryField()),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('permitpulse', '0006_profile_record'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='addresscheck',
+            name='evidence_clause_ids',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='addresscheck',
+            name='evidence_compact',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('permitpulse', '0007_address_check_compact_evidence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClauseBody',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('category', models.CharField(max_length=32)),
+                ('condition_expr', models.JSONField(default=dict)),
+                ('requirement_text', models.TextField()),
+                ('penalty_text', models.TextField(blank=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='ruleclause',
+            name='body',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='memberships', to='permitpulse.clausebody'),
+        ),
+    ]
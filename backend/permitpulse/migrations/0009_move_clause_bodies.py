@@ -0,0 +1,78 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:05
+
+import hashlib
+import json
+
+from django.db import migrations
+
+BODY_FIELDS = ("category", "condition_expr", "requirement_text", "penalty_text")
+BATCH_SIZE = 2000
+
+
+def _content_hash(body):
+    # Frozen copy of permitpulse.models.clause_content_hash.
+    canonical = json.dumps(
+        {name: body[name] for name in BODY_FIELDS}, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _batches(queryset):
+    batch = []
+    for row in queryset.iterator(chunk_size=BATCH_SIZE):
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def move_clause_bodies(apps, schema_editor):
+    # A handful of queries per batch, not per clause: bodies are deduplicated in memory, new ones bulk-inserted and
+    # the batch's body_id values written back with one bulk update.
+    RuleClause = apps.get_model("permitpulse", "RuleClause")
+    ClauseBody = apps.get_model("permitpulse", "ClauseBody")
+    body_ids = {}
+    for clauses in _batches(RuleClause.objects.order_by("id").only("id", *BODY_FIELDS)):
+        hashes = []
+        new_bodies = {}
+        for clause in clauses:
+            body = {
+                "category": clause.category,
+                "condition_expr": clause.condition_expr or {},
+                "requirement_text": clause.requirement_text,
+                "penalty_text": clause.penalty_text or "",
+            }
+            content_hash = _content_hash(body)
+            hashes.append(content_hash)
+            if content_hash not in body_ids:
+                new_bodies.setdefault(content_hash, ClauseBody(content_hash=content_hash, **body))
+        if new_bodies:
+            ClauseBody.objects.bulk_create(new_bodies.values())
+            body_ids.update(ClauseBody.objects.filter(content_hash__in=new_bodies).values_list("content_hash", "id"))
+        for clause, content_hash in zip(clauses, hashes):
+            clause.body_id = body_ids[content_hash]
+        RuleClause.objects.bulk_update(clauses, ["body_id"])
+
+
+def restore_clause_bodies(apps, schema_editor):
+    RuleClause = apps.get_model("permitpulse", "RuleClause")
+    for clauses in _batches(RuleClause.objects.order_by("id").select_related("body")):
+        for clause in clauses:
+            for name in BODY_FIELDS:
+                setattr(clause, name, getattr(clause.body, name))
+        RuleClause.objects.bulk_update(clauses, BODY_FIELDS)
+
+
+class Migration(migrations.Migration):
+    # Its own migration, so that on PostgreSQL the deferred foreign key checks from these updates are flushed at
+    # commit, before 0010 alters the table.
+
+    dependencies = [
+        ('permitpulse', '0008_clause_body_store'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_clause_bodies, restore_clause_bodies),
+    ]
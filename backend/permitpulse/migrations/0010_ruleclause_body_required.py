@@ -0,0 +1,46 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('permitpulse', '0009_move_clause_bodies'),
+    ]
+
+    operations = [
+        # Defaults only matter when unapplying: the columns are re-added before 0009 copies bodies back.
+        migrations.AlterField(
+            model_name='ruleclause',
+            name='category',
+            field=models.CharField(default='', max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='ruleclause',
+            name='requirement_text',
+            field=models.TextField(default=''),
+        ),
+        migrations.RemoveField(
+            model_name='ruleclause',
+            name='category',
+        ),
+        migrations.RemoveField(
+            model_name='ruleclause',
+            name='condition_expr',
+        ),
+        migrations.RemoveField(
+            model_name='ruleclause',
+            name='penalty_text',
+        ),
+        migrations.RemoveField(
+            model_name='ruleclause',
+            name='requirement_text',
+        ),
+        migrations.AlterField(
+            model_name='ruleclause',
+            name='body',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='memberships', to='permitpulse.clausebody'),
+        ),
+    ]
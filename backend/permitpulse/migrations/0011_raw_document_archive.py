@@ -0,0 +1,39 @@
+# Generated by Django 4.2.28 on 2026-10-18 23:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('permitpulse', '0010_ruleclause_body_required'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RawDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('city_code', models.CharField(choices=[('NYC', 'New York City'), ('LA', 'Los Angeles'), ('SF', 'San Francisco')], max_length=8)),
+                ('source_url', models.URLField(max_length=500)),
+                ('codec', models.CharField(max_length=8)),
+                ('storage_name', models.CharField(max_length=255)),
+                ('raw_size', models.PositiveIntegerField(default=0)),
+                ('compressed_size', models.PositiveIntegerField(default=0)),
+                ('last_fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-last_fetched_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='rulesnapshot',
+            name='raw_document',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='snapshots', to='permitpulse.rawdocument'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:03
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('permitpulse', '0013_maintenance_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CityIngestSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('city_code', models.CharField(max_length=8, unique=True)),
+                ('next_due_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('interval_seconds', models.PositiveIntegerField(default=86400)),
+                ('consecutive_failures', models.PositiveIntegerField(default=0)),
+                ('last_checked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_outcome', models.CharField(blank=True, max_length=32)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['next_due_at'], name='city_schedule_due_idx')],
+            },
+        ),
+    ]
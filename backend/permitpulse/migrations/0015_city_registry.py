@@ -0,0 +1,83 @@
+# Generated by Django 4.2.28 on 2026-10-19 00:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# The cities and sources that were hardcoded in connectors.city_sources before the registry existed.
+INITIAL_CITIES = (
+    ("NYC", "New York City", "https://www.nyc.gov/site/specialenforcement/registration-law/registration-for-hosts.page"),
+    ("LA", "Los Angeles", "https://planning.lacity.gov/plans-policies/initiatives-policies/home-sharing"),
+    ("SF", "San Francisco", "https://www.sf.gov/short-term-rentals"),
+)
+
+
+def seed_cities(apps, schema_editor):
+    City = apps.get_model("permitpulse", "City")
+    CitySource = apps.get_model("permitpulse", "CitySource")
+    for code, name, url in INITIAL_CITIES:
+        city, _ = City.objects.get_or_create(code=code, defaults={"name": name})
+        CitySource.objects.get_or_create(city=city, url=url, defaults={"kind": "html"})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('permitpulse', '0014_city_ingest_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='City',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('code', models.CharField(max_length=8, unique=True)),
+                ('name', models.CharField(max_length=120)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'ordering': ['code'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='addresscheck',
+            name='city_code',
+            field=models.CharField(max_length=8),
+        ),
+        migrations.AlterField(
+            model_name='alert',
+            name='city_code',
+            field=models.CharField(max_length=8),
+        ),
+        migrations.AlterField(
+            model_name='rawdocument',
+            name='city_code',
+            field=models.CharField(max_length=8),
+        ),
+        migrations.AlterField(
+            model_name='rulesnapshot',
+            name='city_code',
+            field=models.CharField(max_length=8),
+        ),
+        migrations.CreateModel(
+            name='CitySource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('url', models.URLField(max_length=500)),
+                ('kind', models.CharField(choices=[('html', 'HTML page'), ('pdf', 'PDF document'), ('api', 'JSON API')], default='html', max_length=8)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('is_active', models.BooleanField(default=True)),
+                ('optional', models.BooleanField(default=False)),
+                ('options', models.JSONField(blank=True, default=dict)),
+                ('city', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sources', to='permitpulse.city')),
+            ],
+            options={
+                'ordering': ['city', 'position', 'id'],
+                'unique_together': {('city', 'url')},
+            },
+        ),
+        migrations.RunPython(seed_cities, migrations.RunPython.noop),
+    ]
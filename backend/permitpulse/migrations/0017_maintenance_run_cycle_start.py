@@ -0,0 +1,57 @@
+# Generated by Django 4.2.28 on 2026-10-19 01:10
+
+from datetime import datetime, time, timezone
+
+from django.db import migrations, models
+
+
+def date_to_cycle_start(apps, schema_editor):
+    # Runs so far were daily, so each one's cycle started at midnight UTC of its date.
+    MaintenanceRun = apps.get_model("permitpulse", "MaintenanceRun")
+    for run in MaintenanceRun.objects.all():
+        run.cycle_start = datetime.combine(run.cycle_date, time(), tzinfo=timezone.utc)
+        run.save(update_fields=["cycle_start"])
+
+
+def cycle_start_to_date(apps, schema_editor):
+    # Several cycles can share a date; only the first of each day is kept.
+    MaintenanceRun = apps.get_model("permitpulse", "MaintenanceRun")
+    seen = set()
+    for run in MaintenanceRun.objects.order_by("cycle_start"):
+        cycle_date = run.cycle_start.date()
+        if cycle_date in seen:
+            run.delete()
+            continue
+        seen.add(cycle_date)
+        run.cycle_date = cycle_date
+        run.save(update_fields=["cycle_date"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('permitpulse', '0016_circuit_breaker'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='maintenancerun',
+            name='cycle_start',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='maintenancerun',
+            name='cycle_date',
+            field=models.DateField(null=True),
+        ),
+        migrations.RunPython(date_to_cycle_start, cycle_start_to_date),
+        migrations.RemoveField(
+            model_name='maintenancerun',
+            name='cycle_date',
+        ),
+        migrations.AlterField(
+            model_name='maintenancerun',
+            name='cycle_start',
+            field=models.DateTimeField(unique=True),
+        ),
+    ]
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import hashlib
+import json
+from typing import Any, Iterable
+
 from django.db import models
 from django.utils import timezone
 
-from permitpulse.constants import CITY_CHOICES, DECISION_MODES, RESULT_GRADES, SNAPSHOT_STATUS
+from permitpulse.constants import DECISION_MODES, RESULT_GRADES, SNAPSHOT_STATUS, SOURCE_KINDS
 
 
 class TimestampedModel(models.Model):
@@ -24,8 +28,54 @@ class Organization(TimestampedModel):
         return self.slug
 
 
+class City(TimestampedModel):
+    """A supported city; its CitySources are fetched and merged into one document per ingest."""
+
+    code = models.CharField(max_length=8, unique=True)
+    name = models.CharField(max_length=120)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["code"]
+
+    def __str__(self) -> str:
+        return self.code
+
+
+class CitySource(TimestampedModel):
+    city = models.ForeignKey(City, related_name="sources", on_delete=models.CASCADE)
+    url = models.URLField(max_length=500)
+    kind = models.CharField(max_length=8, choices=SOURCE_KINDS, default="html")
+    # Sources are merged in this order, so the parsed text (and its checksum) is stable.
+    position = models.PositiveSmallIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+    # Optional sources may fail without failing the ingest; "text_fields" picks the JSON keys of an api source.
+    optional = models.BooleanField(default=False)
+    options = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ["city", "position", "id"]
+        unique_together = ("city", "url")
+
+
+class RawDocument(TimestampedModel):
+    """A fetched city document, stored compressed in the raw_documents storage under its content hash."""
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    city_code = models.CharField(max_length=8)
+    source_url = models.URLField(max_length=500)
+    codec = models.CharField(max_length=8)
+    storage_name = models.CharField(max_length=255)
+    raw_size = models.PositiveIntegerField(default=0)
+    compressed_size = models.PositiveIntegerField(default=0)
+    last_fetched_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-last_fetched_at"]
+
+
 class RuleSnapshot(TimestampedModel):
-    city_code = models.CharField(max_length=8, choices=CITY_CHOICES)
+    city_code = models.CharField(max_length=8)
     version = models.PositiveIntegerField()
     checksum = models.CharField(max_length=128)
     effective_date = models.DateField(default=timezone.now)
@@ -35,25 +85,129 @@ class RuleSnapshot(TimestampedModel):
     parsed_payload = models.JSONField(default=dict)
     is_active = models.BooleanField(default=True)
     published_at = models.DateTimeField(default=timezone.now)
+    raw_document = models.ForeignKey(
+        RawDocument,
+        related_name="snapshots",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
 
     class Meta:
         unique_together = ("city_code", "version")
         ordering = ["-published_at"]
 
 
-class RuleClause(TimestampedModel):
-    snapshot = models.ForeignKey(RuleSnapshot, related_name="clauses", on_delete=models.CASCADE)
-    clause_id = models.CharField(max_length=64)
+CLAUSE_BODY_FIELDS = ("category", "condition_expr", "requirement_text", "penalty_text")
+
+
+def clause_match_metadata(clause: dict[str, Any]) -> dict[str, Any]:
+    """Where a rule-based clause was found in the source text; not part of the shared body."""
+    return {key: clause[key] for key in ("match_count", "matches") if key in clause}
+
+
+def clause_body_fields(clause: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "category": clause["category"],
+        "condition_expr": clause.get("condition_expr") or {},
+        "requirement_text": clause["requirement_text"],
+        "penalty_text": clause.get("penalty_text") or "",
+    }
+
+
+def clause_content_hash(body: dict[str, Any]) -> str:
+    canonical = json.dumps(
+        {name: body[name] for name in CLAUSE_BODY_FIELDS}, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ClauseBodyManager(models.Manager):
+    def intern_many(self, clauses: Iterable[dict[str, Any]]) -> list[ClauseBody]:
+        """Returns the stored body for each clause dict, in order, inserting only bodies not seen before."""
+        bodies = [clause_body_fields(clause) for clause in clauses]
+        hashes = [clause_content_hash(body) for body in bodies]
+        stored = {body.content_hash: body for body in self.filter(content_hash__in=set(hashes))}
+        new = {content_hash: body for content_hash, body in zip(hashes, bodies) if content_hash not in stored}
+        if new:
+            # ignore_conflicts + re-read keeps concurrent publishers from tripping over each other.
+            self.bulk_create(
+                [ClauseBody(content_hash=content_hash, **body) for content_hash, body in new.items()],
+                ignore_conflicts=True,
+            )
+            stored.update({body.content_hash: body for body in self.filter(content_hash__in=new)})
+        return [stored[content_hash] for content_hash in hashes]
+
+
+class ClauseBody(TimestampedModel):
+    """Clause content stored once and shared by every snapshot version that contains it."""
+
+    content_hash = models.CharField(max_length=64, unique=True)
     category = models.CharField(max_length=32)
     condition_expr = models.JSONField(default=dict)
     requirement_text = models.TextField()
     penalty_text = models.TextField(blank=True)
+
+    objects = ClauseBodyManager()
+
+
+class RuleClauseManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().select_related("body")
+
+    def create(self, **kwargs):
+        if "body" not in kwargs:
+            body = {name: kwargs.pop(name) for name in CLAUSE_BODY_FIELDS if name in kwargs}
+            kwargs["body"] = ClauseBody.objects.intern_many([body])[0]
+        return super().create(**kwargs)
+
+    def create_for_snapshot(self, snapshot: RuleSnapshot, clauses: list[dict[str, Any]]) -> list[RuleClause]:
+        bodies = ClauseBody.objects.intern_many(clauses)
+        return self.bulk_create(
+            [
+                RuleClause(
+                    snapshot=snapshot,
+                    clause_id=clause["clause_id"],
+                    body=body,
+                    confidence=float(clause.get("confidence", 0.0)),
+                    metadata=clause_match_metadata(clause),
+                )
+                for clause, body in zip(clauses, bodies)
+            ],
+            batch_size=1000,
+        )
+
+
+class RuleClause(TimestampedModel):
+    """A snapshot's membership row pointing at a shared ClauseBody."""
+
+    snapshot = models.ForeignKey(RuleSnapshot, related_name="clauses", on_delete=models.CASCADE)
+    clause_id = models.CharField(max_length=64)
+    body = models.ForeignKey(ClauseBody, related_name="memberships", on_delete=models.PROTECT)
     confidence = models.FloatField(default=0.0)
     metadata = models.JSONField(default=dict)
 
+    objects = RuleClauseManager()
+
     class Meta:
         unique_together = ("snapshot", "clause_id")
 
+    @property
+    def category(self) -> str:
+        return self.body.category
+
+    @property
+    def condition_expr(self) -> dict[str, Any]:
+        return self.body.condition_expr
+
+    @property
+    def requirement_text(self) -> str:
+        return self.body.requirement_text
+
+    @property
+    def penalty_text(self) -> str:
+        return self.body.penalty_text
+
 
 class AddressCheck(TimestampedModel):
     organization = models.ForeignKey(
@@ -64,12 +218,15 @@ class AddressCheck(TimestampedModel):
         on_delete=models.SET_NULL,
     )
     address = models.CharField(max_length=255)
-    city_code = models.CharField(max_length=8, choices=CITY_CHOICES)
+    city_code = models.CharField(max_length=8)
     result_grade = models.CharField(max_length=16, choices=RESULT_GRADES, default="UNDETERMINED")
     decision_mode = models.CharField(max_length=32, choices=DECISION_MODES, default="AUTO_CONSERVATIVE")
     blocker_flags = models.JSONField(default=list)
     required_actions = models.JSONField(default=list)
     evidence = models.JSONField(default=list)
+    # Compact rows leave the three fields above empty and keep only the applicable RuleClause pks, in order.
+    evidence_compact = models.BooleanField(default=False)
+    evidence_clause_ids = models.JSONField(default=list)
     snapshot = models.ForeignKey(
         RuleSnapshot,
         related_name="address_checks",
@@ -79,6 +236,12 @@ class AddressCheck(TimestampedModel):
     )
     confidence = models.FloatField(default=0.0)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["organization", "-created_at", "-id"], name="addrcheck_org_created_idx"),
+            models.Index(fields=["-created_at", "-id"], name="addrcheck_created_idx"),
+        ]
+
 
 class DecisionTrace(TimestampedModel):
     address_check = models.OneToOneField(
@@ -108,13 +271,20 @@ class Alert(TimestampedModel):
         blank=True,
         on_delete=models.CASCADE,
     )
-    city_code = models.CharField(max_length=8, choices=CITY_CHOICES)
+    city_code = models.CharField(max_length=8)
     change_type = models.CharField(max_length=64)
     impacted_listing_ids = models.JSONField(default=list)
     severity = models.CharField(max_length=16, default="medium")
     message = models.TextField()
     status = models.CharField(max_length=16, default="new")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["organization", "-created_at", "-id"], name="alert_org_created_idx"),
+            models.Index(fields=["-created_at", "-id"], name="alert_created_idx"),
+            models.Index(fields=["organization", "id"], name="alert_org_id_idx"),
+        ]
+
 
 class BillingEvent(TimestampedModel):
     organization = models.ForeignKey(
@@ -170,3 +340,113 @@ class SLOMetric(TimestampedModel):
 
     class Meta:
         ordering = ["-window_end"]
+
+
+class EndpointLatencyRollup(TimestampedModel):
+    endpoint = models.CharField(max_length=128)
+    window_start = models.DateTimeField(default=timezone.now)
+    window_end = models.DateTimeField(default=timezone.now)
+    request_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    p50_ms = models.FloatField(default=0.0)
+    p95_ms = models.FloatField(default=0.0)
+    p99_ms = models.FloatField(default=0.0)
+    max_ms = models.FloatField(default=0.0)
+    query_count = models.PositiveIntegerField(default=0)
+    db_time_ms = models.FloatField(default=0.0)
+    histogram = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ["-window_end"]
+        indexes = [models.Index(fields=["window_end"], name="latency_rollup_window_idx")]
+
+
+class CityIngestSchedule(TimestampedModel):
+    """When a city is next due for ingestion, derived from its change history and recent failures."""
+
+    city_code = models.CharField(max_length=8, unique=True)
+    next_due_at = models.DateTimeField(default=timezone.now)
+    interval_seconds = models.PositiveIntegerField(default=86400)
+    consecutive_failures = models.PositiveIntegerField(default=0)
+    last_checked_at = models.DateTimeField(null=True, blank=True)
+    last_outcome = models.CharField(max_length=32, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["next_due_at"], name="city_schedule_due_idx")]
+
+
+class MaintenanceRun(TimestampedModel):
+    """One maintenance cycle of SCHEDULER_CYCLE_SECONDS, checkpointed so time-limited invocations can resume it."""
+
+    cycle_start = models.DateTimeField(unique=True)
+    status = models.CharField(max_length=16, default="in_progress")
+    checkpoint = models.JSONField(default=dict)
+    invocations = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # The invocation currently working on the cycle; a lease that has expired belongs to a killed invocation.
+    lease_owner = models.CharField(max_length=64, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+
+
+JOB_STATUS = (
+    ("queued", "Queued"),
+    ("running", "Running"),
+    ("succeeded", "Succeeded"),
+    ("failed", "Failed"),
+)
+
+
+class Job(TimestampedModel):
+    """A unit of background work; run_workers claims queued rows with SELECT ... FOR UPDATE SKIP LOCKED."""
+
+    job_type = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=16, choices=JOB_STATUS, default="queued")
+    # Higher runs first.
+    priority = models.SmallIntegerField(default=0)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    locked_by = models.CharField(max_length=128, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    result = models.JSONField(default=dict)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-priority", "run_at", "id"], name="job_claim_idx"),
+            models.Index(fields=["status", "job_type"], name="job_status_type_idx"),
+        ]
+
+
+class ProfileRecord(TimestampedModel):
+    request_id = models.CharField(max_length=64, unique=True)
+    kind = models.CharField(max_length=16, default="request")
+    label = models.CharField(max_length=255)
+    duration_ms = models.FloatField(default=0.0)
+    raw_size = models.PositiveIntegerField(default=0)
+    data = models.BinaryField()
+
+    class Meta:
+        ordering = ["-created_at"]
+
+
+CIRCUIT_STATES = (
+    ("closed", "Closed"),
+    ("open", "Open"),
+    ("half_open", "Half open"),
+)
+
+
+class CircuitBreaker(TimestampedModel):
+    """Health of one upstream dependency (a city host, OpenAI), shared by every process through the DB."""
+
+    name = models.CharField(max_length=255, unique=True)
+    state = models.CharField(max_length=16, choices=CIRCUIT_STATES, default="closed")
+    consecutive_failures = models.PositiveIntegerField(default=0)
+    opened_at = models.DateTimeField(null=True, blank=True)
+    # Open: when a half-open probe may be sent. Half open: when an unanswered probe counts as lost.
+    retry_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import re
+from html.parser import HTMLParser
+from typing import Callable, Iterable
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional; the stdlib backend is always available.
+    etree = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax is optional too.
+    LexborHTMLParser = None
+
+WHITESPACE = re.compile(r"\s+")
+# Elements whose text is not rule text: code, styling, form fields and page furniture repeated on every page.
+BOILERPLATE_ELEMENTS = frozenset(
+    {"script", "style", "template", "noscript", "textarea", "nav", "header", "footer", "aside"}
+)
+# Elements that never hold text and always separate the text around them.
+VOID_ELEMENTS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+)
+# Tree builders merge and move these, so they neither separate text nor count as open elements.
+DOCUMENT_ELEMENTS = frozenset({"html", "head", "body"})
+FEED_CHARS = 64 * 1024
+
+# Every backend feeds TextBuilder the same events, so they produce the same text and checksums do not depend on
+# which one ran. The rules are chosen to survive tree repair: an element separates text only once it turns out to
+# contain some (a stray </p> becomes an empty <p></p> in one parser and nothing in another), stray end tags are
+# ignored (tree builders drop them), and html/head/body are transparent (text before <html> lands in <body>).
+# HTML5 recovery that moves text elsewhere (out of a table, or out of a <noscript> in <head>) or re-opens misnested
+# formatting elements can still differ between lxml and selectolax.
+
+
+def _clean(text: str | None) -> str:
+    return WHITESPACE.sub(" ", text).strip() if text else ""
+
+
+class TextBuilder:
+    """Joins text into nodes: runs of text not separated by a boundary, whitespace-collapsed and stripped, and
+    joined by one space. Elements are boundaries at both ends when they contain text, and transparent otherwise."""
+
+    def __init__(self) -> None:
+        self.pieces: list[str] = []
+        self._node: list[str] = []
+        self._open = 0
+        # Open elements below this depth already hold text, so their opening boundary has been placed.
+        self._with_text = 0
+
+    def boundary(self) -> None:
+        if self._node:
+            text = _clean("".join(self._node))
+            if text:
+                self.pieces.append(text)
+            self._node = []
+
+    def open(self) -> None:
+        self._open += 1
+
+    def close(self) -> None:
+        if self._with_text >= self._open:
+            self.boundary()
+        self._open -= 1
+        self._with_text = min(self._with_text, self._open)
+
+    def text(self, data: str | None) -> None:
+        if not data:
+            return
+        if self._with_text < self._open and not data.isspace():
+            self.boundary()
+            self._with_text = self._open
+        self._node.append(data)
+
+    def result(self) -> str:
+        self.boundary()
+        return " ".join(self.pieces)
+
+
+class TextExtractor(HTMLParser):
+    """Incremental HTML-to-text on the stdlib tokenizer, without building a DOM."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.builder = TextBuilder()
+        self._open: list[str] = []
+        self._skipping: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._skipping:
+            if tag in BOILERPLATE_ELEMENTS:
+                self._skipping.append(tag)
+        elif tag in BOILERPLATE_ELEMENTS:
+            self.builder.boundary()
+            self._skipping.append(tag)
+        elif tag in VOID_ELEMENTS:
+            self.builder.boundary()
+        elif tag not in DOCUMENT_ELEMENTS:
+            self._open.append(tag)
+            self.builder.open()
+
+    def handle_startendtag(self, tag, attrs):
+        # Tree builders ignore the slash: <span/> opens a span like <span> does.
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if self._skipping:
+            if tag in self._skipping:
+                # Close the innermost open element of that name, like a tree builder would.
+                del self._skipping[len(self._skipping) - 1 - self._skipping[::-1].index(tag) :]
+                if not self._skipping:
+                    self.builder.boundary()
+        elif tag in self._open:
+            # Closes everything opened inside it too; an end tag with nothing to close is dropped.
+            while self._open.pop() != tag:
+                self.builder.close()
+            self.builder.close()
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.builder.text(data)
+
+    def handle_comment(self, data):
+        self.builder.boundary()
+
+    def handle_decl(self, decl):
+        self.builder.boundary()
+
+    def handle_pi(self, data):
+        self.builder.boundary()
+
+    def unknown_decl(self, data):
+        # HTML has no CDATA sections outside SVG and MathML; tree builders read them as comments.
+        self.builder.boundary()
+
+    def close(self) -> None:
+        super().close()
+        while self._open:
+            self._open.pop()
+            self.builder.close()
+
+    def text(self) -> str:
+        return self.builder.result()
+
+
+def iter_chunks(content: str, size: int = FEED_CHARS) -> Iterable[str]:
+    for start in range(0, len(content), size):
+        yield content[start : start + size]
+
+
+def extract_text(chunks: Iterable[str]) -> str:
+    """Normalized text of an HTML document supplied in pieces; memory stays proportional to the text, not a DOM."""
+    extractor = TextExtractor()
+    for chunk in chunks:
+        extractor.feed(chunk)
+    extractor.close()
+    return extractor.text()
+
+
+def _stdlib_text(content: str) -> str:
+    return extract_text(iter_chunks(content))
+
+
+def _lxml_text(content: str) -> str:
+    parser = etree.HTMLParser(recover=True, no_network=True)
+    for chunk in iter_chunks(content):
+        parser.feed(chunk)
+    try:
+        root = parser.close()
+    except etree.XMLSyntaxError:  # An empty or whitespace-only document has no root element.
+        return ""
+    if root is None:
+        return ""
+    builder = TextBuilder()
+    # Iterative, as pages can nest deeper than the recursion limit. Each stack entry is an element whose children
+    # are being walked and whether it was opened on the builder; its tail follows once they are done.
+    builder.text(root.text)
+    stack = [(root, iter(root), False)]
+    while stack:
+        element, children, opened = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if opened:
+                builder.close()
+            if stack:
+                builder.text(element.tail)
+            continue
+        tag = child.tag if isinstance(child.tag, str) else None
+        if tag is None or tag in BOILERPLATE_ELEMENTS or tag in VOID_ELEMENTS:
+            # Comments and processing instructions (non-string tags) only add their tails.
+            builder.boundary()
+            builder.text(child.tail)
+            continue
+        opened = tag not in DOCUMENT_ELEMENTS
+        if opened:
+            builder.open()
+        builder.text(child.text)
+        stack.append((child, iter(child), opened))
+    return builder.result()
+
+
+def _selectolax_text(content: str) -> str:
+    tree = LexborHTMLParser(content)
+    builder = TextBuilder()
+    node = tree.root
+    # Iterative walk over the child/next/parent links; `opened` holds, for each element being walked, whether it was
+    # opened on the builder, and it is closed when the walk climbs back out of it.
+    opened: list[bool] = []
+    while node is not None:
+        tag = node.tag
+        if tag == "-text":
+            builder.text(node.text_content)
+        elif tag is None or tag.startswith("-") or tag in BOILERPLATE_ELEMENTS or tag in VOID_ELEMENTS:
+            # Comments and doctypes are "-comment" and "-doctype"; processing instructions have no tag.
+            builder.boundary()
+        else:
+            is_opened = tag not in DOCUMENT_ELEMENTS
+            if is_opened:
+                builder.open()
+            child = node.child
+            if child is not None:
+                opened.append(is_opened)
+                node = child
+                continue
+            if is_opened:
+                builder.close()
+        following = node.next
+        while following is None:
+            if not opened:
+                return builder.result()
+            node = node.parent
+            if opened.pop():
+                builder.close()
+            following = node.next
+        node = following
+    return builder.result()
+
+
+BACKENDS: dict[str, Callable[[str], str]] = {"stdlib": _stdlib_text}
+if etree is not None:
+    BACKENDS["lxml"] = _lxml_text
+if LexborHTMLParser is not None:
+    BACKENDS["selectolax"] = _selectolax_text
+# "auto" picks the first installed, fastest first.
+AUTO_ORDER = ("selectolax", "lxml", "stdlib")
+
+
+def available_backend(preferred: str) -> str:
+    """The preferred backend when it is installed here, otherwise the fastest one that is."""
+    if preferred != "auto" and preferred not in AUTO_ORDER:
+        raise ValueError(f"Unknown HTML backend '{preferred}'. Available: auto, {', '.join(AUTO_ORDER)}")
+    if preferred in BACKENDS:
+        return preferred
+    return next(name for name in AUTO_ORDER if name in BACKENDS)
+
+
+def html_to_text(content: str, backend: str = "auto") -> str:
+    return BACKENDS[available_backend(backend)](content)
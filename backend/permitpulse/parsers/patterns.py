@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import copy
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator
+
+DEFAULT_PATTERNS_FILE = Path(__file__).with_name("rule_patterns.json")
+REQUIRED_KEYS = ("clause_id", "category", "requirement_text", "confidence", "phrases")
+WHITESPACE = re.compile(r"\s+")
+SENTENCE_BREAK = re.compile(r"[.!?](?=\s|$)")
+# How far a sentence span reaches either side of a match, for text without punctuation.
+SENTENCE_WINDOW = 300
+_END = ""
+
+
+@dataclass(frozen=True)
+class PatternRule:
+    """A clause template and the phrases that trigger it."""
+
+    template: dict[str, Any]
+    phrases: tuple[str, ...]
+
+    @property
+    def clause_id(self) -> str:
+        return self.template["clause_id"]
+
+
+@dataclass(frozen=True)
+class PatternMatch:
+    rule_index: int
+    phrase: str
+    start: int
+    end: int
+
+
+def _phrase_key(text: str) -> str:
+    return WHITESPACE.sub(" ", text).strip().lower()
+
+
+def load_pattern_rules(path: str | Path) -> list[PatternRule]:
+    """Reads a pattern registry: a JSON list of clause templates, each with the `phrases` that trigger it."""
+    with open(path, encoding="utf-8") as handle:
+        entries = json.load(handle)
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: expected a list of pattern rules")
+    rules: list[PatternRule] = []
+    seen: set[str] = set()
+    for position, entry in enumerate(entries):
+        missing = [key for key in REQUIRED_KEYS if not isinstance(entry, dict) or key not in entry]
+        if missing:
+            raise ValueError(f"{path}: rule {position} is missing {', '.join(missing)}")
+        phrases = entry["phrases"]
+        if not isinstance(phrases, list) or not phrases or not all(isinstance(p, str) and p.strip() for p in phrases):
+            raise ValueError(f"{path}: rule {entry['clause_id']} needs a non-empty list of phrases")
+        if entry["clause_id"] in seen:
+            raise ValueError(f"{path}: duplicate clause_id {entry['clause_id']}")
+        seen.add(entry["clause_id"])
+        template = {key: value for key, value in entry.items() if key != "phrases"}
+        template.setdefault("condition_expr", {})
+        template.setdefault("penalty_text", "")
+        rules.append(PatternRule(template=template, phrases=tuple(_phrase_key(p) for p in phrases)))
+    return rules
+
+
+def _trie_regex(node: dict[str, dict]) -> str:
+    branches = [
+        (r"\s+" if char == " " else re.escape(char)) + _trie_regex(child)
+        for char, child in sorted(node.items())
+        if char != _END
+    ]
+    if not branches:
+        return ""
+    if len(branches) == 1 and _END not in node:
+        return branches[0]
+    body = f"(?:{'|'.join(branches)})"
+    return f"{body}?" if _END in node else body
+
+
+def phrase_regex(phrases: list[str]) -> re.Pattern:
+    """One case-insensitive regex for all phrases, shaped as a trie so each text position is tried against
+    shared prefixes once rather than against every phrase. The longest phrase starting at a word wins."""
+    trie: dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[_END] = {}
+    return re.compile(rf"\b{_trie_regex(trie)}", re.IGNORECASE)
+
+
+def sentence_span(text: str, start: int, end: int) -> tuple[int, int]:
+    """Offsets of the sentence around text[start:end], bounded by SENTENCE_WINDOW on either side."""
+    floor = max(0, start - SENTENCE_WINDOW)
+    left = floor
+    for found in SENTENCE_BREAK.finditer(text, floor, start):
+        left = found.end()
+    while left < start and text[left].isspace():
+        left += 1
+    found = SENTENCE_BREAK.search(text, end, min(len(text), end + SENTENCE_WINDOW))
+    right = found.end() if found else min(len(text), end + SENTENCE_WINDOW)
+    return left, right
+
+
+class PatternMatcher:
+    """Finds every registry phrase in one pass over the text.
+
+    Phrases are case-insensitive and match at the start of a word, so "register" also covers "registered" and
+    "registration". Matches do not overlap; at any position the longest phrase is reported.
+    """
+
+    def __init__(self, rules: list[PatternRule]) -> None:
+        self.rules = rules
+        self._rules_by_phrase: dict[str, list[int]] = {}
+        for index, rule in enumerate(rules):
+            for phrase in rule.phrases:
+                self._rules_by_phrase.setdefault(phrase, []).append(index)
+        self.phrase_count = len(self._rules_by_phrase)
+        self._regex = phrase_regex(list(self._rules_by_phrase))
+
+    def finditer(self, text: str) -> Iterator[PatternMatch]:
+        for found in self._regex.finditer(text):
+            phrase = _phrase_key(found.group())
+            for rule_index in self._rules_by_phrase.get(phrase, ()):
+                yield PatternMatch(rule_index, phrase, found.start(), found.end())
+
+    def extract(self, text: str, evidence_limit: int) -> list[dict[str, Any]]:
+        """Clauses for the rules that matched, in registry order.
+
+        Each clause carries `match_count` and, for its first `evidence_limit` matches, `matches` with the phrase,
+        its offsets and the surrounding sentence.
+        """
+        counts = [0] * len(self.rules)
+        evidence: list[list[dict[str, Any]]] = [[] for _ in self.rules]
+        for match in self.finditer(text):
+            counts[match.rule_index] += 1
+            if len(evidence[match.rule_index]) < evidence_limit:
+                sentence_start, sentence_end = sentence_span(text, match.start, match.end)
+                evidence[match.rule_index].append(
+                    {
+                        "phrase": match.phrase,
+                        "start": match.start,
+                        "end": match.end,
+                        "sentence_start": sentence_start,
+                        "sentence_end": sentence_end,
+                        "sentence": text[sentence_start:sentence_end],
+                    }
+                )
+        clauses = []
+        for index, rule in enumerate(self.rules):
+            if counts[index]:
+                clause = copy.deepcopy(rule.template)
+                clause["match_count"] = counts[index]
+                clause["matches"] = evidence[index]
+                clauses.append(clause)
+        return clauses
+
+
+@lru_cache(maxsize=4)
+def pattern_matcher(path: str | Path = DEFAULT_PATTERNS_FILE) -> PatternMatcher:
+    """The compiled matcher for a registry file, built once per process."""
+    return PatternMatcher(load_pattern_rules(path))
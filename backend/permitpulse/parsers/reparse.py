@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Any
+
+import django
+from django.test import override_settings
+
+from permitpulse.compression import decompress
+from permitpulse.connectors.city_sources import RawRuleDocument
+from permitpulse.parsers.rule_parser import parse_rule_document
+
+
+# Process-pool workers for reparse_archive. This module imports no models, so spawned workers can unpickle
+# these functions before Django is set up; they get compressed bytes from the parent and never touch the DB.
+
+
+def init_worker() -> None:
+    django.setup()
+
+
+def reparse_archived(job: dict[str, Any]) -> dict[str, Any]:
+    content = decompress(job["codec"], job["data"]).decode("utf-8")
+    document = RawRuleDocument(city_code=job["city_code"], source_url=job["source_url"], content=content)
+    # Without an API key the parser skips the LLM pass, so reparsing stays offline and deterministic.
+    with override_settings(OPENAI_API_KEY=""):
+        draft = parse_rule_document(document)
+    return {"raw_document_id": job["raw_document_id"], "checksum": draft.checksum, "clauses": draft.clauses}
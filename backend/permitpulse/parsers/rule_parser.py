@@ -2,15 +2,22 @@ from __future__ import annotations
 
 import hashlib
 import json
-import re
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
 
-from bs4 import BeautifulSoup
 from django.conf import settings
 import requests
 
 from permitpulse.connectors.city_sources import RawRuleDocument
+from permitpulse.parsers.html_text import available_backend, html_to_text
+from permitpulse.parsers.patterns import pattern_matcher, sentence_span
+from permitpulse.rate_limit import llm_limiter, retry_after_seconds
+from permitpulse.tracing import start_span
+
+LLM_MODEL = "gpt-4.1-mini"
+LLM_INPUT_CHARS = 20000
+# Rate-limit budget per call: ~4 characters per input token plus room for the JSON answer.
+LLM_OUTPUT_TOKEN_ALLOWANCE = 2000
 
 
 @dataclass
@@ -23,50 +30,24 @@ class ParsedRuleDraft:
 
 
 def _normalize_text(content: str) -> str:
-    soup = BeautifulSoup(content, "html.parser")
-    text = soup.get_text(" ", strip=True)
-    return re.sub(r"\s+", " ", text)
+    backend = available_backend(settings.HTML_NORMALIZER_BACKEND)
+    with start_span("parser.normalize_text", input_chars=len(content), backend=backend) as span:
+        normalized = html_to_text(content, backend)
+        span.set_attribute("output_chars", len(normalized))
+        return normalized
 
 
 def _rule_based_extract(text: str) -> list[dict[str, Any]]:
-    lowered = text.lower()
-    clauses: list[dict[str, Any]] = []
+    matcher = pattern_matcher(settings.RULE_PATTERNS_FILE)
+    with start_span("parser.rule_based_extract", input_chars=len(text), phrase_count=matcher.phrase_count) as span:
+        clauses = _match_rule_templates(text)
+        span.set_attribute("match_count", sum(clause.get("match_count", 0) for clause in clauses))
+        span.set_attribute("clause_count", len(clauses))
+        return clauses
 
-    if "register" in lowered or "registration" in lowered:
-        clauses.append(
-            {
-                "clause_id": "registration-required",
-                "category": "requirement",
-                "condition_expr": {},
-                "requirement_text": "Host registration is required before listing.",
-                "penalty_text": "Listings may be removed if unregistered.",
-                "confidence": 0.85,
-            }
-        )
-    if "primary residence" in lowered:
-        clauses.append(
-            {
-                "clause_id": "primary-residence",
-                "category": "prohibition",
-                "condition_expr": {
-                    "not": {"field": "property.is_primary_residence", "op": "eq", "value": True}
-                },
-                "requirement_text": "Only primary residences may be rented short-term.",
-                "penalty_text": "Non-primary homes are prohibited for STR operations.",
-                "confidence": 0.82,
-            }
-        )
-    if "tax" in lowered:
-        clauses.append(
-            {
-                "clause_id": "tax-registration",
-                "category": "tax",
-                "condition_expr": {},
-                "requirement_text": "Transient occupancy tax registration is required.",
-                "penalty_text": "Financial penalties may apply for unpaid taxes.",
-                "confidence": 0.78,
-            }
-        )
+
+def _match_rule_templates(text: str) -> list[dict[str, Any]]:
+    clauses = pattern_matcher(settings.RULE_PATTERNS_FILE).extract(text, settings.RULE_EVIDENCE_PER_CLAUSE)
 
     if not clauses:
         clauses.append(
@@ -98,6 +79,60 @@ def _extract_response_text(payload: dict[str, Any]) -> str:
 def _llm_schema_extract(text: str) -> list[dict[str, Any]]:
     if not settings.OPENAI_API_KEY:
         return []
+    # Imported here: this module must stay importable without Django set up (parsers.reparse workers).
+    from permitpulse.services.circuit_breaker import CircuitOpenError, blocked, record_outcome
+
+    tokens = len(text[:LLM_INPUT_CHARS]) // 4 + LLM_OUTPUT_TOKEN_ALLOWANCE
+    with start_span("parser.llm_schema_extract", input_chars=len(text), model=LLM_MODEL, tokens=tokens) as span:
+        queue_wait = 0.0
+        throttled = 0
+        attempted = False
+        last_error: Optional[Exception] = None
+        try:
+            for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+                with llm_limiter.slot(tokens) as waited:
+                    queue_wait += waited
+                    if not attempted and "openai" in blocked(["openai"]):
+                        raise CircuitOpenError("circuit openai is open")
+                    attempted = True
+                    try:
+                        clauses = _request_llm_clauses(text)
+                        last_error = None
+                        break
+                    except Exception as exc:
+                        last_error = exc
+                        response = getattr(exc, "response", None)
+                        if not isinstance(exc, requests.HTTPError) or response is None or response.status_code != 429:
+                            raise
+                        if attempt == settings.OPENAI_MAX_RETRIES:
+                            raise
+                        throttled += 1
+                        delay = retry_after_seconds(
+                            response.headers,
+                            attempt,
+                            settings.OPENAI_RETRY_BASE_SECONDS,
+                            settings.OPENAI_RETRY_MAX_SECONDS,
+                        )
+                # Every caller backs off, not just this one; the next slot() waits out the pause.
+                llm_limiter.pause(delay)
+        except Exception as exc:  # noqa: BLE001
+            # The rule-based clauses still stand; an open circuit skips the call instead of waiting out the timeout.
+            span.set_attribute("error", type(exc).__name__)
+            return []
+        finally:
+            # One breaker outcome per call: 429s the retries absorb are the limiter's to handle, and only a call
+            # still failing once they run out counts against OpenAI.
+            if attempted:
+                record_outcome("openai", last_error)
+            span.set_attribute("queue_wait_ms", round(queue_wait * 1000, 1))
+            span.set_attribute("throttled", throttled)
+            for key, value in llm_limiter.stats().items():
+                span.set_attribute(f"limiter.{key}", value)
+        span.set_attribute("clause_count", len(clauses))
+        return clauses
+
+
+def _request_llm_clauses(text: str) -> list[dict[str, Any]]:
     schema = {
         "type": "object",
         "properties": {
@@ -129,69 +164,92 @@ def _llm_schema_extract(text: str) -> list[dict[str, Any]]:
         "additionalProperties": False,
     }
 
-    try:
-        response = requests.post(
-            "https://api.openai.com/v1/responses",
-            headers={
-                "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "gpt-4.1-mini",
-                "input": [
-                    {
-                        "role": "system",
-                        "content": (
-                            "Extract short-term rental regulations into normalized JSON clauses. "
-                            "Use conservative confidence values."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": text[:20000],
-                    },
-                ],
-                "text": {
-                    "format": {
-                        "type": "json_schema",
-                        "name": "str_rules",
-                        "schema": schema,
-                        "strict": True,
-                    }
+    response = requests.post(
+        "https://api.openai.com/v1/responses",
+        headers={
+            "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
+            "Content-Type": "application/json",
+        },
+        json={
+            "model": LLM_MODEL,
+            "input": [
+                {
+                    "role": "system",
+                    "content": (
+                        "Extract short-term rental regulations into normalized JSON clauses. "
+                        "Use conservative confidence values."
+                    ),
+                },
+                {
+                    "role": "user",
+                    "content": text[:20000],
                 },
+            ],
+            "text": {
+                "format": {
+                    "type": "json_schema",
+                    "name": "str_rules",
+                    "schema": schema,
+                    "strict": True,
+                }
             },
-            timeout=30,
-        )
-        response.raise_for_status()
-        payload = response.json()
-        raw_text = _extract_response_text(payload)
-        if not raw_text:
-            return []
-        parsed = json.loads(raw_text)
-        clauses = parsed.get("clauses", [])
-        if not isinstance(clauses, list):
-            return []
-        return [clause for clause in clauses if isinstance(clause, dict)]
-    except Exception:  # noqa: BLE001
+        },
+        timeout=30,
+    )
+    response.raise_for_status()
+    payload = response.json()
+    raw_text = _extract_response_text(payload)
+    if not raw_text:
         return []
+    parsed = json.loads(raw_text)
+    clauses = parsed.get("clauses", [])
+    if not isinstance(clauses, list):
+        return []
+    return [clause for clause in clauses if isinstance(clause, dict)]
 
 
-def parse_rule_document(document: RawRuleDocument) -> ParsedRuleDraft:
-    normalized_text = _normalize_text(document.content)
-    checksum = hashlib.sha256(normalized_text.encode("utf-8")).hexdigest()
+def normalize_document(document: RawRuleDocument) -> str:
+    return _normalize_text(document.content)
 
-    rule_based_clauses = _rule_based_extract(normalized_text)
-    llm_clauses = _llm_schema_extract(normalized_text)
 
-    merged = rule_based_clauses + [c for c in llm_clauses if c.get("clause_id") not in {x["clause_id"] for x in rule_based_clauses}]
+def text_checksum(normalized_text: str) -> str:
+    return hashlib.sha256(normalized_text.encode("utf-8")).hexdigest()
 
-    confidence_scores = [float(item.get("confidence", 0.0)) for item in merged]
-    validation_score = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
 
-    return ParsedRuleDraft(
-        checksum=checksum,
-        validation_score=round(validation_score, 4),
-        clauses=merged,
-        source_urls=[document.source_url],
-        parser_traces=["rule_based", "llm_schema_extract"],
-    )
+def rule_sentence_digest(normalized_text: str) -> str:
+    """Digest of every sentence the rule-based pass matches, with the rule it matched: equal digests mean no
+    sentence that triggers a clause changed, however small the edit ("may rent" to "may not rent")."""
+    matcher = pattern_matcher(settings.RULE_PATTERNS_FILE)
+    digest = hashlib.sha256()
+    for match in matcher.finditer(normalized_text):
+        start, end = sentence_span(normalized_text, match.start, match.end)
+        clause_id = matcher.rules[match.rule_index].clause_id
+        digest.update(f"{clause_id}\n{normalized_text[start:end]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def parse_rule_document(document: RawRuleDocument, normalized_text: Optional[str] = None) -> ParsedRuleDraft:
+    """`normalized_text` is the document's normalize_document() output, when the caller already has it."""
+    with start_span("parser.parse_rule_document", city_code=document.city_code) as span:
+        if normalized_text is None:
+            normalized_text = normalize_document(document)
+        checksum = text_checksum(normalized_text)
+
+        rule_based_clauses = _rule_based_extract(normalized_text)
+        llm_clauses = _llm_schema_extract(normalized_text)
+
+        merged = rule_based_clauses + [c for c in llm_clauses if c.get("clause_id") not in {x["clause_id"] for x in rule_based_clauses}]
+
+        confidence_scores = [float(item.get("confidence", 0.0)) for item in merged]
+        validation_score = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
+
+        span.set_attribute("checksum", checksum)
+        span.set_attribute("clause_count", len(merged))
+        span.set_attribute("llm_clause_count", len(llm_clauses))
+        return ParsedRuleDraft(
+            checksum=checksum,
+            validation_score=round(validation_score, 4),
+            clauses=merged,
+            source_urls=document.source_urls or [document.source_url],
+            parser_traces=["rule_based", "llm_schema_extract"],
+        )
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+from typing import Iterable
+
+SHINGLE_WORDS = 5
+SKETCH_SIZE = 256
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> set[str]:
+    """Overlapping runs of `size` lowercased words; texts shorter than that are a single shingle."""
+    words = text.lower().split()
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[index : index + size]) for index in range(len(words) - size + 1)}
+
+
+def _hash(shingle: str) -> int:
+    # Stable across processes (unlike hash()), since sketches are stored with snapshots.
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def minhash_sketch(text: str, size: int = SKETCH_SIZE) -> list[int]:
+    """Bottom-k MinHash of the text's shingles: the `size` smallest shingle hashes, ascending."""
+    return heapq.nsmallest(size, {_hash(shingle) for shingle in shingles(text)})
+
+
+def number_digest(text: str) -> str:
+    """Digest of every word containing a digit, with the word either side of it. Caps, fees and dates live in
+    numbers, and changing one alters only a few shingles, far too few for a sketch to notice; equal digests mean no
+    number changed. The narrow context keeps text added next to a number from counting as a change to it."""
+    words = text.lower().split()
+    contexts = sorted(
+        " ".join(words[max(0, index - 1) : index + 2])
+        for index, word in enumerate(words)
+        if any(char.isdigit() for char in word)
+    )
+    digest = hashlib.blake2b(digest_size=16)
+    for context in contexts:
+        digest.update(context.encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+
+def estimate_similarity(first: Iterable[int], second: Iterable[int], size: int = SKETCH_SIZE) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two sketches; exact when both sets are smaller
+    than `size`. The k smallest hashes of the union are a uniform sample of it, and the share of them found in
+    both sketches estimates the share of shingles the texts have in common."""
+    first, second = set(first), set(second)
+    if not first and not second:
+        return 1.0
+    union = heapq.nsmallest(size, first | second)
+    return sum(1 for value in union if value in first and value in second) / len(union)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import cProfile
+import hmac
+import io
+import logging
+import marshal
+import pstats
+import random
+import re
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.http import HttpRequest
+
+from permitpulse.models import ProfileRecord
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+UNSAFE_ID_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def request_id_for(request: HttpRequest) -> str:
+    return (request.headers.get("X-Request-ID") or uuid.uuid4().hex)[:64]
+
+
+def new_profile_id(request_id: Optional[str] = None) -> str:
+    """A fresh id for every profile. The caller's request id is kept as a readable prefix, so reusing one can't
+    overwrite someone else's profile."""
+    prefix = UNSAFE_ID_CHARS.sub("", request_id or "")[:31]
+    return f"{prefix}-{uuid.uuid4().hex}" if prefix else uuid.uuid4().hex
+
+
+def should_profile(request: HttpRequest) -> bool:
+    token = settings.PROFILING_TOKEN
+    if token and hmac.compare_digest(request.headers.get(PROFILE_TOKEN_HEADER, ""), token):
+        return True
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+@contextmanager
+def profiled(kind: str, label: str, request_id: Optional[str] = None) -> Iterator[dict]:
+    """Runs the block under cProfile and stores the compressed stats as a ProfileRecord.
+
+    Yields a dict that carries the profile id (see new_profile_id) and, after the block, the stored record.
+    Failing to store the profile is logged and never fails the profiled work.
+    """
+    state = {"request_id": new_profile_id(request_id), "record": None}
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield state
+    finally:
+        profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+        try:
+            profiler.create_stats()
+            # Same layout as Profile.dump_stats, so downloads load directly into pstats/snakeviz.
+            raw = marshal.dumps(profiler.stats)
+            state["record"] = ProfileRecord.objects.create(
+                request_id=state["request_id"],
+                kind=kind,
+                label=label[:255],
+                duration_ms=round(duration_ms, 3),
+                raw_size=len(raw),
+                data=zlib.compress(raw, 6),
+            )
+        except Exception:  # noqa: BLE001
+            logger.exception("failed to store profile %s", state["request_id"])
+
+
+def profile_bytes(record: ProfileRecord) -> bytes:
+    return zlib.decompress(bytes(record.data))
+
+
+def profile_summary(record: ProfileRecord, limit: int = 40) -> str:
+    out = io.StringIO()
+    stats = pstats.Stats(stream=out)
+    stats.stats = marshal.loads(profile_bytes(record))
+    stats.get_top_level_stats()
+    stats.sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
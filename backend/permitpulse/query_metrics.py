@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from django.db import connections
+
+# Maximum queries per request, keyed by (URL name, method). Enforced by the test suite and logged
+# when exceeded at runtime, so N+1 regressions in serializers or services surface early.
+QUERY_BUDGETS: dict[tuple[str, str], int] = {
+    ("address-checks", "POST"): 8,  # +1 when the active-city cache has expired
+    ("address-checks", "GET"): 3,  # +1 when compact evidence misses the clause cache
+    ("address-check-detail", "GET"): 2,
+    ("portfolio-import", "POST"): 7,  # any number of rows and cities: snapshots load and checks insert in bulk
+    ("city-rules-latest", "GET"): 2,
+    ("alerts-list", "GET"): 2,
+    ("checkout-session", "POST"): 1,
+    ("billing-webhook", "POST"): 9,
+    ("autonomy-status", "GET"): 3,
+    ("supabase-status", "GET"): 2,
+    ("system-slo", "GET"): 2,
+}
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration_ms: float = 0.0
+
+
+class _QueryCounter:
+    def __init__(self, stats: QueryStats) -> None:
+        self.stats = stats
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.stats.count += 1
+            self.stats.duration_ms += (time.perf_counter() - started) * 1000
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Counts queries and DB time across every configured database inside the block."""
+    stats = QueryStats()
+    counter = _QueryCounter(stats)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield stats
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Iterator, Optional
+
+from django.conf import settings
+
+
+class RateLimitTimeout(RuntimeError):
+    """A caller waited longer than allowed for a rate-limit or concurrency slot."""
+
+
+class TokenBucket:
+    """`per_minute` units, refilled continuously; a burst may use the whole minute's allowance at once."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self, amount: float, now: float) -> float:
+        """Takes `amount` and returns 0, or takes nothing and returns the seconds until it would be available."""
+        amount = min(amount, self.capacity)
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.available >= amount:
+            self.available -= amount
+            return 0.0
+        return (amount - self.available) / self.rate
+
+
+class RateLimiter:
+    """Process-wide limits for one API: requests and tokens per minute plus a cap on concurrent calls.
+
+    Callers queue (up to `max_wait_seconds`) instead of failing; `pause` holds everyone back after a 429.
+    """
+
+    def __init__(
+        self, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int, max_wait_seconds: float
+    ) -> None:
+        self.max_wait_seconds = max_wait_seconds
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._recent: deque[tuple[float, int]] = deque()
+        self.in_flight = 0
+        self.throttled = 0
+
+    def _wait_for_budget(self, tokens: int, deadline: float) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = self._paused_until - now
+                if delay <= 0:
+                    delay = self._requests.take(1, now)
+                if delay <= 0:
+                    delay = self._tokens.take(tokens, now)
+                    if delay > 0:
+                        # Give the request back; both are taken together or not at all.
+                        self._requests.available += 1
+                if delay <= 0:
+                    self._recent.append((now, tokens))
+                    return
+            if now + delay > deadline:
+                raise RateLimitTimeout(f"rate limit slot not available within {self.max_wait_seconds}s")
+            time.sleep(delay)
+
+    @contextmanager
+    def slot(self, tokens: int) -> Iterator[float]:
+        """Waits for a concurrency slot and request/token budget; yields the seconds spent waiting."""
+        started = time.monotonic()
+        deadline = started + self.max_wait_seconds
+        if not self._slots.acquire(timeout=self.max_wait_seconds):
+            raise RateLimitTimeout(f"no concurrency slot within {self.max_wait_seconds}s")
+        try:
+            self._wait_for_budget(tokens, deadline)
+            with self._lock:
+                self.in_flight += 1
+            try:
+                yield time.monotonic() - started
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+        finally:
+            self._slots.release()
+
+    def pause(self, seconds: float) -> None:
+        """Holds back every caller for `seconds`, e.g. after a 429."""
+        with self._lock:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict[str, Any]:
+        """Throughput over the last minute and current load, for trace attributes."""
+        with self._lock:
+            cutoff = time.monotonic() - 60
+            while self._recent and self._recent[0][0] < cutoff:
+                self._recent.popleft()
+            return {
+                "requests_last_minute": len(self._recent),
+                "tokens_last_minute": sum(tokens for _, tokens in self._recent),
+                "in_flight": self.in_flight,
+                "throttled_total": self.throttled,
+            }
+
+
+def retry_after_seconds(headers: Any, attempt: int, base: float, maximum: float) -> float:
+    """The server's Retry-After (seconds or an HTTP date) when given, else exponential backoff from `base`."""
+    value: Optional[str] = headers.get("Retry-After") if headers else None
+    if value:
+        try:
+            return min(max(float(value), 0.0), maximum)
+        except ValueError:
+            try:
+                return min(max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0), maximum)
+            except (TypeError, ValueError):
+                pass
+    return min(base * 2**attempt, maximum)
+
+
+llm_limiter = RateLimiter(
+    requests_per_minute=settings.OPENAI_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.OPENAI_TOKENS_PER_MINUTE,
+    max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+    max_wait_seconds=settings.OPENAI_MAX_QUEUE_SECONDS,
+)
@@ -3,9 +3,16 @@ from __future__ import annotations
 from rest_framework import serializers
 
 from permitpulse import models
+from permitpulse.services.city_registry import active_city_codes
+from permitpulse.services.evidence import expand_evidence, warm_clause_cache
 
 
 class RuleClauseSerializer(serializers.ModelSerializer):
+    category = serializers.CharField(source="body.category", read_only=True)
+    condition_expr = serializers.JSONField(source="body.condition_expr", read_only=True)
+    requirement_text = serializers.CharField(source="body.requirement_text", read_only=True)
+    penalty_text = serializers.CharField(source="body.penalty_text", read_only=True)
+
     class Meta:
         model = models.RuleClause
         fields = (
@@ -39,15 +46,41 @@ class RuleSnapshotSerializer(serializers.ModelSerializer):
 
 class AddressCheckRequestSerializer(serializers.Serializer):
     address = serializers.CharField(max_length=255)
-    city_code = serializers.ChoiceField(choices=["NYC", "LA", "SF"])
+    city_code = serializers.CharField(max_length=8)
     context = serializers.JSONField(required=False, default=dict)
 
+    def validate_city_code(self, value: str) -> str:
+        value = value.upper()
+        if value not in active_city_codes():
+            raise serializers.ValidationError(f'"{value}" is not a supported city.')
+        return value
+
+
+class SparseFieldsMixin:
+    """Lets callers narrow a serializer with `fields=[...]` or drop fields with `omit=[...]`."""
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+
+class AddressCheckListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        checks = list(data.all() if hasattr(data, "all") else data)
+        warm_clause_cache(checks)
+        return super().to_representation(checks)
 
-class AddressCheckSerializer(serializers.ModelSerializer):
+
+class AddressCheckSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     provenance = serializers.SerializerMethodField()
 
     class Meta:
         model = models.AddressCheck
+        list_serializer_class = AddressCheckListSerializer
         fields = (
             "id",
             "address",
@@ -62,6 +95,15 @@ class AddressCheckSerializer(serializers.ModelSerializer):
             "provenance",
         )
 
+    def to_representation(self, instance: models.AddressCheck) -> dict:
+        data = super().to_representation(instance)
+        if instance.evidence_compact and {"evidence", "blocker_flags", "required_actions"} & data.keys():
+            evidence, blockers, actions = expand_evidence(instance)
+            for name, value in (("blocker_flags", blockers), ("required_actions", actions), ("evidence", evidence)):
+                if name in data:
+                    data[name] = value
+        return data
+
     def get_provenance(self, obj: models.AddressCheck) -> dict:
         if not obj.snapshot:
             return {"snapshot_id": None, "checksum": None, "source_urls": []}
@@ -119,17 +161,28 @@ class SLOMetricSerializer(serializers.ModelSerializer):
         )
 
 
+class ProfileRecordSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.ProfileRecord
+        fields = ("request_id", "kind", "label", "duration_ms", "raw_size", "created_at")
+
+
 class DailyMaintenanceResultSerializer(serializers.Serializer):
+    run_id = serializers.IntegerField(required=False)
     started_at = serializers.DateTimeField()
     finished_at = serializers.DateTimeField()
     cities_processed = serializers.JSONField()
+    pending_cities = serializers.ListField(child=serializers.CharField(), required=False)
     snapshots_published = serializers.IntegerField()
     slo_metrics_count = serializers.IntegerField()
     recovery_actions = serializers.IntegerField()
-    status = serializers.ChoiceField(choices=["healthy", "degraded"])
+    invocations = serializers.IntegerField(required=False)
+    complete = serializers.BooleanField(required=False)
+    status = serializers.ChoiceField(choices=["healthy", "degraded", "in_progress"])
 
 
 class SupabaseStatusSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=["connected", "degraded", "not_configured"])
     db = serializers.JSONField()
     rest = serializers.JSONField()
+    replica = serializers.JSONField(required=False)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.db import IntegrityError
+from django.utils import timezone
+
+from permitpulse.compression import CODEC_EXTENSIONS, available_codec, compress, decompress
+from permitpulse.connectors.city_sources import RawRuleDocument
+from permitpulse.models import RawDocument, RuleClause, RuleSnapshot, clause_body_fields, clause_content_hash
+
+
+def archive_storage():
+    return storages["raw_documents"]
+
+
+def archive_document(document: RawRuleDocument) -> RawDocument:
+    """Stores the document once per distinct content; refetches of the same bytes only bump last_fetched_at."""
+    raw = document.content.encode("utf-8")
+    content_hash = hashlib.sha256(raw).hexdigest()
+    now = timezone.now()
+    if RawDocument.objects.filter(content_hash=content_hash).update(last_fetched_at=now):
+        return RawDocument.objects.get(content_hash=content_hash)
+
+    codec = available_codec(settings.RAW_ARCHIVE_CODEC)
+    data = compress(codec, raw)
+    name = f"{content_hash[:2]}/{content_hash}.html.{CODEC_EXTENSIONS[codec]}"
+    storage = archive_storage()
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(data))
+    try:
+        return RawDocument.objects.create(
+            content_hash=content_hash,
+            city_code=document.city_code,
+            source_url=document.source_url,
+            codec=codec,
+            storage_name=name,
+            raw_size=len(raw),
+            compressed_size=len(data),
+            last_fetched_at=now,
+        )
+    except IntegrityError:
+        # A concurrent ingestion archived the same bytes first.
+        return RawDocument.objects.get(content_hash=content_hash)
+
+
+def read_archive_bytes(raw_document: RawDocument) -> bytes:
+    with archive_storage().open(raw_document.storage_name, "rb") as handle:
+        return handle.read()
+
+
+def load_document(raw_document: RawDocument) -> RawRuleDocument:
+    content = decompress(raw_document.codec, read_archive_bytes(raw_document)).decode("utf-8")
+    return RawRuleDocument(city_code=raw_document.city_code, source_url=raw_document.source_url, content=content)
+
+
+def _clause_signatures(clauses: Iterable[dict[str, Any]]) -> dict[str, tuple[str, float]]:
+    return {
+        clause["clause_id"]: (
+            clause_content_hash(clause_body_fields(clause)),
+            round(float(clause.get("confidence", 0.0)), 4),
+        )
+        for clause in clauses
+    }
+
+
+def diff_snapshot_clauses(snapshot: RuleSnapshot, checksum: str, clauses: list[dict[str, Any]]) -> dict[str, Any]:
+    """Compares reparsed clauses with the ones stored for the snapshot, by clause_id."""
+    stored = {
+        clause_id: (content_hash, round(confidence, 4))
+        for clause_id, content_hash, confidence in RuleClause.objects.filter(snapshot=snapshot).values_list(
+            "clause_id", "body__content_hash", "confidence"
+        )
+    }
+    reparsed = _clause_signatures(clauses)
+    return {
+        "snapshot_id": snapshot.pk,
+        "city_code": snapshot.city_code,
+        "version": snapshot.version,
+        "checksum_changed": checksum != snapshot.checksum,
+        "added": sorted(reparsed.keys() - stored.keys()),
+        "removed": sorted(stored.keys() - reparsed.keys()),
+        "changed": sorted(key for key in reparsed.keys() & stored.keys() if reparsed[key] != stored[key]),
+        "unchanged": sum(1 for key in reparsed.keys() & stored.keys() if reparsed[key] == stored[key]),
+    }
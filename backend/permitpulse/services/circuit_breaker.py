@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterable, Iterator, Optional
+
+import requests
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from permitpulse.models import AutonomyEvent, CircuitBreaker
+
+
+class CircuitOpenError(RuntimeError):
+    """The dependency's circuit is open; the call was not attempted."""
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """Timeouts, connection errors, 429s and 5xx count against a dependency; other errors mean it answered."""
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+        return True
+    response = getattr(exc, "response", None)
+    return isinstance(exc, requests.HTTPError) and response is not None and (
+        response.status_code == 429 or response.status_code >= 500
+    )
+
+
+def _record_transition(breaker: CircuitBreaker, previous: str) -> None:
+    AutonomyEvent.objects.create(
+        event_type="ops_loop",
+        trigger=f"circuit:{breaker.name}",
+        action_taken=f"circuit_{breaker.state}",
+        outcome={"open": "degraded", "half_open": "recovering", "closed": "healthy"}[breaker.state],
+        details={
+            "name": breaker.name,
+            "from": previous,
+            "to": breaker.state,
+            "consecutive_failures": breaker.consecutive_failures,
+            "last_error": breaker.last_error,
+        },
+    )
+
+
+def blocked(names: Iterable[str]) -> set[str]:
+    """The dependencies that must not be called now, in one query.
+
+    Once an open circuit's cooldown has passed, exactly one caller wins a half-open probe; everyone else keeps
+    failing fast until the probe reports back (or its lease of CIRCUIT_PROBE_TIMEOUT_SECONDS runs out).
+    """
+    now = timezone.now()
+    unavailable = set()
+    for breaker in CircuitBreaker.objects.filter(name__in=set(names)).exclude(state="closed"):
+        if breaker.retry_at and breaker.retry_at > now:
+            unavailable.add(breaker.name)
+            continue
+        probe_until = now + timedelta(seconds=settings.CIRCUIT_PROBE_TIMEOUT_SECONDS)
+        won = CircuitBreaker.objects.filter(pk=breaker.pk, state=breaker.state, retry_at=breaker.retry_at).update(
+            state="half_open", retry_at=probe_until, updated_at=now
+        )
+        if not won:
+            unavailable.add(breaker.name)
+        elif breaker.state == "open":
+            previous, breaker.state = breaker.state, "half_open"
+            _record_transition(breaker, previous)
+    return unavailable
+
+
+def record_success(name: str) -> None:
+    breaker = CircuitBreaker.objects.filter(name=name).first()
+    if breaker is None or (breaker.state == "closed" and not breaker.consecutive_failures):
+        return
+    previous = breaker.state
+    breaker.state = "closed"
+    breaker.consecutive_failures = 0
+    breaker.retry_at = None
+    breaker.save(update_fields=["state", "consecutive_failures", "retry_at", "updated_at"])
+    if previous != "closed":
+        _record_transition(breaker, previous)
+
+
+def record_failure(name: str, error: BaseException) -> None:
+    """Opens the circuit after CIRCUIT_FAILURE_THRESHOLD consecutive failures, or at once when a probe fails.
+
+    Concurrent fetches fail against the same host together, so the count is incremented in the database and the
+    transition is a conditional update: exactly one caller opens the circuit and records it.
+    """
+    breaker, _ = CircuitBreaker.objects.get_or_create(name=name)
+    now = timezone.now()
+    CircuitBreaker.objects.filter(pk=breaker.pk).update(
+        consecutive_failures=F("consecutive_failures") + 1,
+        last_error=f"{type(error).__name__}: {error}"[:1000],
+        updated_at=now,
+    )
+    breaker.refresh_from_db()
+    previous = breaker.state
+    if previous != "half_open" and breaker.consecutive_failures < settings.CIRCUIT_FAILURE_THRESHOLD:
+        return
+    breaker.state = "open"
+    breaker.opened_at = now if previous == "closed" else breaker.opened_at
+    breaker.retry_at = now + timedelta(seconds=settings.CIRCUIT_OPEN_SECONDS)
+    won = CircuitBreaker.objects.filter(pk=breaker.pk, state=previous).update(
+        state=breaker.state, opened_at=breaker.opened_at, retry_at=breaker.retry_at, updated_at=now
+    )
+    if won and previous != "open":
+        _record_transition(breaker, previous)
+
+
+def record_outcome(name: str, error: Optional[BaseException]) -> None:
+    if error is not None and is_upstream_failure(error):
+        record_failure(name, error)
+    else:
+        record_success(name)
+
+
+@contextmanager
+def circuit(name: str) -> Iterator[None]:
+    """Guards a call to the dependency `name`: raises CircuitOpenError instead of calling it while it is down."""
+    if name in blocked([name]):
+        raise CircuitOpenError(f"circuit {name} is open")
+    try:
+        yield
+    except Exception as exc:
+        record_outcome(name, exc)
+        raise
+    record_success(name)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+
+from permitpulse.connectors.city_sources import RawRuleDocument, SourceSpec, host_of, source_fetcher
+from permitpulse.models import City, CitySource
+from permitpulse.services.circuit_breaker import CircuitOpenError, blocked, is_upstream_failure, record_outcome
+
+
+class ActiveCityCache:
+    """Process-local copy of the active city codes, reloaded after `ttl_seconds`.
+
+    Cities are added in the admin rarely; a short TTL keeps request validation off the database.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._codes: list[str] = []
+        self._expires_at = 0.0
+
+    def get(self) -> list[str]:
+        with self._lock:
+            if time.monotonic() < self._expires_at:
+                return self._codes
+        codes = list(City.objects.filter(is_active=True).order_by("id").values_list("code", flat=True))
+        with self._lock:
+            self._codes = codes
+            self._expires_at = time.monotonic() + self.ttl_seconds
+        return codes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires_at = 0.0
+
+
+active_city_cache = ActiveCityCache(settings.CITY_REGISTRY_CACHE_SECONDS)
+
+
+def active_city_codes() -> list[str]:
+    return list(active_city_cache.get())
+
+
+def city_sources(city_codes: Iterable[str]) -> dict[str, list[SourceSpec]]:
+    """Active sources of active cities, in position order, in a single query."""
+    sources: dict[str, list[SourceSpec]] = {}
+    rows = (
+        CitySource.objects.filter(city__code__in=list(city_codes), city__is_active=True, is_active=True)
+        .order_by("position", "id")
+        .values_list("city__code", "url", "kind", "optional", "options")
+    )
+    for city_code, url, kind, optional, options in rows:
+        sources.setdefault(city_code, []).append(SourceSpec(url=url, kind=kind, optional=optional, options=options))
+    return sources
+
+
+def source_circuit(url: str) -> str:
+    return f"city_source:{host_of(url)}"
+
+
+class CityFetch:
+    """A city fetch in flight. `result()` reports each host's outcome to its circuit breaker, in the caller's
+    thread, so the fetch pools never touch the database."""
+
+    def __init__(self, future: Future, outcomes: list) -> None:
+        self.future = future
+        self.outcomes = outcomes
+
+    def result(self) -> RawRuleDocument:
+        try:
+            return self.future.result()
+        finally:
+            _record_outcomes(self.outcomes)
+
+    def cancel(self) -> bool:
+        return self.future.cancel()
+
+
+def _record_outcomes(outcomes: list) -> None:
+    errors: dict[str, Optional[BaseException]] = {}
+    for host, error in list(outcomes):
+        if error is not None and is_upstream_failure(error):
+            errors[host] = error
+        else:
+            errors.setdefault(host, None)
+    for host, error in errors.items():
+        record_outcome(f"city_source:{host}", error)
+
+
+def _failed(error: BaseException) -> Future:
+    future: Future = Future()
+    future.set_exception(error)
+    return future
+
+
+def fetch_city_document(city_code: str, timeout: float | None = None) -> RawRuleDocument:
+    return prefetch_city_documents([city_code], timeout)[city_code].result()
+
+
+def prefetch_city_documents(city_codes: Iterable[str], timeout: float | None = None) -> dict[str, CityFetch]:
+    """Starts fetching the cities in the background; each CityFetch resolves to the city's RawRuleDocument.
+
+    Sources are looked up here, in the caller's thread. Optional sources on hosts whose circuit is open are left
+    out; a required one fails the city at once with CircuitOpenError instead of waiting out the timeout.
+    """
+    city_codes = list(city_codes)
+    timeout = timeout or settings.CITY_FETCH_TIMEOUT_SECONDS
+    sources = city_sources(city_codes)
+    down = blocked({source_circuit(source.url) for specs in sources.values() for source in specs})
+    fetches = {}
+    for city_code in city_codes:
+        outcomes: list = []
+        specs = sources.get(city_code, [])
+        available = [source for source in specs if source_circuit(source.url) not in down]
+        closed = [source.url for source in specs if source not in available and not source.optional]
+        if closed or (specs and not available):
+            future = _failed(CircuitOpenError(f"circuit open for {', '.join(closed) or city_code}"))
+        else:
+            future = source_fetcher.submit_city(city_code, available, timeout, outcomes)
+        fetches[city_code] = CityFetch(future, outcomes)
+    return fetches
+
+
+def iter_prefetched(
+    city_codes: Iterable[str], ahead: Optional[int] = None
+) -> Iterator[tuple[str, Optional[CityFetch]]]:
+    """Yields each city with its fetch, in order, while at most `ahead` (CITY_FETCH_PREFETCH) following cities
+    download in the background, so memory stays bounded however many cities there are. Closing the generator
+    early (use contextlib.closing) cancels the fetches not handed out yet."""
+    city_codes = list(city_codes)
+    ahead = settings.CITY_FETCH_PREFETCH if ahead is None else ahead
+    prefetched: dict[str, CityFetch] = {}
+    try:
+        for index, city_code in enumerate(city_codes):
+            window = city_codes[index : index + ahead + 1]
+            prefetched.update(prefetch_city_documents([code for code in window if code not in prefetched]))
+            yield city_code, prefetched.pop(city_code, None)
+    finally:
+        for fetch in prefetched.values():
+            fetch.cancel()
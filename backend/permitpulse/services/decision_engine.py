@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from django.conf import settings
+from django.db import connection
 from django.db.models import Avg
 from django.utils import timezone
 
 from permitpulse.constants import PLAN_QUOTAS
 from permitpulse.models import AddressCheck, DecisionTrace, Organization, RuleClause, RuleSnapshot
+from permitpulse.services.evidence import clause_cache, clause_evidence, derive_flags
+from permitpulse.tracing import start_span
 
 
 class QuotaExceededError(Exception):
@@ -32,27 +35,29 @@ def _context_value(context: dict[str, Any], path: str) -> Any:
     return current
 
 
+_LEAF_OPS: dict[str, Callable[[Any, Any], bool]] = {
+    "exists": lambda observed, value: observed is not None,
+    "eq": lambda observed, value: observed == value,
+    "neq": lambda observed, value: observed != value,
+    "in": lambda observed, value: observed in (value or []),
+    "not_in": lambda observed, value: observed not in (value or []),
+    "gte": lambda observed, value: observed is not None and observed >= value,
+    "lte": lambda observed, value: observed is not None and observed <= value,
+}
+
+
+def _leaf_op(condition: dict[str, Any]) -> Optional[Callable[[Any, Any], bool]]:
+    # Extracted clauses can carry any JSON here; a list or dict is an unknown operator, not a TypeError.
+    name = condition.get("op", "eq")
+    return _LEAF_OPS.get(name) if isinstance(name, str) else None
+
+
 def _evaluate_leaf(condition: dict[str, Any], context: dict[str, Any]) -> bool:
     field = condition.get("field")
-    op = condition.get("op", "eq")
-    value = condition.get("value")
-    observed = _context_value(context, field) if field else None
-
-    if op == "exists":
-        return observed is not None
-    if op == "eq":
-        return observed == value
-    if op == "neq":
-        return observed != value
-    if op == "in":
-        return observed in (value or [])
-    if op == "not_in":
-        return observed not in (value or [])
-    if op == "gte":
-        return observed is not None and observed >= value
-    if op == "lte":
-        return observed is not None and observed <= value
-    return False
+    op = _leaf_op(condition)
+    if op is None:
+        return False
+    return op(_context_value(context, field) if field else None, condition.get("value"))
 
 
 def evaluate_condition(condition: dict[str, Any], context: dict[str, Any]) -> bool:
@@ -68,28 +73,146 @@ def evaluate_condition(condition: dict[str, Any], context: dict[str, Any]) -> bo
     return _evaluate_leaf(condition, context)
 
 
-def _enforce_quota(organization: Optional[Organization]) -> None:
+def compile_condition(condition: dict[str, Any]) -> Callable[[dict[str, Any]], bool]:
+    """Turns a condition tree into a closure with the same semantics as evaluate_condition."""
+    if not condition:
+        return lambda context: True
+    if "all" in condition:
+        parts = [compile_condition(item) for item in condition["all"]]
+        return lambda context: all(part(context) for part in parts)
+    if "any" in condition:
+        parts = [compile_condition(item) for item in condition["any"]]
+        return lambda context: any(part(context) for part in parts)
+    if "not" in condition:
+        inner = compile_condition(condition["not"])
+        return lambda context: not inner(context)
+
+    field = condition.get("field")
+    op = _leaf_op(condition)
+    value = condition.get("value")
+    if op is None:
+        return lambda context: False
+    if not field:
+        return lambda context: op(None, value)
+    return lambda context: op(_context_value(context, field), value)
+
+
+# Compiled conditions keyed by ClauseBody content hash, so unchanged clauses reuse them across snapshot versions.
+_compiled_conditions: dict[str, Callable[[dict[str, Any]], bool]] = {}
+COMPILED_CONDITION_CACHE_SIZE = 20000
+
+
+def _clause_predicate(clause: RuleClause) -> Callable[[dict[str, Any]], bool]:
+    key = clause.body.content_hash
+    predicate = _compiled_conditions.get(key)
+    if predicate is None:
+        if len(_compiled_conditions) >= COMPILED_CONDITION_CACHE_SIZE:
+            _compiled_conditions.clear()
+        predicate = _compiled_conditions[key] = compile_condition(clause.condition_expr)
+    return predicate
+
+
+def _monthly_quota_left(organization: Optional[Organization]) -> Optional[int]:
+    """Address checks the organization may still run this month; None when there is no quota (anonymous)."""
     if not organization:
-        return
+        return None
     plan = organization.plan.lower()
     quota = PLAN_QUOTAS.get(plan, PLAN_QUOTAS["starter"])
     month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     usage = organization.address_checks.filter(created_at__gte=month_start).count()
-    if usage >= quota:
+    return max(quota - usage, 0)
+
+
+def _enforce_quota(organization: Optional[Organization]) -> None:
+    if _monthly_quota_left(organization) == 0:
         raise QuotaExceededError(f"Monthly quota exceeded for plan '{organization.plan}'")
 
 
 def run_address_decision(decision_input: DecisionInput) -> AddressCheck:
-    _enforce_quota(decision_input.organization)
+    with start_span("decision.run", city_code=decision_input.city_code) as span:
+        check = _run_address_decision(decision_input)
+        span.set_attribute("result_grade", check.result_grade)
+        span.set_attribute("decision_mode", check.decision_mode)
+        return check
 
-    snapshot = (
-        RuleSnapshot.objects.filter(city_code=decision_input.city_code, is_active=True)
-        .order_by("-version")
-        .first()
+
+def _run_address_decision(decision_input: DecisionInput) -> AddressCheck:
+    with start_span("decision.quota"):
+        _enforce_quota(decision_input.organization)
+    snapshot, clauses = _load_snapshot(decision_input.city_code)
+    check, applicable_clauses = _decide(decision_input, snapshot, clauses)
+    compact = settings.PERMITPULSE_COMPACT_EVIDENCE
+    with start_span("decision.write", evidence_count=len(applicable_clauses), compact=compact):
+        check.save(force_insert=True)
+        if snapshot:
+            _trace(check, applicable_clauses).save(force_insert=True)
+    return check
+
+
+def run_address_decisions(organization: Optional[Organization], inputs: list[DecisionInput]) -> list[AddressCheck]:
+    """Decisions for many addresses of one organization, e.g. a portfolio import, in a fixed number of queries:
+    one quota check, one snapshot load per city and bulk inserts. Rows past the monthly quota are not evaluated."""
+    with start_span("decision.batch", rows=len(inputs)) as span:
+        with start_span("decision.quota"):
+            left = _monthly_quota_left(organization)
+        if left is not None:
+            inputs = inputs[:left]
+        loaded = _load_snapshots(list(dict.fromkeys(decision_input.city_code for decision_input in inputs)))
+        decided = [_decide(decision_input, *loaded[decision_input.city_code]) for decision_input in inputs]
+        with start_span("decision.write", rows=len(decided), compact=settings.PERMITPULSE_COMPACT_EVIDENCE):
+            if connection.features.can_return_rows_from_bulk_insert:
+                checks = AddressCheck.objects.bulk_create([check for check, _ in decided])
+            else:
+                checks = [check for check, _ in decided]
+                for check in checks:
+                    check.save(force_insert=True)
+            DecisionTrace.objects.bulk_create(
+                [_trace(check, applicable) for check, applicable in decided if check.snapshot_id]
+            )
+        span.set_attribute("decided", len(checks))
+        return checks
+
+
+def _load_snapshot(city_code: str) -> tuple[Optional[RuleSnapshot], list[RuleClause]]:
+    return _load_snapshots([city_code])[city_code]
+
+
+def _load_snapshots(city_codes: list[str]) -> dict[str, tuple[Optional[RuleSnapshot], list[RuleClause]]]:
+    """Each city's active snapshot and its clauses, in two queries however many cities are asked for."""
+    with start_span("decision.snapshot_load", city_code=",".join(city_codes)) as span:
+        snapshots: dict[str, RuleSnapshot] = {}
+        for snapshot in RuleSnapshot.objects.filter(city_code__in=city_codes, is_active=True).order_by("-version"):
+            snapshots.setdefault(snapshot.city_code, snapshot)
+        by_pk = {snapshot.pk: snapshot for snapshot in snapshots.values()}
+        clauses: dict[int, list[RuleClause]] = {pk: [] for pk in by_pk}
+        if by_pk:
+            for clause in RuleClause.objects.filter(snapshot_id__in=list(by_pk)).order_by("id"):
+                # Like snapshot.clauses.all(), the clause points at the loaded snapshot instead of fetching it.
+                clause.snapshot = by_pk[clause.snapshot_id]
+                clauses[clause.snapshot_id].append(clause)
+        span.set_attribute("version", max((snapshot.version for snapshot in snapshots.values()), default=0))
+        span.set_attribute("clause_count", sum(len(items) for items in clauses.values()))
+        return {
+            city_code: (snapshots.get(city_code), clauses[snapshots[city_code].pk] if city_code in snapshots else [])
+            for city_code in city_codes
+        }
+
+
+def _trace(check: AddressCheck, applicable_clauses: list[RuleClause]) -> DecisionTrace:
+    return DecisionTrace(
+        address_check=check,
+        snapshot=check.snapshot,
+        rule_ids=[clause.clause_id for clause in applicable_clauses],
+        confidence=check.confidence,
     )
 
+
+def _decide(
+    decision_input: DecisionInput, snapshot: Optional[RuleSnapshot], clauses: list[RuleClause]
+) -> tuple[AddressCheck, list[RuleClause]]:
+    """The unsaved AddressCheck for the input and the clauses that applied."""
     if not snapshot:
-        return AddressCheck.objects.create(
+        check = AddressCheck(
             organization=decision_input.organization,
             address=decision_input.address,
             city_code=decision_input.city_code,
@@ -100,27 +223,13 @@ def run_address_decision(decision_input: DecisionInput) -> AddressCheck:
             evidence=[],
             confidence=0.0,
         )
+        return check, []
 
-    applicable_clauses: list[RuleClause] = []
-    blockers: list[str] = []
-    actions: list[str] = []
-    evidence: list[dict[str, Any]] = []
-
-    for clause in snapshot.clauses.all():
-        if evaluate_condition(clause.condition_expr, decision_input.context):
-            applicable_clauses.append(clause)
-            evidence.append(
-                {
-                    "clause_id": clause.clause_id,
-                    "category": clause.category,
-                    "requirement_text": clause.requirement_text,
-                    "penalty_text": clause.penalty_text,
-                }
-            )
-            if clause.category.lower() in {"prohibition", "blocker"}:
-                blockers.append(clause.requirement_text)
-            elif clause.category.lower() in {"requirement", "registration", "tax"}:
-                actions.append(clause.requirement_text)
+    with start_span("decision.evaluate", clause_count=len(clauses)) as span:
+        applicable_clauses = [clause for clause in clauses if _clause_predicate(clause)(decision_input.context)]
+        evidence = [clause_evidence(clause) for clause in applicable_clauses]
+        blockers, actions = derive_flags(evidence)
+        span.set_attribute("applicable_count", len(applicable_clauses))
 
     clause_confidence = (
         applicable_clauses and sum(clause.confidence for clause in applicable_clauses) / len(applicable_clauses)
@@ -143,23 +252,20 @@ def run_address_decision(decision_input: DecisionInput) -> AddressCheck:
         if result_grade == "GREEN":
             result_grade = "UNDETERMINED"
 
-    check = AddressCheck.objects.create(
+    if settings.PERMITPULSE_COMPACT_EVIDENCE:
+        # Store clause pks only; serializers rebuild the text from the clause cache, warmed here.
+        clause_cache.remember(applicable_clauses)
+        stored = {"evidence_compact": True, "evidence_clause_ids": [clause.pk for clause in applicable_clauses]}
+    else:
+        stored = {"blocker_flags": blockers, "required_actions": actions, "evidence": evidence}
+    check = AddressCheck(
         organization=decision_input.organization,
         address=decision_input.address,
         city_code=decision_input.city_code,
         result_grade=result_grade,
         decision_mode=decision_mode,
-        blocker_flags=blockers,
-        required_actions=actions,
-        evidence=evidence,
         snapshot=snapshot,
         confidence=confidence,
+        **stored,
     )
-
-    DecisionTrace.objects.create(
-        address_check=check,
-        snapshot=snapshot,
-        rule_ids=[clause.clause_id for clause in applicable_clauses],
-        confidence=confidence,
-    )
-    return check
+    return check, applicable_clauses
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.db.models import F
+
+from permitpulse.models import AddressCheck, RuleClause
+
+EVIDENCE_FIELDS = ("clause_id", "category", "requirement_text", "penalty_text")
+BLOCKER_CATEGORIES = {"prohibition", "blocker"}
+ACTION_CATEGORIES = {"requirement", "registration", "tax"}
+# Evidence fields that live on the shared ClauseBody rather than the RuleClause membership row.
+EVIDENCE_BODY_FIELDS = {name: F(f"body__{name}") for name in EVIDENCE_FIELDS[1:]}
+
+
+def clause_evidence(clause: RuleClause) -> dict[str, Any]:
+    return {name: getattr(clause, name) for name in EVIDENCE_FIELDS}
+
+
+def derive_flags(evidence: list[dict[str, Any]]) -> tuple[list[str], list[str]]:
+    """Splits applicable clauses into blocker flags and required actions, as the decision engine grades them."""
+    blockers: list[str] = []
+    actions: list[str] = []
+    for item in evidence:
+        category = item["category"].lower()
+        if category in BLOCKER_CATEGORIES:
+            blockers.append(item["requirement_text"])
+        elif category in ACTION_CATEGORIES:
+            actions.append(item["requirement_text"])
+    return blockers, actions
+
+
+class ClauseCache:
+    """Process-local LRU of clause evidence keyed by RuleClause pk.
+
+    Published clauses are never edited (re-ingestion creates a new snapshot), so entries never go stale.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, dict[str, Any]] = OrderedDict()
+
+    def remember(self, clauses: Iterable[RuleClause]) -> None:
+        with self._lock:
+            for clause in clauses:
+                self._store(clause.pk, clause_evidence(clause))
+
+    def get_many(self, pks: Iterable[int]) -> dict[int, dict[str, Any]]:
+        wanted = set(pks)
+        with self._lock:
+            found = {pk: self._entries[pk] for pk in wanted if pk in self._entries}
+            for pk in found:
+                self._entries.move_to_end(pk)
+        missing = wanted - found.keys()
+        if missing:
+            rows = RuleClause.objects.filter(pk__in=missing).values("pk", *EVIDENCE_FIELDS[:1], **EVIDENCE_BODY_FIELDS)
+            loaded = {row.pop("pk"): row for row in rows}
+            with self._lock:
+                for pk, evidence in loaded.items():
+                    self._store(pk, evidence)
+            found.update(loaded)
+        return found
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, pk: int, evidence: dict[str, Any]) -> None:
+        self._entries[pk] = evidence
+        self._entries.move_to_end(pk)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+clause_cache = ClauseCache(settings.CLAUSE_CACHE_MAX_ENTRIES)
+
+
+def warm_clause_cache(checks: Iterable[AddressCheck]) -> None:
+    """Loads every clause the compact checks reference with at most one query, ahead of serializing them."""
+    clause_cache.get_many(pk for check in checks if check.evidence_compact for pk in check.evidence_clause_ids)
+
+
+def expand_evidence(check: AddressCheck) -> tuple[list[dict[str, Any]], list[str], list[str]]:
+    """Returns (evidence, blocker_flags, required_actions) exactly as inline storage would hold them."""
+    if not check.evidence_compact:
+        return check.evidence, check.blocker_flags, check.required_actions
+    clauses = clause_cache.get_many(check.evidence_clause_ids)
+    # Clauses can only disappear with their snapshot; skip them rather than failing the read.
+    evidence = [dict(clauses[pk]) for pk in check.evidence_clause_ids if pk in clauses]
+    blockers, actions = derive_flags(evidence)
+    return evidence, blockers, actions
@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+import logging
 from datetime import date
-from typing import Optional
+from typing import Any, Optional
 
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
-from permitpulse.connectors.city_sources import fetch_city_document
-from permitpulse.models import Alert, AutonomyEvent, Organization, RuleClause, RuleSnapshot
-from permitpulse.parsers.rule_parser import parse_rule_document
+from permitpulse.connectors.city_sources import IncompleteDocumentError, RawRuleDocument
+from permitpulse.models import Alert, AutonomyEvent, Organization, RawDocument, RuleClause, RuleSnapshot
+from permitpulse.parsers.rule_parser import normalize_document, parse_rule_document, rule_sentence_digest, text_checksum
+from permitpulse.parsers.similarity import estimate_similarity, minhash_sketch, number_digest
+from permitpulse.services.archive import archive_document, load_document
+from permitpulse.services.city_registry import CityFetch, fetch_city_document
+from permitpulse.services.jobs import enqueue
+from permitpulse.services.scheduler import record_ingest_outcome
 from permitpulse.services.validation_gate import validate_parsed_rules
+from permitpulse.tracing import start_span
+
+logger = logging.getLogger(__name__)
 
 
 def _latest_snapshot(city_code: str) -> Optional[RuleSnapshot]:
@@ -21,40 +31,128 @@ def _next_version(city_code: str) -> int:
     return 1 if not latest else latest.version + 1
 
 
-def _broadcast_alert(city_code: str, message: str, change_type: str = "rule_update") -> None:
-    orgs = Organization.objects.all()
-    alerts = [
-        Alert(
-            organization=org,
-            city_code=city_code,
-            change_type=change_type,
-            impacted_listing_ids=[],
-            severity="medium",
-            message=message,
-        )
-        for org in orgs
-    ]
-    if alerts:
-        Alert.objects.bulk_create(alerts)
+def broadcast_alert(city_code: str, message: str, change_type: str = "rule_update") -> None:
+    with start_span("ingestion.broadcast_alert", city_code=city_code, change_type=change_type) as span:
+        orgs = Organization.objects.all()
+        alerts = [
+            Alert(
+                organization=org,
+                city_code=city_code,
+                change_type=change_type,
+                impacted_listing_ids=[],
+                severity="medium",
+                message=message,
+            )
+            for org in orgs
+        ]
+        if alerts:
+            Alert.objects.bulk_create(alerts)
+        span.set_attribute("alert_count", len(alerts))
+
+
+def _archive_raw_document(document: RawRuleDocument) -> Optional[RawDocument]:
+    """Archiving is best effort: a storage outage must not hold back a rules update."""
+    with start_span("ingestion.archive_document", city_code=document.city_code) as span:
+        try:
+            raw_document = archive_document(document)
+        except Exception:  # noqa: BLE001
+            logger.exception("failed to archive raw document for %s", document.city_code)
+            return None
+        span.set_attribute("content_hash", raw_document.content_hash)
+        return raw_document
+
+
+def _text_signature(normalized_text: str) -> dict[str, Any]:
+    """What the near-duplicate check compares, stored in each snapshot's parsed_payload: the MinHash sketch, plus
+    digests of the numbers and of the rule-matched sentences, where the small edits a sketch misses matter most."""
+    return {
+        "minhash": minhash_sketch(normalized_text),
+        "numbers": number_digest(normalized_text),
+        "rule_sentences": rule_sentence_digest(normalized_text),
+    }
+
+
+def _compare_to_snapshot(
+    snapshot: Optional[RuleSnapshot], signature: dict[str, Any]
+) -> tuple[Optional[float], list[str]]:
+    """Estimated share of text shared with the snapshot's source, and which of its digests changed. The signature
+    stored at publish is used or, for older snapshots, rebuilt from the archived document. (None, []) when there
+    is nothing to compare with."""
+    if snapshot is None:
+        return None, []
+    with start_span("ingestion.similarity", city_code=snapshot.city_code) as span:
+        stored: Optional[dict[str, Any]] = {key: snapshot.parsed_payload.get(key) for key in signature}
+        if None in stored.values():
+            stored = None
+            if snapshot.raw_document_id is not None:
+                try:
+                    stored = _text_signature(normalize_document(load_document(snapshot.raw_document)))
+                except Exception:  # noqa: BLE001
+                    logger.exception("failed to load archived document for %s", snapshot.city_code)
+        if stored is None:
+            return None, []
+        similarity = round(estimate_similarity(signature["minhash"], stored["minhash"]), 4)
+        changed = [key for key in ("numbers", "rule_sentences") if signature[key] != stored[key]]
+        span.set_attribute("similarity", similarity)
+        span.set_attribute("changed", ",".join(changed))
+        return similarity, changed
+
+
+def ingest_city_rules(city_code: str, prefetched: Optional[CityFetch] = None) -> Optional[RuleSnapshot]:
+    """`prefetched` is a fetch already started by services.city_registry.prefetch_city_documents."""
+    with start_span("ingestion.city", city_code=city_code) as span:
+        snapshot, outcome = _ingest_city_rules(city_code, prefetched)
+        record_ingest_outcome(city_code, outcome, snapshot)
+        span.set_attribute("outcome", outcome)
+        span.set_attribute("version", getattr(snapshot, "version", None) or 0)
+        span.set_attribute("snapshot_status", getattr(snapshot, "status", "missing"))
+        return snapshot
 
 
-def ingest_city_rules(city_code: str) -> Optional[RuleSnapshot]:
+def _ingest_city_rules(city_code: str, prefetched: Optional[CityFetch] = None) -> tuple[Optional[RuleSnapshot], str]:
+    """Returns the city's current snapshot and the outcome: published, unchanged, cosmetic (text changed, but less
+    than NEAR_DUPLICATE_THRESHOLD allows and no number or rule-matched sentence changed, so nothing was extracted),
+    rejected, error, or oversized / truncated when a source's response was over CITY_FETCH_MAX_BYTES or cut short."""
     previous = _latest_snapshot(city_code)
 
     try:
-        document = fetch_city_document(city_code)
-        draft = parse_rule_document(document)
-        validation = validate_parsed_rules(city_code, draft, previous)
+        document = prefetched.result() if prefetched is not None else fetch_city_document(city_code)
+        raw_document = _archive_raw_document(document)
+        normalized_text = normalize_document(document)
+        checksum = text_checksum(normalized_text)
 
-        if previous and previous.checksum == draft.checksum:
+        if previous and previous.checksum == checksum:
             AutonomyEvent.objects.create(
                 event_type="data_loop",
                 trigger=f"ingest:{city_code}",
                 action_taken="skip_publish_same_checksum",
                 outcome="stable",
-                details={"city_code": city_code, "checksum": draft.checksum},
+                details={"city_code": city_code, "checksum": checksum},
+            )
+            return previous, "unchanged"
+
+        signature = _text_signature(normalized_text)
+        similarity, changed = _compare_to_snapshot(previous, signature)
+        threshold = settings.NEAR_DUPLICATE_THRESHOLD
+        # A similar page is only cosmetic if no number and no rule-matched sentence changed either.
+        if similarity is not None and threshold > 0 and similarity >= threshold and not changed:
+            AutonomyEvent.objects.create(
+                event_type="data_loop",
+                trigger=f"ingest:{city_code}",
+                action_taken="skip_publish_cosmetic_change",
+                outcome="stable",
+                details={
+                    "city_code": city_code,
+                    "checksum": checksum,
+                    "snapshot_checksum": previous.checksum,
+                    "similarity": similarity,
+                    "threshold": threshold,
+                },
             )
-            return previous
+            return previous, "cosmetic"
+
+        draft = parse_rule_document(document, normalized_text)
+        validation = validate_parsed_rules(city_code, draft, previous)
 
         if not validation.is_valid:
             if previous:
@@ -71,9 +169,12 @@ def ingest_city_rules(city_code: str) -> Optional[RuleSnapshot]:
                     "validation_score": validation.validation_score,
                 },
             )
-            return previous
+            return previous, "rejected"
 
-        with transaction.atomic():
+        with (
+            start_span("ingestion.publish", city_code=city_code, clause_count=len(draft.clauses)) as span,
+            transaction.atomic(),
+        ):
             RuleSnapshot.objects.filter(city_code=city_code, is_active=True).update(is_active=False)
             snapshot = RuleSnapshot.objects.create(
                 city_code=city_code,
@@ -86,44 +187,48 @@ def ingest_city_rules(city_code: str) -> Optional[RuleSnapshot]:
                 parsed_payload={
                     "parser_traces": draft.parser_traces,
                     "clause_count": len(draft.clauses),
+                    "source_hashes": document.source_hashes,
+                    **signature,
                 },
                 is_active=True,
                 published_at=timezone.now(),
+                raw_document=raw_document,
             )
-            RuleClause.objects.bulk_create(
-                [
-                    RuleClause(
-                        snapshot=snapshot,
-                        clause_id=clause["clause_id"],
-                        category=clause["category"],
-                        condition_expr=clause.get("condition_expr", {}),
-                        requirement_text=clause["requirement_text"],
-                        penalty_text=clause.get("penalty_text", ""),
-                        confidence=float(clause.get("confidence", 0.0)),
-                    )
-                    for clause in draft.clauses
-                ]
-            )
-
-        _broadcast_alert(city_code, f"{city_code} regulatory rules were updated to version {snapshot.version}.")
+            # Unchanged clause bodies are shared with earlier versions; only new content is inserted.
+            RuleClause.objects.create_for_snapshot(snapshot, draft.clauses)
+            span.set_attribute("version", snapshot.version)
+
+        message = f"{city_code} regulatory rules were updated to version {snapshot.version}."
+        if settings.JOB_QUEUE_ENABLED:
+            enqueue("alert_fanout", {"city_code": city_code, "message": message})
+        else:
+            broadcast_alert(city_code, message)
         AutonomyEvent.objects.create(
             event_type="data_loop",
             trigger=f"ingest:{city_code}",
             action_taken="publish_new_snapshot",
             outcome="healthy",
-            details={"city_code": city_code, "version": snapshot.version, "score": validation.validation_score},
+            details={
+                "city_code": city_code,
+                "version": snapshot.version,
+                "score": validation.validation_score,
+                "similarity": similarity,
+                "changed": changed,
+            },
         )
-        return snapshot
+        return snapshot, "published"
     except Exception as exc:  # noqa: BLE001
         if previous:
             previous.status = "STALE"
             previous.save(update_fields=["status", "updated_at"])
 
+        # Oversized and truncated documents are reported as such rather than as a generic error.
+        outcome = exc.outcome if isinstance(exc, IncompleteDocumentError) else "error"
         AutonomyEvent.objects.create(
             event_type="data_loop",
             trigger=f"ingest:{city_code}",
             action_taken="fallback_to_previous_snapshot",
             outcome="degraded",
-            details={"error": str(exc), "city_code": city_code},
+            details={"error": str(exc), "city_code": city_code, "ingest_outcome": outcome},
         )
-        return previous
+        return previous, outcome
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from permitpulse.models import Job
+from permitpulse.tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownJobTypeError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class JobType:
+    name: str
+    handler: Callable[..., Any]
+    # Most jobs of this type running at once, across every worker.
+    concurrency: int = 1
+    priority: int = 0
+    max_attempts: int = 5
+
+
+JOB_TYPES: dict[str, JobType] = {}
+
+
+def register_job(name: str, concurrency: int = 1, priority: int = 0, max_attempts: int = 5):
+    """Registers the decorated function as the handler for `name`; the job payload is passed as kwargs."""
+
+    def decorator(handler: Callable[..., Any]) -> Callable[..., Any]:
+        JOB_TYPES[name] = JobType(name, handler, concurrency, priority, max_attempts)
+        return handler
+
+    return decorator
+
+
+def enqueue(
+    job_type: str,
+    payload: Optional[dict[str, Any]] = None,
+    priority: Optional[int] = None,
+    run_at: Optional[datetime] = None,
+) -> Job:
+    spec = JOB_TYPES.get(job_type)
+    if spec is None:
+        raise UnknownJobTypeError(f"Unknown job type '{job_type}'")
+    return Job.objects.create(
+        job_type=job_type,
+        payload=payload or {},
+        priority=spec.priority if priority is None else priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=spec.max_attempts,
+    )
+
+
+def supports_skip_locked() -> bool:
+    return connection.features.has_select_for_update_skip_locked
+
+
+def _lock_job_type(job_type: str) -> None:
+    # Serializes claims per job type until commit, so two workers can't both take the last concurrency slot.
+    # SQLite serializes all writers already.
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [f"permitpulse.jobs:{job_type}"])
+
+
+def _running_counts() -> dict[str, int]:
+    rows = Job.objects.filter(status="running").values("job_type").annotate(running=Count("id"))
+    return {row["job_type"]: row["running"] for row in rows}
+
+
+def claim_next(worker_id: str, job_types: Optional[Iterable[str]] = None) -> Optional[Job]:
+    """Marks the next runnable job as running for this worker, honouring per-type concurrency limits."""
+    allowed = set(job_types or JOB_TYPES) & JOB_TYPES.keys()
+    while allowed:
+        with transaction.atomic():
+            running = _running_counts()
+            open_types = [name for name in allowed if running.get(name, 0) < JOB_TYPES[name].concurrency]
+            if not open_types:
+                return None
+            candidates = Job.objects.filter(status="queued", run_at__lte=timezone.now(), job_type__in=open_types)
+            if supports_skip_locked():
+                candidates = candidates.select_for_update(skip_locked=True)
+            job = candidates.order_by("-priority", "run_at", "id").first()
+            if job is None:
+                return None
+            _lock_job_type(job.job_type)
+            limit = JOB_TYPES[job.job_type].concurrency
+            if Job.objects.filter(status="running", job_type=job.job_type).count() >= limit:
+                # Another worker filled the last slot since the counts above were read.
+                allowed.discard(job.job_type)
+                continue
+            job.status = "running"
+            job.locked_by = worker_id
+            job.locked_at = timezone.now()
+            job.attempts += 1
+            job.save(update_fields=["status", "locked_by", "locked_at", "attempts", "updated_at"])
+            return job
+    return None
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter, capped at JOB_RETRY_MAX_SECONDS."""
+    seconds = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), settings.JOB_RETRY_MAX_SECONDS)
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+def execute_job(job: Job) -> Job:
+    spec = JOB_TYPES.get(job.job_type)
+    with start_span("jobs.execute", job_type=job.job_type, job_id=job.pk, attempt=job.attempts) as span:
+        try:
+            if spec is None:
+                raise UnknownJobTypeError(f"Unknown job type '{job.job_type}'")
+            result = spec.handler(**job.payload)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("job %s (%s) failed on attempt %s", job.pk, job.job_type, job.attempts)
+            job.last_error = "".join(traceback.format_exception(exc))[-4000:]
+            if spec is not None and job.attempts < job.max_attempts:
+                job.status = "queued"
+                job.run_at = timezone.now() + retry_delay(job.attempts)
+            else:
+                job.status = "failed"
+                job.finished_at = timezone.now()
+        else:
+            job.status = "succeeded"
+            job.result = result if isinstance(result, dict) else {"value": result}
+            job.finished_at = timezone.now()
+        job.locked_by = ""
+        job.locked_at = None
+        job.save(
+            update_fields=[
+                "status", "run_at", "last_error", "result", "finished_at", "locked_by", "locked_at", "updated_at"
+            ]
+        )
+        span.set_attribute("status", job.status)
+        return job
+
+
+def requeue_stale_jobs() -> int:
+    """Returns jobs whose worker died mid-run (locked longer than JOB_LOCK_TIMEOUT_SECONDS) to the queue."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+    return Job.objects.filter(status="running", locked_at__lt=cutoff).update(
+        status="queued", locked_by="", locked_at=None, run_at=timezone.now(), updated_at=timezone.now()
+    )
+
+
+def work(
+    worker_id: str,
+    stop: threading.Event,
+    job_types: Optional[Iterable[str]] = None,
+    burst: bool = False,
+    poll_interval: float = 1.0,
+) -> int:
+    """Claims and runs jobs until `stop` is set, or, in burst mode, until nothing is runnable."""
+    processed = 0
+    while not stop.is_set():
+        # Recycle connections between jobs like request_started/finished do (not inside an outer transaction).
+        if not connection.in_atomic_block:
+            close_old_connections()
+        job = claim_next(worker_id, job_types)
+        if job is None:
+            if burst:
+                break
+            requeue_stale_jobs()
+            stop.wait(poll_interval)
+            continue
+        execute_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from permitpulse.models import EndpointLatencyRollup
+from permitpulse.query_metrics import QueryStats
+
+# Log-linear buckets (HDR style): values below 2 * SUB_BUCKET_COUNT microseconds are exact, above that
+# each power of two is split into SUB_BUCKET_COUNT buckets, bounding the relative error at ~6%.
+SUB_BUCKET_BITS = 4
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+LINEAR_LIMIT = SUB_BUCKET_COUNT * 2
+
+
+def bucket_index(value_us: int) -> int:
+    if value_us < LINEAR_LIMIT:
+        return max(value_us, 0)
+    exponent = value_us.bit_length() - SUB_BUCKET_BITS - 1
+    return exponent * SUB_BUCKET_COUNT + (value_us >> exponent)
+
+
+def bucket_upper_bound_us(index: int) -> int:
+    if index < LINEAR_LIMIT:
+        return index
+    exponent = (index - SUB_BUCKET_COUNT) // SUB_BUCKET_COUNT
+    mantissa = index - exponent * SUB_BUCKET_COUNT
+    return ((mantissa + 1) << exponent) - 1
+
+
+@dataclass
+class LatencyHistogram:
+    counts: dict[int, int] = field(default_factory=dict)
+    total: int = 0
+    max_us: int = 0
+
+    def record(self, value_us: int) -> None:
+        index = bucket_index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def merge(self, counts: dict, max_us: int = 0) -> None:
+        for index, count in counts.items():
+            index = int(index)
+            self.counts[index] = self.counts.get(index, 0) + count
+            self.total += count
+        self.max_us = max(self.max_us, max_us)
+
+    def percentile_ms(self, pct: float) -> float:
+        if not self.total:
+            return 0.0
+        threshold = pct / 100 * self.total
+        running = 0
+        for index in sorted(self.counts):
+            running += self.counts[index]
+            if running >= threshold:
+                return round(min(bucket_upper_bound_us(index), self.max_us) / 1000, 3)
+        return round(self.max_us / 1000, 3)
+
+
+@dataclass
+class EndpointStats:
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    error_count: int = 0
+    query_count: int = 0
+    db_time_ms: float = 0.0
+
+
+class LatencyRecorder:
+    """Per-process latency aggregation, periodically flushed into EndpointLatencyRollup rows."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: dict[str, EndpointStats] = {}
+        self._window_started_at = timezone.now()
+        self._last_flush = time.monotonic()
+
+    def record(
+        self,
+        endpoint: str,
+        duration_us: int,
+        status_code: int,
+        query_stats: Optional[QueryStats] = None,
+    ) -> None:
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = EndpointStats()
+            stats.histogram.record(duration_us)
+            if status_code >= 500:
+                stats.error_count += 1
+            if query_stats is not None:
+                stats.query_count += query_stats.count
+                stats.db_time_ms += query_stats.duration_ms
+
+    def flush_due(self) -> bool:
+        return time.monotonic() - self._last_flush >= settings.LATENCY_FLUSH_INTERVAL_SECONDS
+
+    def flush(self) -> list[EndpointLatencyRollup]:
+        with self._lock:
+            stats, self._stats = self._stats, {}
+            window_start, self._window_started_at = self._window_started_at, timezone.now()
+            self._last_flush = time.monotonic()
+        if not stats:
+            return []
+        window_end = timezone.now()
+        return EndpointLatencyRollup.objects.bulk_create(
+            [
+                EndpointLatencyRollup(
+                    endpoint=endpoint[:128],
+                    window_start=window_start,
+                    window_end=window_end,
+                    request_count=item.histogram.total,
+                    error_count=item.error_count,
+                    p50_ms=item.histogram.percentile_ms(50),
+                    p95_ms=item.histogram.percentile_ms(95),
+                    p99_ms=item.histogram.percentile_ms(99),
+                    max_ms=round(item.histogram.max_us / 1000, 3),
+                    query_count=item.query_count,
+                    db_time_ms=round(item.db_time_ms, 3),
+                    histogram={str(index): count for index, count in item.histogram.counts.items()},
+                )
+                for endpoint, item in stats.items()
+            ]
+        )
+
+
+recorder = LatencyRecorder()
+
+
+def endpoint_latency_summary(window: Optional[timedelta] = None) -> list[dict]:
+    """Merges rollups across processes for the window; percentiles come from the merged histograms."""
+    window_start = timezone.now() - (window or timedelta(hours=24))
+    merged: dict[str, EndpointStats] = {}
+    rollups = EndpointLatencyRollup.objects.filter(window_end__gte=window_start).values_list(
+        "endpoint", "error_count", "max_ms", "query_count", "db_time_ms", "histogram"
+    )
+    for endpoint, error_count, max_ms, query_count, db_time_ms, histogram in rollups:
+        stats = merged.setdefault(endpoint, EndpointStats())
+        stats.histogram.merge(histogram, int(max_ms * 1000))
+        stats.error_count += error_count
+        stats.query_count += query_count
+        stats.db_time_ms += db_time_ms
+
+    target_p95 = settings.LATENCY_TARGET_P95_MS
+    summary = []
+    for endpoint in sorted(merged):
+        stats = merged[endpoint]
+        p95 = stats.histogram.percentile_ms(95)
+        requests = stats.histogram.total or 1
+        summary.append(
+            {
+                "endpoint": endpoint,
+                "request_count": stats.histogram.total,
+                "error_rate": round(stats.error_count / stats.histogram.total * 100, 3) if stats.histogram.total else 0.0,
+                "p50_ms": stats.histogram.percentile_ms(50),
+                "p95_ms": p95,
+                "p99_ms": stats.histogram.percentile_ms(99),
+                "avg_queries": round(stats.query_count / requests, 2),
+                "avg_db_time_ms": round(stats.db_time_ms / requests, 3),
+                "target_p95_ms": target_p95,
+                "status": "healthy" if p95 <= target_p95 else "breached",
+            }
+        )
+    return summary
@@ -1,57 +1,212 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Optional
 
 from django.conf import settings
+from django.db.models import F, Q
 from django.utils import timezone
 
-from permitpulse.models import AutonomyEvent
+from permitpulse.models import AutonomyEvent, MaintenanceRun
+from permitpulse.services.city_registry import active_city_codes, iter_prefetched
 from permitpulse.services.ingestion import ingest_city_rules
 from permitpulse.services.runbook import record_slo_metrics, run_autonomous_recovery_cycle
+from permitpulse.services.scheduler import due_cities
+from permitpulse.tracing import start_span
 
+DEGRADED_CITY_STATUSES = {"FAILED", "STALE", "missing", "TIMED_OUT"}
 
-def run_daily_maintenance() -> dict[str, Any]:
-    started_at = timezone.now()
-    city_results: list[dict[str, Any]] = []
-    snapshots_published = 0
 
-    for city_code in settings.PERMITPULSE_CITY_CODES:
-        snapshot = ingest_city_rules(city_code)
-        status = getattr(snapshot, "status", "missing")
-        if snapshot and status == "ACTIVE":
-            snapshots_published += 1
-        city_results.append(
-            {
-                "city_code": city_code,
+class TimeBudget:
+    """Admits units of work expected to finish before the deadline; the first is always admitted, so every
+    invocation makes progress."""
+
+    def __init__(self, seconds: float) -> None:
+        self.deadline = time.monotonic() + seconds
+        self.admitted = 0
+
+    def admit(self, expected_seconds: float = 0.0) -> bool:
+        if self.admitted and time.monotonic() + expected_seconds > self.deadline:
+            return False
+        self.admitted += 1
+        return True
+
+
+def cycle_start(now: datetime) -> datetime:
+    """Start of the maintenance cycle containing `now`; cycles are SCHEDULER_CYCLE_SECONDS long, aligned to the
+    Unix epoch (so daily cycles start at midnight UTC)."""
+    seconds = settings.SCHEDULER_CYCLE_SECONDS
+    return datetime.fromtimestamp(now.timestamp() // seconds * seconds, tz=dt_timezone.utc)
+
+
+def run_daily_maintenance(budget_seconds: Optional[float] = None) -> dict[str, Any]:
+    """Advances the current maintenance cycle as far as the time budget allows and reports its progress.
+
+    Invocations resume from the stored checkpoint; once the cycle is complete, later calls in the same cycle
+    return its final result without redoing any work.
+    """
+    if budget_seconds is None:
+        budget_seconds = settings.MAINTENANCE_TIME_BUDGET_SECONDS
+    with start_span("maintenance.daily", budget_seconds=budget_seconds) as span:
+        result = _run_daily_maintenance(TimeBudget(budget_seconds), budget_seconds)
+        span.set_attribute("status", result["status"])
+        span.set_attribute("snapshots_published", result["snapshots_published"])
+        span.set_attribute("pending_cities", len(result["pending_cities"]))
+        return result
+
+
+def _claim_run(owner: str, lease_seconds: float) -> tuple[MaintenanceRun, bool]:
+    now = timezone.now()
+    run, _ = MaintenanceRun.objects.get_or_create(cycle_start=cycle_start(now))
+    claimed = (
+        MaintenanceRun.objects.filter(pk=run.pk, status="in_progress")
+        .filter(Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now))
+        .update(
+            lease_owner=owner,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            invocations=F("invocations") + 1,
+        )
+    )
+    run.refresh_from_db()
+    return run, bool(claimed)
+
+
+def _save_checkpoint(run: MaintenanceRun) -> None:
+    run.save(update_fields=["checkpoint", "updated_at"])
+
+
+def _planned_cities(checkpoint: dict[str, Any]) -> list[str]:
+    if "planned_cities" in checkpoint:
+        return checkpoint["planned_cities"]
+    return active_city_codes()
+
+
+def _ingest_cities(run: MaintenanceRun, budget: TimeBudget) -> bool:
+    """Ingests the cycle's due cities, most urgent first; returns False when the budget ran out first."""
+    checkpoint = run.checkpoint
+    if "planned_cities" not in checkpoint:
+        # Planned once per cycle, so resumed invocations work through the same list. Cities that fall due
+        # before the next cycle are taken now rather than left waiting a whole cycle.
+        checkpoint["planned_cities"] = due_cities(
+            horizon=timedelta(seconds=settings.SCHEDULER_CYCLE_SECONDS),
+            limit=settings.SCHEDULER_MAX_CITIES_PER_CYCLE or None,
+        )
+        _save_checkpoint(run)
+    cities = checkpoint.setdefault("cities", {})
+    pending = [city_code for city_code in checkpoint["planned_cities"] if city_code not in cities]
+    # The next CITY_FETCH_PREFETCH cities download while this one is parsed and published.
+    with closing(iter_prefetched(pending)) as fetches:
+        for city_code, fetch in fetches:
+            in_flight = checkpoint.get("in_flight") or {}
+            attempts = in_flight.get("attempts", 0) + 1 if in_flight.get("city_code") == city_code else 1
+            if attempts > settings.MAINTENANCE_CITY_MAX_ATTEMPTS:
+                # Earlier invocations were killed while ingesting this city; move on instead of dying on it again.
+                if fetch is not None:
+                    fetch.cancel()
+                cities[city_code] = {"snapshot_id": None, "status": "TIMED_OUT", "duration_seconds": 0.0}
+                checkpoint.pop("in_flight", None)
+                _save_checkpoint(run)
+                continue
+            # The slowest city so far predicts how long the next one takes.
+            if not budget.admit(max((item["duration_seconds"] for item in cities.values()), default=0.0)):
+                return False
+            checkpoint["in_flight"] = {"city_code": city_code, "attempts": attempts}
+            _save_checkpoint(run)
+
+            started = time.monotonic()
+            snapshot = ingest_city_rules(city_code, fetch)
+            cities[city_code] = {
                 "snapshot_id": getattr(snapshot, "id", None),
-                "status": status,
+                "status": getattr(snapshot, "status", "missing"),
+                "published": bool(snapshot) and getattr(snapshot, "status", "") == "ACTIVE",
+                "duration_seconds": round(time.monotonic() - started, 3),
             }
-        )
+            checkpoint.pop("in_flight", None)
+            _save_checkpoint(run)
+    return True
 
-    metrics = record_slo_metrics()
-    recovery = run_autonomous_recovery_cycle()
 
-    finished_at = timezone.now()
-    status = "healthy"
-    if any(item["status"] in {"FAILED", "STALE", "missing"} for item in city_results):
-        status = "degraded"
+def _run_daily_maintenance(budget: TimeBudget, budget_seconds: float) -> dict[str, Any]:
+    owner = uuid.uuid4().hex
+    # The lease outlives the budget, so a cut-off invocation blocks the next one only briefly.
+    run, claimed = _claim_run(owner, budget_seconds + settings.MAINTENANCE_LEASE_GRACE_SECONDS)
+    if not claimed:
+        # Either another invocation holds the lease or the cycle is already complete.
+        return _result(run)
 
-    result: dict[str, Any] = {
-        "started_at": started_at.isoformat(),
-        "finished_at": finished_at.isoformat(),
-        "cities_processed": city_results,
-        "snapshots_published": snapshots_published,
-        "slo_metrics_count": len(metrics),
-        "recovery_actions": int(recovery.get("actions_executed", 0)),
-        "status": status,
-    }
+    checkpoint = run.checkpoint
+    try:
+        if _ingest_cities(run, budget):
+            if checkpoint.get("slo_metrics_count") is None and budget.admit():
+                with start_span("maintenance.slo_metrics"):
+                    checkpoint["slo_metrics_count"] = len(record_slo_metrics())
+                _save_checkpoint(run)
+            if checkpoint.get("recovery_actions") is None and budget.admit():
+                with start_span("maintenance.recovery"):
+                    recovery = run_autonomous_recovery_cycle()
+                checkpoint["recovery_actions"] = int(recovery.get("actions_executed", 0))
+                _save_checkpoint(run)
+    finally:
+        if _stages_complete(run):
+            run.status = "completed"
+            run.finished_at = timezone.now()
+        run.lease_owner = ""
+        run.lease_expires_at = None
+        run.save(update_fields=["status", "finished_at", "lease_owner", "lease_expires_at", "updated_at"])
 
+    result = _result(run)
+    complete = result["complete"]
     AutonomyEvent.objects.create(
         event_type="ops_loop",
         trigger="api:daily_maintenance",
-        action_taken="daily_maintenance_cycle",
-        outcome=status,
+        action_taken="daily_maintenance_cycle" if complete else "daily_maintenance_checkpoint",
+        outcome=result["status"],
         details=result,
     )
     return result
+
+
+def _stages_complete(run: MaintenanceRun) -> bool:
+    checkpoint = run.checkpoint
+    return (
+        "planned_cities" in checkpoint
+        and set(checkpoint["planned_cities"]) <= checkpoint.get("cities", {}).keys()
+        and checkpoint.get("slo_metrics_count") is not None
+        and checkpoint.get("recovery_actions") is not None
+    )
+
+
+def _result(run: MaintenanceRun) -> dict[str, Any]:
+    checkpoint = run.checkpoint
+    cities = checkpoint.get("cities", {})
+    planned = _planned_cities(checkpoint)
+    # Ordered by the plan; jsonb does not keep key order.
+    ordered = [city for city in planned if city in cities]
+    ordered += sorted(cities.keys() - set(ordered))
+    city_results = [
+        {"city_code": city_code, "snapshot_id": cities[city_code]["snapshot_id"], "status": cities[city_code]["status"]}
+        for city_code in ordered
+    ]
+    complete = run.status == "completed"
+    if not complete:
+        status = "in_progress"
+    elif any(item["status"] in DEGRADED_CITY_STATUSES for item in city_results):
+        status = "degraded"
+    else:
+        status = "healthy"
+    return {
+        "run_id": run.pk,
+        "started_at": run.started_at.isoformat(),
+        "finished_at": (run.finished_at or timezone.now()).isoformat(),
+        "cities_processed": city_results,
+        "pending_cities": [city for city in planned if city not in cities],
+        "snapshots_published": sum(1 for item in cities.values() if item.get("published")),
+        "slo_metrics_count": checkpoint.get("slo_metrics_count") or 0,
+        "recovery_actions": checkpoint.get("recovery_actions") or 0,
+        "invocations": run.invocations,
+        "complete": complete,
+        "status": status,
+    }
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import csv
+import io
+
+from django.utils import timezone
+
+from permitpulse.models import Organization, PortfolioImport
+from permitpulse.services.decision_engine import DecisionInput, run_address_decisions
+
+
+def parse_portfolio_csv(content: bytes) -> list[dict[str, str]]:
+    return list(csv.DictReader(io.StringIO(content.decode("utf-8"))))
+
+
+def evaluate_portfolio_rows(organization: Organization, rows: list[dict[str, str]]) -> dict[str, int]:
+    """Runs an address decision per row and counts the grades; stops at the plan quota."""
+    outcomes = {"GREEN": 0, "YELLOW": 0, "RED": 0, "UNDETERMINED": 0}
+    inputs = []
+    for row in rows:
+        address = (row.get("address") or "").strip()
+        if not address:
+            continue
+        context = {
+            "property": {
+                "is_primary_residence": ((row.get("is_primary_residence") or "").lower() in {"1", "true", "yes"})
+            }
+        }
+        city_code = (row.get("city_code") or "NYC").strip().upper()
+        inputs.append(DecisionInput(address=address, city_code=city_code, context=context, organization=organization))
+    for check in run_address_decisions(organization, inputs):
+        outcomes[check.result_grade] += 1
+    return outcomes
+
+
+def complete_portfolio_import(portfolio_import: PortfolioImport, rows: list[dict[str, str]]) -> PortfolioImport:
+    outcomes = evaluate_portfolio_rows(portfolio_import.organization, rows)
+    portfolio_import.status = "completed"
+    portfolio_import.report = {"result_counts": outcomes, "processed_at": timezone.now().isoformat()}
+    portfolio_import.save(update_fields=["status", "report", "updated_at"])
+    return portfolio_import
@@ -6,6 +6,7 @@ from django.conf import settings
 from django.utils import timezone
 
 from permitpulse.models import AutonomyEvent, RollbackEvent, RuleSnapshot, SLOMetric
+from permitpulse.services.latency import endpoint_latency_summary, recorder
 
 
 def record_slo_metrics() -> list[SLOMetric]:
@@ -56,6 +57,19 @@ def record_slo_metrics() -> list[SLOMetric]:
             status="healthy" if auto_recovery_rate >= settings.AUTONOMY_TARGET_AUTO_RECOVERY else "breached",
         ),
     ]
+
+    recorder.flush()
+    for endpoint in endpoint_latency_summary(now - window_start):
+        metrics.append(
+            SLOMetric.objects.create(
+                metric_name=f"latency_p95_ms:{endpoint['endpoint']}"[:64],
+                metric_value=endpoint["p95_ms"],
+                target_value=endpoint["target_p95_ms"],
+                window_start=window_start,
+                window_end=now,
+                status=endpoint["status"],
+            )
+        )
     return metrics
 
 
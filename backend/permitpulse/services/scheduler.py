@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import heapq
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from permitpulse.models import CityIngestSchedule, RuleSnapshot
+from permitpulse.services.city_registry import active_city_codes
+
+# Ingestion outcomes, as reported by services.ingestion.
+FAILED_OUTCOMES = {"rejected", "error", "oversized", "truncated"}
+
+
+def ensure_schedules(city_codes: list[str], now: Optional[datetime] = None) -> None:
+    """Cities without a schedule yet are due immediately."""
+    now = now or timezone.now()
+    CityIngestSchedule.objects.bulk_create(
+        [CityIngestSchedule(city_code=city_code, next_due_at=now) for city_code in city_codes],
+        ignore_conflicts=True,
+    )
+
+
+def change_interval_seconds(city_code: str, now: Optional[datetime] = None) -> int:
+    """Check interval from how often the city's rules changed over SCHEDULER_HISTORY_DAYS.
+
+    The city is checked SCHEDULER_CHECKS_PER_CHANGE times per observed change interval, clamped to
+    [SCHEDULER_MIN_INTERVAL_SECONDS, SCHEDULER_MAX_INTERVAL_SECONDS]; cities with no changes get the maximum.
+    """
+    now = now or timezone.now()
+    since = now - timedelta(days=settings.SCHEDULER_HISTORY_DAYS)
+    history = RuleSnapshot.objects.filter(city_code=city_code).aggregate(
+        first=Min("published_at"), published=Count("id", filter=Q(published_at__gte=since))
+    )
+    if history["first"] is None:
+        return settings.SCHEDULER_MAX_INTERVAL_SECONDS
+    # The first snapshot a city ever gets is its baseline, not a change.
+    changes = history["published"] - (1 if history["first"] >= since else 0)
+    if changes <= 0:
+        return settings.SCHEDULER_MAX_INTERVAL_SECONDS
+    observed = (now - max(history["first"], since)).total_seconds()
+    interval = observed / changes / settings.SCHEDULER_CHECKS_PER_CHANGE
+    return int(min(max(interval, settings.SCHEDULER_MIN_INTERVAL_SECONDS), settings.SCHEDULER_MAX_INTERVAL_SECONDS))
+
+
+def record_ingest_outcome(city_code: str, outcome: str, snapshot: Optional[RuleSnapshot]) -> CityIngestSchedule:
+    """Plans the next check: failures retry with exponential backoff (never later than the regular interval),
+    a city left on a STALE snapshot is retried at the minimum interval, others follow their change history."""
+    now = timezone.now()
+    schedule, _ = CityIngestSchedule.objects.get_or_create(city_code=city_code)
+    interval = change_interval_seconds(city_code, now)
+    if outcome in FAILED_OUTCOMES:
+        schedule.consecutive_failures += 1
+        backoff = settings.SCHEDULER_RETRY_BASE_SECONDS * 2 ** (schedule.consecutive_failures - 1)
+        delay = min(backoff, interval)
+    else:
+        schedule.consecutive_failures = 0
+        delay = interval
+        if snapshot is not None and snapshot.status == "STALE":
+            delay = settings.SCHEDULER_MIN_INTERVAL_SECONDS
+    schedule.interval_seconds = interval
+    schedule.last_checked_at = now
+    schedule.last_outcome = outcome
+    schedule.next_due_at = now + timedelta(seconds=delay)
+    schedule.save()
+    return schedule
+
+
+def city_priority(schedule: CityIngestSchedule, now: datetime) -> float:
+    """How overdue the city is, in multiples of its own interval; never-checked and failing cities go first."""
+    if schedule.last_checked_at is None:
+        return float("inf")
+    overdue = (now - schedule.next_due_at).total_seconds() / max(schedule.interval_seconds, 1)
+    return overdue + schedule.consecutive_failures
+
+
+def due_cities(
+    city_codes: Optional[list[str]] = None,
+    horizon: timedelta = timedelta(0),
+    limit: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> list[str]:
+    """Cities due within `horizon`, most urgent first, at most `limit` of them."""
+    city_codes = list(city_codes if city_codes is not None else active_city_codes())
+    now = now or timezone.now()
+    ensure_schedules(city_codes, now)
+    schedules = CityIngestSchedule.objects.filter(city_code__in=city_codes, next_due_at__lte=now + horizon)
+    order = {city_code: index for index, city_code in enumerate(city_codes)}
+    queue = [(-city_priority(schedule, now), order[schedule.city_code], schedule.city_code) for schedule in schedules]
+    heapq.heapify(queue)
+    count = len(queue) if not limit else min(limit, len(queue))
+    return [heapq.heappop(queue)[2] for _ in range(count)]
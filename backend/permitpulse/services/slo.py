@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from permitpulse.models import SLOMetric
+from permitpulse.services.latency import endpoint_latency_summary
 
 
 def latest_slo_summary() -> dict:
@@ -21,6 +22,7 @@ def latest_slo_summary() -> dict:
                 "window_end": metric.window_end,
             }
             for metric in grouped.values()
-        ]
+        ],
+        "latency": endpoint_latency_summary(),
     }
     return payload
@@ -5,7 +5,17 @@ from urllib.parse import urlparse
 
 import requests
 from django.conf import settings
-from django.db import connection
+from django.db import connection, connections
+
+from permitpulse.db_router import REPLICA_ALIAS, replica_configured
+
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
 
 
 def _supabase_db_url() -> str:
@@ -54,6 +64,44 @@ def check_db_connection() -> dict:
         }
 
 
+def check_replica_connection() -> dict:
+    if not replica_configured():
+        return {
+            "configured": False,
+            "connected": False,
+            "host": "",
+            "lag_seconds": None,
+            "error": "Read replica is not configured",
+        }
+
+    replica = connections[REPLICA_ALIAS]
+    host = str(replica.settings_dict.get("HOST") or "")
+    try:
+        with replica.cursor() as cursor:
+            if replica.vendor == "postgresql":
+                cursor.execute(REPLICA_LAG_SQL)
+                lag_seconds = round(float(cursor.fetchone()[0] or 0), 3)
+            else:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+                lag_seconds = 0.0
+        return {
+            "configured": True,
+            "connected": True,
+            "host": host,
+            "lag_seconds": lag_seconds,
+            "error": "",
+        }
+    except Exception as exc:  # noqa: BLE001
+        return {
+            "configured": True,
+            "connected": False,
+            "host": host,
+            "lag_seconds": None,
+            "error": str(exc),
+        }
+
+
 def check_rest_connection() -> dict:
     url = (settings.SUPABASE_URL or "").rstrip("/")
     key = settings.SUPABASE_SERVICE_ROLE_KEY or settings.SUPABASE_ANON_KEY
@@ -101,10 +149,11 @@ def check_rest_connection() -> dict:
 def supabase_status_payload() -> dict:
     db = check_db_connection()
     rest = check_rest_connection()
+    replica = check_replica_connection()
 
     if not db["configured"] and not rest["configured"]:
         status = "not_configured"
-    elif db["connected"] and rest["reachable"]:
+    elif db["connected"] and rest["reachable"] and (replica["connected"] or not replica["configured"]):
         status = "connected"
     else:
         status = "degraded"
@@ -113,4 +162,5 @@ def supabase_status_payload() -> dict:
         "status": status,
         "db": db,
         "rest": rest,
+        "replica": replica,
     }
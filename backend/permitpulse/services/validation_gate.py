@@ -5,6 +5,7 @@ from typing import Optional
 
 from permitpulse.models import RuleSnapshot
 from permitpulse.parsers.rule_parser import ParsedRuleDraft
+from permitpulse.tracing import start_span
 
 
 @dataclass
@@ -19,6 +20,14 @@ def validate_parsed_rules(
     draft: ParsedRuleDraft,
     previous: Optional[RuleSnapshot],
 ) -> ValidationResult:
+    with start_span("ingestion.validate", city_code=city_code, clause_count=len(draft.clauses)) as span:
+        result = _validate(draft, previous)
+        span.set_attribute("is_valid", result.is_valid)
+        span.set_attribute("validation_score", result.validation_score)
+        return result
+
+
+def _validate(draft: ParsedRuleDraft, previous: Optional[RuleSnapshot]) -> ValidationResult:
     reasons: list[str] = []
 
     if not draft.clauses:
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
-from django.conf import settings
+from contextlib import closing
+from typing import Optional
 
-from permitpulse.models import AutonomyEvent
-from permitpulse.services.ingestion import ingest_city_rules
+from permitpulse.models import AutonomyEvent, PortfolioImport
+from permitpulse.services.city_registry import CityFetch, active_city_codes, iter_prefetched
+from permitpulse.services.ingestion import broadcast_alert, ingest_city_rules
+from permitpulse.services.jobs import register_job
+from permitpulse.services.portfolio import complete_portfolio_import
 from permitpulse.services.runbook import record_slo_metrics, run_autonomous_recovery_cycle
 
+# Functions registered with @register_job can also be queued (services.jobs.enqueue) and run by `run_workers`.
 
-def ingest_rules_for_city(city_code: str) -> dict:
-    snapshot = ingest_city_rules(city_code)
+
+@register_job("ingest_city", concurrency=3, priority=10, max_attempts=3)
+def ingest_rules_for_city(city_code: str, prefetched: Optional[CityFetch] = None) -> dict:
+    snapshot = ingest_city_rules(city_code, prefetched)
     return {
         "city_code": city_code,
         "snapshot_id": getattr(snapshot, "id", None),
@@ -17,9 +24,8 @@ def ingest_rules_for_city(city_code: str) -> dict:
 
 
 def ingest_all_cities() -> dict:
-    results = []
-    for city_code in settings.PERMITPULSE_CITY_CODES:
-        results.append(ingest_rules_for_city(city_code))
+    with closing(iter_prefetched(active_city_codes())) as fetches:
+        results = [ingest_rules_for_city(city_code, fetch) for city_code, fetch in fetches]
     AutonomyEvent.objects.create(
         event_type="data_loop",
         trigger="schedule:daily_city_ingestion",
@@ -30,6 +36,7 @@ def ingest_all_cities() -> dict:
     return {"results": results}
 
 
+@register_job("slo_rollup", priority=5, max_attempts=3)
 def evaluate_slos() -> dict:
     metrics = record_slo_metrics()
     return {
@@ -44,5 +51,19 @@ def evaluate_slos() -> dict:
     }
 
 
+@register_job("autonomous_recovery", priority=5, max_attempts=3)
 def run_autonomous_recovery() -> dict:
     return run_autonomous_recovery_cycle()
+
+
+@register_job("portfolio_import", concurrency=4, priority=20)
+def import_portfolio(portfolio_import_id: int, rows: list[dict]) -> dict:
+    portfolio_import = PortfolioImport.objects.select_related("organization").get(pk=portfolio_import_id)
+    complete_portfolio_import(portfolio_import, rows)
+    return {"portfolio_import_id": portfolio_import_id, "result_counts": portfolio_import.report["result_counts"]}
+
+
+@register_job("alert_fanout", concurrency=2, priority=15)
+def fan_out_alert(city_code: str, message: str, change_type: str = "rule_update") -> dict:
+    broadcast_alert(city_code, message, change_type)
+    return {"city_code": city_code}
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Optional
+
+from django.conf import settings
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SimpleSpanProcessor,
+    SpanExporter,
+)
+
+logger = logging.getLogger(__name__)
+
+_provider: Optional[TracerProvider] = None
+_tracer: trace.Tracer = trace.NoOpTracer()
+
+
+def _exporter_from_settings() -> Optional[SpanExporter]:
+    exporter = (settings.OTEL_TRACES_EXPORTER or "none").lower()
+    if exporter == "console":
+        return ConsoleSpanExporter()
+    if exporter == "file":
+        # One JSON document per line so traces can be grepped or loaded with pandas.
+        out = open(settings.OTEL_TRACES_FILE, "a", encoding="utf-8")  # noqa: SIM115
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+    if exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("OTEL_TRACES_EXPORTER=otlp needs opentelemetry-exporter-otlp-proto-http; tracing disabled")
+            return None
+        return OTLPSpanExporter()
+    return None
+
+
+def configure_tracing(exporter: Optional[SpanExporter] = None) -> None:
+    """Builds the tracer provider from settings, or around an explicit exporter (used by tests)."""
+    global _provider, _tracer
+    if _provider is not None:
+        _provider.shutdown()
+    _provider = None
+    _tracer = trace.NoOpTracer()
+
+    batch = exporter is None
+    exporter = exporter or _exporter_from_settings()
+    if exporter is None:
+        return
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}))
+    # Console/file exports are for local profiling, so write spans as they end; OTLP batches.
+    if batch and not isinstance(exporter, ConsoleSpanExporter):
+        _provider.add_span_processor(BatchSpanProcessor(exporter))
+    else:
+        _provider.add_span_processor(SimpleSpanProcessor(exporter))
+    _tracer = _provider.get_tracer("permitpulse")
+
+
+def start_span(name: str, **attributes: Any):
+    """Context manager for a child span of the current one; a no-op unless tracing is configured."""
+    return _tracer.start_as_current_span(
+        name,
+        attributes={key: value for key, value in attributes.items() if value is not None},
+    )
@@ -3,7 +3,7 @@ from django.urls import path
 from permitpulse import views
 
 urlpatterns = [
-    path("address-checks", views.AddressCheckCreateView.as_view(), name="address-check-create"),
+    path("address-checks", views.AddressCheckListCreateView.as_view(), name="address-checks"),
     path("address-checks/<int:check_id>", views.AddressCheckDetailView.as_view(), name="address-check-detail"),
     path("portfolio/import", views.PortfolioImportView.as_view(), name="portfolio-import"),
     path("cities/<str:city_code>/rules/latest", views.CityRulesLatestView.as_view(), name="city-rules-latest"),
@@ -18,4 +18,6 @@ urlpatterns = [
     path("system/autonomy-status", views.AutonomyStatusView.as_view(), name="autonomy-status"),
     path("system/supabase-status", views.SupabaseStatusView.as_view(), name="supabase-status"),
     path("system/slo", views.SLOView.as_view(), name="system-slo"),
+    path("system/profiles", views.ProfileListView.as_view(), name="system-profiles"),
+    path("system/profiles/<str:request_id>", views.ProfileDownloadView.as_view(), name="system-profile-download"),
 ]
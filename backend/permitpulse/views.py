@@ -1,18 +1,22 @@
 from __future__ import annotations
 
-import csv
-import io
+import hmac
 from typing import Optional
 
 from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from permitpulse.models import AddressCheck, Alert, AutonomyEvent, Organization, RuleSnapshot
+from permitpulse.db_router import read_from_replica
+from permitpulse.models import AddressCheck, Alert, AutonomyEvent, Organization, ProfileRecord, RuleSnapshot
+from permitpulse.pagination import InvalidCursorError, paginate_keyset, parse_page_size
+from permitpulse.profiling import profile_bytes, profile_summary
 from permitpulse.serializers import (
     AddressCheckRequestSerializer,
     AddressCheckSerializer,
@@ -20,12 +24,15 @@ from permitpulse.serializers import (
     CheckoutSerializer,
     DailyMaintenanceResultSerializer,
     PortfolioImportSerializer,
+    ProfileRecordSerializer,
     RuleSnapshotSerializer,
     SupabaseStatusSerializer,
 )
 from permitpulse.services.billing import create_checkout_session, process_webhook
 from permitpulse.services.decision_engine import DecisionInput, QuotaExceededError, run_address_decision
+from permitpulse.services.jobs import enqueue
 from permitpulse.services.maintenance import run_daily_maintenance
+from permitpulse.services.portfolio import evaluate_portfolio_rows, parse_portfolio_csv
 from permitpulse.services.runbook import autonomy_status_payload
 from permitpulse.services.slo import latest_slo_summary
 from permitpulse.services.supabase import supabase_status_payload
@@ -40,7 +47,62 @@ def _resolve_organization(request: Request) -> Optional[Organization]:
     return None
 
 
-class AddressCheckCreateView(APIView):
+class ReplicaReadMixin:
+    """Serves safe methods from the read replica when one is configured."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        with read_from_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+
+def _bearer_token(request: Request) -> str:
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.lower().startswith("bearer "):
+        return auth_header.split(" ", 1)[1].strip()
+    return ""
+
+
+def _query_list(request: Request, name: str) -> list[str]:
+    raw = request.query_params.get(name, "")
+    return [item.strip() for item in raw.split(",") if item.strip()]
+
+
+class AddressCheckListCreateView(ReplicaReadMixin, APIView):
+    def get(self, request: Request) -> Response:
+        queryset = AddressCheck.objects.select_related("snapshot")
+        if request.query_params.get("org") or request.headers.get("X-Org-Slug"):
+            org = _resolve_organization(request)
+            if not org:
+                return Response({"detail": "Organization not found"}, status=404)
+            queryset = queryset.filter(organization=org)
+        if request.query_params.get("city_code"):
+            queryset = queryset.filter(city_code=request.query_params["city_code"].upper())
+        if request.query_params.get("result_grade"):
+            queryset = queryset.filter(result_grade=request.query_params["result_grade"].upper())
+        if request.query_params.get("snapshot"):
+            if not request.query_params["snapshot"].isdigit():
+                return Response({"detail": "snapshot must be a snapshot id"}, status=400)
+            queryset = queryset.filter(snapshot_id=int(request.query_params["snapshot"]))
+
+        try:
+            checks, next_cursor = paginate_keyset(
+                queryset,
+                request.query_params.get("cursor"),
+                parse_page_size(request.query_params.get("limit")),
+            )
+        except InvalidCursorError as exc:
+            return Response({"detail": str(exc)}, status=400)
+
+        serializer = AddressCheckSerializer(
+            checks,
+            many=True,
+            fields=_query_list(request, "fields"),
+            omit=_query_list(request, "omit"),
+        )
+        return Response({"results": serializer.data, "next_cursor": next_cursor})
+
     def post(self, request: Request) -> Response:
         serializer = AddressCheckRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -69,9 +131,9 @@ class AddressCheckCreateView(APIView):
         return Response(AddressCheckSerializer(check).data, status=status.HTTP_201_CREATED)
 
 
-class AddressCheckDetailView(APIView):
+class AddressCheckDetailView(ReplicaReadMixin, APIView):
     def get(self, request: Request, check_id: int) -> Response:
-        check = get_object_or_404(AddressCheck, id=check_id)
+        check = get_object_or_404(AddressCheck.objects.select_related("snapshot"), id=check_id)
         return Response(AddressCheckSerializer(check).data)
 
 
@@ -85,30 +147,17 @@ class PortfolioImportView(APIView):
         if not csv_file:
             return Response({"detail": "CSV file is required as 'file'"}, status=400)
 
-        decoded = csv_file.read().decode("utf-8")
-        reader = csv.DictReader(io.StringIO(decoded))
-
-        rows = list(reader)
-        outcomes = {"GREEN": 0, "YELLOW": 0, "RED": 0, "UNDETERMINED": 0}
-
-        for row in rows:
-            city_code = (row.get("city_code") or "NYC").strip().upper()
-            address = (row.get("address") or "").strip()
-            if not address:
-                continue
-            context = {
-                "property": {
-                    "is_primary_residence": (row.get("is_primary_residence", "").lower() in {"1", "true", "yes"})
-                }
-            }
-            try:
-                check = run_address_decision(
-                    DecisionInput(address=address, city_code=city_code, context=context, organization=org)
-                )
-                outcomes[check.result_grade] += 1
-            except QuotaExceededError:
-                break
+        rows = parse_portfolio_csv(csv_file.read())
+        if settings.JOB_QUEUE_ENABLED:
+            portfolio_import = org.portfolio_imports.create(
+                original_filename=csv_file.name,
+                row_count=len(rows),
+                status="queued",
+            )
+            enqueue("portfolio_import", {"portfolio_import_id": portfolio_import.id, "rows": rows})
+            return Response(PortfolioImportSerializer(portfolio_import).data, status=202)
 
+        outcomes = evaluate_portfolio_rows(org, rows)
         portfolio_import = org.portfolio_imports.create(
             original_filename=csv_file.name,
             row_count=len(rows),
@@ -118,7 +167,7 @@ class PortfolioImportView(APIView):
         return Response(PortfolioImportSerializer(portfolio_import).data, status=201)
 
 
-class CityRulesLatestView(APIView):
+class CityRulesLatestView(ReplicaReadMixin, APIView):
     def get(self, request: Request, city_code: str) -> Response:
         snapshot = (
             RuleSnapshot.objects.filter(city_code=city_code.upper(), is_active=True)
@@ -130,14 +179,46 @@ class CityRulesLatestView(APIView):
         return Response(RuleSnapshotSerializer(snapshot).data)
 
 
-class AlertsListView(APIView):
+class AlertsListView(ReplicaReadMixin, APIView):
     def get(self, request: Request) -> Response:
-        org = _resolve_organization(request)
-        queryset = Alert.objects.all().order_by("-created_at")
-        if org:
+        queryset = Alert.objects.all()
+        if request.query_params.get("org") or request.headers.get("X-Org-Slug"):
+            org = _resolve_organization(request)
+            if not org:
+                return Response({"detail": "Organization not found"}, status=404)
             queryset = queryset.filter(organization=org)
-        serializer = AlertSerializer(queryset[:100], many=True)
-        return Response(serializer.data)
+        if request.query_params.get("status"):
+            queryset = queryset.filter(status=request.query_params["status"])
+        if request.query_params.get("since"):
+            since = parse_datetime(request.query_params["since"])
+            if not since:
+                return Response({"detail": "since must be an ISO 8601 datetime"}, status=400)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            queryset = queryset.filter(created_at__gte=since)
+
+        limit = parse_page_size(request.query_params.get("limit"))
+        since_id = request.query_params.get("since_id")
+        if since_id is not None:
+            # Incremental sync: oldest-first after the last id the client has seen.
+            if not since_id.isdigit():
+                return Response({"detail": "since_id must be an alert id"}, status=400)
+            alerts = list(queryset.filter(id__gt=int(since_id)).order_by("id")[: limit + 1])
+            has_more = len(alerts) > limit
+            alerts = alerts[:limit]
+            return Response(
+                {
+                    "results": AlertSerializer(alerts, many=True).data,
+                    "next_since_id": alerts[-1].id if alerts else int(since_id),
+                    "has_more": has_more,
+                }
+            )
+
+        try:
+            alerts, next_cursor = paginate_keyset(queryset, request.query_params.get("cursor"), limit)
+        except InvalidCursorError as exc:
+            return Response({"detail": str(exc)}, status=400)
+        return Response({"results": AlertSerializer(alerts, many=True).data, "next_cursor": next_cursor})
 
 
 class CheckoutSessionView(APIView):
@@ -168,12 +249,12 @@ class BillingWebhookView(APIView):
         return Response(result, status=code)
 
 
-class AutonomyStatusView(APIView):
+class AutonomyStatusView(ReplicaReadMixin, APIView):
     def get(self, request: Request) -> Response:
         return Response(autonomy_status_payload())
 
 
-class SLOView(APIView):
+class SLOView(ReplicaReadMixin, APIView):
     def get(self, request: Request) -> Response:
         return Response(latest_slo_summary())
 
@@ -191,10 +272,7 @@ class DailyMaintenanceCronView(APIView):
 
     def _authorized(self, request: Request) -> bool:
         shared_secret = settings.CRON_SHARED_SECRET
-        auth_header = request.headers.get("Authorization", "")
-        token = ""
-        if auth_header.lower().startswith("bearer "):
-            token = auth_header.split(" ", 1)[1].strip()
+        token = _bearer_token(request)
 
         # Vercel Cron on Hobby calls by schedule and includes the x-vercel-cron header.
         vercel_cron_header = request.headers.get("X-Vercel-Cron", "")
@@ -218,3 +296,41 @@ class DailyMaintenanceCronView(APIView):
         serializer = DailyMaintenanceResultSerializer(data=run_daily_maintenance())
         serializer.is_valid(raise_exception=True)
         return Response(serializer.data, status=200)
+
+
+class ProfilingAccessMixin:
+    authentication_classes = []
+    permission_classes = []
+
+    def _authorized(self, request: Request) -> bool:
+        token = settings.PROFILING_TOKEN
+        return bool(token) and hmac.compare_digest(_bearer_token(request), token)
+
+
+class ProfileListView(ProfilingAccessMixin, APIView):
+    def get(self, request: Request) -> Response:
+        if not self._authorized(request):
+            return Response({"detail": "Unauthorized profile request"}, status=401)
+        queryset = ProfileRecord.objects.defer("data")
+        kind = request.query_params.get("kind")
+        if kind:
+            queryset = queryset.filter(kind=kind)
+        try:
+            rows, next_cursor = paginate_keyset(
+                queryset, request.query_params.get("cursor"), parse_page_size(request.query_params.get("limit"))
+            )
+        except InvalidCursorError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"results": ProfileRecordSerializer(rows, many=True).data, "next_cursor": next_cursor})
+
+
+class ProfileDownloadView(ProfilingAccessMixin, APIView):
+    def get(self, request: Request, request_id: str):
+        if not self._authorized(request):
+            return Response({"detail": "Unauthorized profile request"}, status=401)
+        record = get_object_or_404(ProfileRecord, request_id=request_id)
+        if request.query_params.get("view") == "text":
+            return HttpResponse(profile_summary(record), content_type="text/plain; charset=utf-8")
+        response = HttpResponse(profile_bytes(record), content_type="application/octet-stream")
+        response["Content-Disposition"] = f'attachment; filename="{record.request_id}.prof"'
+        return response
@@ -1,22 +1,141 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from unittest.mock import patch
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from tempfile import TemporaryDirectory
+from unittest.mock import Mock, patch
 
-from django.test import TestCase, override_settings
+import requests
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.utils import timezone
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
+from config.settings import _database_from_url
+from permitpulse import fast_json
+from permitpulse.benchmarks.generators import SEEDED_MODELS, condition_tree, ordinance_html, sample_context
+from permitpulse.benchmarks.load import (
+    SCENARIOS,
+    WSGITransport,
+    load_wsgi_app,
+    offline_stubs,
+    parse_mix,
+    prepare_load_data,
+    run_load,
+)
+from permitpulse.connectors.city_sources import RawRuleDocument, SourceFetcher, SourceSpec
+from permitpulse.db_router import ReadReplicaRouter, begin_request, end_request, read_from_replica
+from permitpulse.fast_json import FastJSONParser, FastJSONRenderer
+from permitpulse.middleware import PRIMARY_PIN_COOKIE
 from permitpulse.models import (
+    AddressCheck,
+    Alert,
     AutonomyEvent,
+    CircuitBreaker,
+    City,
+    CityIngestSchedule,
+    CitySource,
+    ClauseBody,
     CustomerPolicyAction,
+    DecisionTrace,
+    Job,
+    MaintenanceRun,
     Organization,
+    PortfolioImport,
+    ProfileRecord,
+    RawDocument,
     RollbackEvent,
     RuleClause,
     RuleSnapshot,
 )
+from permitpulse.parsers.html_text import BACKENDS, available_backend, extract_text, html_to_text, iter_chunks
+from permitpulse.parsers.patterns import (
+    DEFAULT_PATTERNS_FILE,
+    PatternMatcher,
+    PatternRule,
+    load_pattern_rules,
+    pattern_matcher,
+)
+from permitpulse.parsers.rule_parser import _llm_schema_extract, text_checksum
+from permitpulse.parsers.similarity import SKETCH_SIZE, estimate_similarity, minhash_sketch
+from permitpulse.query_metrics import QUERY_BUDGETS
+from permitpulse.rate_limit import RateLimiter, RateLimitTimeout, retry_after_seconds
+from permitpulse.serializers import AddressCheckSerializer
+from permitpulse.services.archive import load_document
+from permitpulse.services.circuit_breaker import CircuitOpenError, blocked, record_failure
+from permitpulse.services.city_registry import (
+    active_city_cache,
+    fetch_city_document,
+    iter_prefetched,
+    prefetch_city_documents,
+)
+from permitpulse.services.decision_engine import (
+    DecisionInput,
+    compile_condition,
+    evaluate_condition,
+    run_address_decision,
+)
+from permitpulse.services.evidence import clause_cache
 from permitpulse.services.ingestion import ingest_city_rules
-from permitpulse.services.runbook import run_autonomous_recovery_cycle
+from permitpulse.services.jobs import JOB_TYPES, JobType, claim_next, enqueue, execute_job
+from permitpulse.services.latency import LatencyHistogram, bucket_index, bucket_upper_bound_us, recorder
+from permitpulse.services.maintenance import cycle_start, run_daily_maintenance
+from permitpulse.services.runbook import record_slo_metrics, run_autonomous_recovery_cycle
+from permitpulse.services.scheduler import change_interval_seconds, due_cities, record_ingest_outcome
+from permitpulse.tracing import configure_tracing
+
+
+def _create_snapshot(city_code: str = "NYC", score: float = 0.9, status: str = "ACTIVE") -> RuleSnapshot:
+    snapshot = RuleSnapshot.objects.create(
+        city_code=city_code,
+        version=1,
+        checksum="checksum-1",
+        status=status,
+        validation_score=score,
+        source_urls=["https://example.com/rule"],
+        parsed_payload={"parser_traces": ["test"]},
+        is_active=True,
+    )
+    RuleClause.objects.create(
+        snapshot=snapshot,
+        clause_id="registration-required",
+        category="requirement",
+        condition_expr={},
+        requirement_text="Register before operating.",
+        penalty_text="Penalty up to $500/day.",
+        confidence=0.9,
+    )
+    return snapshot
+
+
+def _as_uploaded(content: str, name: str) -> SimpleUploadedFile:
+    return SimpleUploadedFile(name, content.encode("utf-8"), content_type="text/csv")
+
+
+def _http_response(body: str | bytes, status: int = 200, url: str = "https://den.example/") -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response._content = body.encode() if isinstance(body, str) else body
+    response._content_consumed = True
+    response.encoding = "utf-8"
+    return response
 
 
 class PermitPulseAPITest(TestCase):
@@ -24,30 +143,8 @@ class PermitPulseAPITest(TestCase):
         self.client = APIClient()
         self.org = Organization.objects.create(name="Acme Hosts", slug="acme", plan="starter")
 
-    def _create_snapshot(self, city_code: str = "NYC", score: float = 0.9, status: str = "ACTIVE") -> RuleSnapshot:
-        snapshot = RuleSnapshot.objects.create(
-            city_code=city_code,
-            version=1,
-            checksum="checksum-1",
-            status=status,
-            validation_score=score,
-            source_urls=["https://example.com/rule"],
-            parsed_payload={"parser_traces": ["test"]},
-            is_active=True,
-        )
-        RuleClause.objects.create(
-            snapshot=snapshot,
-            clause_id="registration-required",
-            category="requirement",
-            condition_expr={},
-            requirement_text="Register before operating.",
-            penalty_text="Penalty up to $500/day.",
-            confidence=0.9,
-        )
-        return snapshot
-
     def test_create_address_check_and_provenance(self):
-        self._create_snapshot()
+        _create_snapshot()
         response = self.client.post(
             "/api/v1/address-checks",
             data={"address": "123 Main St, New York, NY", "city_code": "NYC", "context": {}},
@@ -60,7 +157,7 @@ class PermitPulseAPITest(TestCase):
         self.assertIn("checksum", response.data["provenance"])
 
     def test_low_confidence_forces_auto_conservative(self):
-        self._create_snapshot(score=0.3)
+        _create_snapshot(score=0.3)
         response = self.client.post(
             "/api/v1/address-checks",
             data={"address": "789 Low Confidence Rd", "city_code": "NYC", "context": {}},
@@ -71,16 +168,32 @@ class PermitPulseAPITest(TestCase):
         self.assertEqual(response.data["decision_mode"], "AUTO_CONSERVATIVE")
 
     def test_portfolio_import(self):
-        self._create_snapshot()
+        _create_snapshot()
         csv_content = "address,city_code,is_primary_residence\n123 Main St,NYC,true\n"
         response = self.client.post(
             "/api/v1/portfolio/import",
-            data={"file": self._as_uploaded(csv_content, "portfolio.csv")},
+            data={"file": _as_uploaded(csv_content, "portfolio.csv")},
             HTTP_X_ORG_SLUG="acme",
         )
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.data["row_count"], 1)
 
+    def test_portfolio_import_stops_at_plan_quota(self):
+        _create_snapshot()
+        rows = "".join(f"{index} Main St,{('NYC', 'LA')[index % 2]}\n" for index in range(35))
+        response = self.client.post(
+            "/api/v1/portfolio/import",
+            data={"file": _as_uploaded("address,city_code\n" + rows, "portfolio.csv")},
+            HTTP_X_ORG_SLUG="acme",
+        )
+        self.assertEqual(response.status_code, 201)
+        counts = response.data["report"]["result_counts"]
+        # Starter plans get 30 checks; LA has no snapshot, so its rows are UNDETERMINED and untraced.
+        self.assertEqual(sum(counts.values()), 30)
+        self.assertEqual(AddressCheck.objects.filter(organization=self.org).count(), 30)
+        self.assertEqual(DecisionTrace.objects.count(), 15)
+        self.assertEqual(counts["UNDETERMINED"], 15)
+
     def test_billing_webhook_creates_policy_action(self):
         payload = {
             "id": "evt_1",
@@ -96,7 +209,7 @@ class PermitPulseAPITest(TestCase):
         self.assertTrue(CustomerPolicyAction.objects.filter(action_type="payment_failed").exists())
 
     def test_autonomy_status_endpoint(self):
-        self._create_snapshot()
+        _create_snapshot()
         AutonomyEvent.objects.create(
             event_type="ops_loop",
             trigger="test",
@@ -168,14 +281,14 @@ class PermitPulseAPITest(TestCase):
         }
         response = self.client.get(
             "/api/v1/internal/cron/daily-maintenance",
-            HTTP_X_VERCEL_CRON="0 3 * * *",
+            HTTP_X_VERCEL_CRON="0 * * * *",
         )
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data["status"], "healthy")
 
     @patch("permitpulse.services.ingestion.fetch_city_document")
     def test_ingestion_failure_keeps_previous_snapshot(self, fetch_city_document_mock):
-        previous = self._create_snapshot()
+        previous = _create_snapshot()
         fetch_city_document_mock.side_effect = RuntimeError("network down")
 
         snapshot = ingest_city_rules("NYC")
@@ -198,8 +311,1210 @@ class PermitPulseAPITest(TestCase):
         self.assertGreaterEqual(summary["actions_executed"], 1)
         self.assertTrue(RollbackEvent.objects.exists())
 
+    def test_list_address_checks_with_keyset_pagination(self):
+        snapshot = _create_snapshot()
+        for index in range(5):
+            self.client.post(
+                "/api/v1/address-checks",
+                data={"address": f"{index} Page St", "city_code": "NYC", "context": {}},
+                format="json",
+                HTTP_X_ORG_SLUG="acme",
+            )
+        self.client.post(
+            "/api/v1/address-checks",
+            data={"address": "1 Other St", "city_code": "LA", "context": {}},
+            format="json",
+        )
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"org": "acme", "limit": 2, "omit": "evidence", "snapshot": snapshot.id}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get("/api/v1/address-checks", params)
+            self.assertEqual(response.status_code, 200)
+            for row in response.data["results"]:
+                self.assertNotIn("evidence", row)
+                self.assertEqual(row["provenance"]["snapshot_id"], snapshot.id)
+            seen.extend(row["id"] for row in response.data["results"])
+            cursor = response.data["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+        response = self.client.get("/api/v1/address-checks", {"city_code": "la", "fields": "id,city_code"})
+        self.assertEqual([set(row) for row in response.data["results"]], [{"id", "city_code"}])
+
+        self.assertEqual(self.client.get("/api/v1/address-checks", {"cursor": "not-a-cursor"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/v1/address-checks", {"org": "missing"}).status_code, 404)
+
+    def test_alerts_cursor_pagination_and_since_id_sync(self):
+        other = Organization.objects.create(name="Other", slug="other")
+        alerts = [
+            Alert.objects.create(
+                organization=self.org,
+                city_code="NYC",
+                change_type="rule_update",
+                message=f"update {index}",
+                status="read" if index == 0 else "new",
+            )
+            for index in range(5)
+        ]
+        Alert.objects.create(organization=other, city_code="NYC", change_type="rule_update", message="other")
+
+        first = self.client.get("/api/v1/alerts", {"org": "acme", "limit": 3})
+        second = self.client.get("/api/v1/alerts", {"org": "acme", "limit": 3, "cursor": first.data["next_cursor"]})
+        ids = [row["id"] for row in first.data["results"] + second.data["results"]]
+        self.assertEqual(ids, [alert.id for alert in reversed(alerts)])
+        self.assertIsNone(second.data["next_cursor"])
+
+        unread = self.client.get("/api/v1/alerts", {"org": "acme", "status": "new"})
+        self.assertEqual(len(unread.data["results"]), 4)
+
+        sync = self.client.get("/api/v1/alerts", {"org": "acme", "since_id": alerts[2].id, "limit": 1})
+        self.assertEqual([row["id"] for row in sync.data["results"]], [alerts[3].id])
+        self.assertTrue(sync.data["has_more"])
+        sync = self.client.get("/api/v1/alerts", {"org": "acme", "since_id": sync.data["next_since_id"]})
+        self.assertEqual([row["id"] for row in sync.data["results"]], [alerts[4].id])
+        self.assertFalse(sync.data["has_more"])
+
+        self.assertEqual(self.client.get("/api/v1/alerts", {"since": "yesterday"}).status_code, 400)
+
+
+class ReadReplicaRouterTest(TransactionTestCase):
+    # The test settings add a `replica` alias mirroring the test database, so routed queries run on a real
+    # second connection; data must be committed for it to see, hence TransactionTestCase.
+    databases = {"default", "replica"}
+    serialized_rollback = True
+
+    def setUp(self) -> None:
+        Organization.objects.create(name="Acme Hosts", slug="acme", plan="starter")
+        self.router = ReadReplicaRouter()
+        self.tokens = begin_request(pinned=False)
+
+    def tearDown(self) -> None:
+        end_request(self.tokens)
+
+    def test_reads_go_to_replica_only_inside_replica_block(self):
+        self.assertEqual(Organization.objects.get(slug="acme")._state.db, "default")
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(Organization), "replica")
+            self.assertEqual(Organization.objects.get(slug="acme")._state.db, "replica")
+
+    def test_write_pins_remaining_reads_to_primary(self):
+        with read_from_replica():
+            Organization.objects.create(name="Beta Hosts", slug="beta", plan="starter")
+            self.assertEqual(self.router.db_for_write(Organization), "default")
+            self.assertEqual(Organization.objects.get(slug="beta")._state.db, "default")
+
+    def test_reads_inside_primary_transaction_stay_on_primary(self):
+        with transaction.atomic(), read_from_replica():
+            self.assertIsNone(self.router.db_for_read(Organization))
+            self.assertEqual(Organization.objects.get(slug="acme")._state.db, "default")
+
+    @patch("permitpulse.db_router.replica_configured", return_value=False)
+    def test_reads_stay_on_primary_without_replica(self, _):
+        with read_from_replica():
+            self.assertIsNone(self.router.db_for_read(Organization))
+
+    def test_replica_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica", "permitpulse"))
+        self.assertTrue(self.router.allow_migrate("default", "permitpulse"))
+
+    def test_write_request_sets_primary_pin_cookie(self):
+        client = APIClient()
+        response = client.get("/api/v1/address-checks", HTTP_X_ORG_SLUG="acme")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+        response = client.post(
+            "/api/v1/address-checks",
+            data={"address": "1 Pin St", "city_code": "NYC", "context": {}},
+            format="json",
+            HTTP_X_ORG_SLUG="acme",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
+        self.assertEqual(response.cookies[PRIMARY_PIN_COOKIE]["max-age"], settings.REPLICA_PIN_SECONDS)
+
+    @patch("permitpulse.services.supabase.replica_configured", return_value=False)
+    def test_supabase_status_reports_replica(self, _):
+        response = APIClient().get("/api/v1/system/supabase-status")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["replica"]["configured"])
+        self.assertIsNone(response.data["replica"]["lag_seconds"])
+
+
+class DatabaseConnectionConfigTest(TestCase):
+    def test_supabase_transaction_pooler_disables_server_side_state(self):
+        config = _database_from_url(
+            "postgresql://postgres.ref:pw@aws-0-us-east-1.pooler.supabase.com:6543/postgres?sslmode=require"
+        )
+        self.assertTrue(config["DISABLE_SERVER_SIDE_CURSORS"])
+        self.assertIsNone(config["OPTIONS"]["prepare_threshold"])
+        self.assertEqual(config["OPTIONS"]["sslmode"], "require")
+        self.assertGreater(config["CONN_MAX_AGE"], 0)
+        self.assertTrue(config["CONN_HEALTH_CHECKS"])
+
+    def test_session_pooler_keeps_server_side_cursors(self):
+        config = _database_from_url("postgresql://postgres.ref:pw@aws-0-us-east-1.pooler.supabase.com:5432/postgres")
+        self.assertNotIn("DISABLE_SERVER_SIDE_CURSORS", config)
+
+    def test_pgbouncer_flag_and_conn_max_age_override(self):
+        with patch.dict(os.environ, {"DB_CONN_MAX_AGE": "0"}):
+            config = _database_from_url("postgresql://u:p@localhost:6432/app?pgbouncer=true")
+        self.assertTrue(config["DISABLE_SERVER_SIDE_CURSORS"])
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+
+    def test_connection_benchmark_emits_json(self):
+        output = StringIO()
+        options = {"iterations": 3, "current_db": True, "force": True, "stderr": StringIO()}
+        call_command("run_benchmarks", "db_connections", stdout=output, **options)
+        report = json.loads(output.getvalue())
+        self.assertEqual(
+            {row["name"] for row in report["results"]},
+            {"per_request_connections", "persistent_connections"},
+        )
+
+
+class BenchmarkSuiteTest(TestCase):
+    def test_micro_benchmarks_compare_against_baseline(self):
+        with TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "baseline.json")
+            options = {"iterations": 2, "scale": 0.005, "current_db": True, "force": True, "stderr": StringIO()}
+            suites = ("decision", "rule_parser", "slo", "html_normalize")
+            call_command("run_benchmarks", *suites, output=baseline, stdout=StringIO(), **options)
+
+            output = StringIO()
+            call_command("run_benchmarks", *suites, compare=baseline, stdout=output, **options)
+        report = json.loads(output.getvalue())
+        names = {f"{row['suite']}:{row['name']}" for row in report["results"]}
+        self.assertIn("decision:evaluate_condition:deep", names)
+        self.assertIn("rule_parser:parse_rule_document", names)
+        self.assertIn("slo:record_slo_metrics", names)
+        self.assertIn("html_normalize:stdlib:page_100k", names)
+        self.assertTrue(all(row["matches_stdlib"] for row in report["results"] if row["suite"] == "html_normalize"))
+        self.assertEqual({f"{row['suite']}:{row['name']}" for row in report["comparison"]}, names)
+
+    @override_settings(DEBUG=False)
+    def test_current_db_requires_force_and_is_repeatable(self):
+        with self.assertRaises(CommandError):
+            call_command("run_benchmarks", "json_render", current_db=True, stdout=StringIO())
+
+        _create_snapshot()
+        before = {model.__name__: model.objects.count() for model in SEEDED_MODELS}
+        options = {"iterations": 2, "scale": 0.001, "current_db": True, "force": True, "stderr": StringIO()}
+        for _ in range(2):
+            call_command("run_benchmarks", "json_render", "decision", "slo", stdout=StringIO(), **options)
+            self.assertEqual({model.__name__: model.objects.count() for model in SEEDED_MODELS}, before)
+
+    def test_seed_scale_data_is_deterministic_and_consistent(self):
+        options = {"organizations": 3, "versions": 2, "clauses": 4, "checks": 25, "events": 12, "days": 1}
+        output = StringIO()
+        call_command("seed_scale_data", force=True, batch_size=10, seed=7, stdout=output, **options)
+        counts = json.loads(output.getvalue())
+        self.assertEqual(counts["address_checks"], 25)
+        self.assertEqual(DecisionTrace.objects.count(), 25)
+        self.assertEqual(AutonomyEvent.objects.count(), 12)
+        self.assertEqual(RuleSnapshot.objects.filter(is_active=True).count(), 3)
+        first_run = list(AddressCheck.objects.order_by("id").values_list("city_code", "result_grade", "evidence"))
+
+        # Sequences are reset after explicit ids, so regular inserts keep working.
+        AddressCheck.objects.create(address="1 After Seed St", city_code="NYC")
+        AddressCheck.objects.all().delete()
+        call_command("seed_scale_data", force=True, batch_size=10, seed=7, stdout=StringIO(), **options)
+        second_run = list(AddressCheck.objects.order_by("id").values_list("city_code", "result_grade", "evidence"))
+        self.assertEqual([row[:2] for row in first_run], [row[:2] for row in second_run])
+
+
+class LoadHarnessTest(TestCase):
+    def test_wsgi_transport_drives_production_entrypoint(self):
+        prepare_load_data(seed=1, clauses=3)
+        transport = WSGITransport(load_wsgi_app())
+        rng = random.Random(1)
+        with offline_stubs("load-secret"):
+            for name in ("address_check", "portfolio_upload", "rules_latest", "alerts", "cron"):
+                with self.subTest(scenario=name):
+                    status, headers = transport.send(SCENARIOS[name](rng))
+                    self.assertIn(status, {200, 201})
+                    self.assertIn("x-db-query-count", headers)
+
+    def test_run_load_reports_percentiles_per_scenario(self):
+        class FakeTransport:
+            def send(self, request):
+                return (200 if request.method == "GET" else 500), {"x-db-query-count": "3"}
+
+        report = run_load(FakeTransport(), parse_mix("rules_latest=3,address_check=1"), 40, concurrency=3)
+        self.assertEqual(report["overall"]["requests"], 40)
+        scenarios = {row["scenario"]: row for row in report["scenarios"]}
+        self.assertEqual(scenarios["address_check"]["errors"], scenarios["address_check"]["requests"])
+        self.assertEqual(scenarios["rules_latest"]["avg_queries"], 3.0)
+        with self.assertRaises(ValueError):
+            parse_mix("nope=1")
+
+    @override_settings(DEBUG=False)
+    def test_current_db_requires_force_and_skips_cron(self):
+        with self.assertRaises(CommandError):
+            call_command("load_test", current_db=True, stdout=StringIO())
+
+        with patch("permitpulse.management.commands.load_test.run_load", return_value={}) as run:
+            call_command("load_test", current_db=True, force=True, stdout=StringIO(), stderr=StringIO())
+        self.assertNotIn("cron", run.call_args.args[1])
+        self.assertIn("address_check", run.call_args.args[1])
+        with self.assertRaises(CommandError):
+            call_command("load_test", current_db=True, force=True, mix="cron=1", stderr=StringIO())
+
+
+class CompactEvidenceTest(TestCase):
+    def setUp(self):
+        self.snapshot = _create_snapshot()
+        RuleClause.objects.create(
+            snapshot=self.snapshot,
+            clause_id="primary-residence",
+            category="prohibition",
+            condition_expr={"not": {"field": "property.is_primary_residence", "op": "eq", "value": True}},
+            requirement_text="Only primary residences may be rented.",
+            penalty_text="Prohibited.",
+            confidence=0.9,
+        )
+
+    def _decide(self, compact: bool) -> AddressCheck:
+        with override_settings(PERMITPULSE_COMPACT_EVIDENCE=compact):
+            return run_address_decision(DecisionInput(address="5 Compact St", city_code="NYC", context={}))
+
+    def _representation(self, check_id: int) -> dict:
+        clause_cache.clear()
+        data = AddressCheckSerializer(AddressCheck.objects.select_related("snapshot").get(id=check_id)).data
+        return {key: value for key, value in data.items() if key not in {"id", "created_at"}}
+
+    def test_compact_rows_serialize_like_inline_rows(self):
+        inline, compact = self._decide(compact=False), self._decide(compact=True)
+        stored = AddressCheck.objects.get(id=compact.id)
+        self.assertEqual((stored.evidence, stored.blocker_flags, stored.required_actions), ([], [], []))
+        self.assertEqual(len(stored.evidence_clause_ids), 2)
+        self.assertEqual(self._representation(compact.id), self._representation(inline.id))
+
+        clause_cache.clear()
+        checks = AddressCheck.objects.select_related("snapshot").filter(id__in=[inline.id, compact.id])
+        with self.assertNumQueries(2):  # checks + one clause lookup
+            rows = AddressCheckSerializer(checks, many=True).data
+        self.assertEqual(rows[0]["evidence"], rows[1]["evidence"])
+
+    def test_backfill_compacts_exactly_reproducible_rows(self):
+        inline = self._decide(compact=False)
+        expected = self._representation(inline.id)
+        AddressCheck.objects.create(
+            address="6 Edited St",
+            city_code="NYC",
+            snapshot=self.snapshot,
+            evidence=[{"clause_id": "registration-required", "category": "requirement"}],
+        )
+        out = StringIO()
+        call_command("compact_evidence", stdout=out)
+        self.assertIn("compacted=1 skipped=1", out.getvalue())
+        self.assertTrue(AddressCheck.objects.get(id=inline.id).evidence_compact)
+        self.assertEqual(self._representation(inline.id), expected)
+
+
+class CityIngestScheduleTest(TestCase):
+    def _history(self, city_code: str, published_days_ago: list[int]) -> None:
+        now = timezone.now()
+        for version, days_ago in enumerate(published_days_ago, start=1):
+            RuleSnapshot.objects.create(
+                city_code=city_code,
+                version=version,
+                checksum=f"{city_code}-{version}",
+                published_at=now - timedelta(days=days_ago),
+            )
+
+    def test_interval_follows_change_frequency(self):
+        self._history("NYC", list(range(80, -1, -8)))
+        self._history("LA", [80])
+
+        volatile = change_interval_seconds("NYC")
+        self.assertAlmostEqual(volatile, 80 * 86400 / 10 / 4, delta=60)
+        self.assertEqual(change_interval_seconds("LA"), 7 * 86400)
+        self.assertEqual(change_interval_seconds("SF"), 7 * 86400)
+
+    def test_failures_back_off_and_success_resets(self):
+        record_ingest_outcome("NYC", "error", None)
+        schedule = record_ingest_outcome("NYC", "error", None)
+        self.assertEqual(schedule.consecutive_failures, 2)
+        self.assertAlmostEqual((schedule.next_due_at - timezone.now()).total_seconds(), 1800, delta=5)
+
+        stale = RuleSnapshot.objects.create(city_code="NYC", version=1, checksum="c", status="STALE")
+        schedule = record_ingest_outcome("NYC", "unchanged", stale)
+        self.assertEqual(schedule.consecutive_failures, 0)
+        self.assertAlmostEqual((schedule.next_due_at - timezone.now()).total_seconds(), 6 * 3600, delta=5)
+
+    def test_due_cities_most_overdue_first(self):
+        now = timezone.now()
+        for city_code, overdue_hours in (("NYC", -1), ("LA", 12), ("SF", 48)):
+            CityIngestSchedule.objects.create(
+                city_code=city_code,
+                interval_seconds=86400,
+                last_checked_at=now - timedelta(days=1),
+                next_due_at=now - timedelta(hours=overdue_hours),
+            )
+        CityIngestSchedule.objects.filter(city_code="LA").update(consecutive_failures=2)
+
+        self.assertEqual(due_cities(now=now), ["LA", "SF"])
+        self.assertEqual(due_cities(now=now, limit=1), ["LA"])
+        self.assertEqual(due_cities(now=now, horizon=timedelta(hours=2)), ["LA", "SF", "NYC"])
+        self.assertEqual(due_cities(["NYC", "SF", "DEN"], now=now), ["DEN", "SF"])
+
+    @patch("permitpulse.services.ingestion.fetch_city_document", side_effect=RuntimeError("network down"))
+    def test_ingestion_records_outcome(self, fetch):
+        ingest_city_rules("NYC")
+
+        schedule = CityIngestSchedule.objects.get(city_code="NYC")
+        self.assertEqual((schedule.last_outcome, schedule.consecutive_failures), ("error", 1))
+
+
+class CityRegistryTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.city = City.objects.create(code="DEN", name="Denver")
+        CitySource.objects.create(city=self.city, url="https://den.example/ordinance", position=0)
+        CitySource.objects.create(
+            city=self.city,
+            url="https://den.example/api/rules",
+            kind="api",
+            position=1,
+            options={"text_fields": ["text"]},
+        )
+        CitySource.objects.create(
+            city=self.city, url="https://den.example/fees.pdf", kind="pdf", position=2, optional=True
+        )
+        active_city_cache.clear()
+        self.addCleanup(active_city_cache.clear)
+        self.pages = {
+            "https://den.example/ordinance": _http_response("<p>Hosts must register short-term rentals.</p>"),
+            "https://den.example/api/rules": _http_response(
+                json.dumps({"rules": [{"id": "r1", "text": "Display the permit number."}]})
+            ),
+            "https://den.example/fees.pdf": _http_response("unavailable", status=503),
+        }
+
+    def _get(self, session, url, timeout, stream=False):
+        return self.pages[url]
+
+    def test_sources_are_merged_in_order_and_optional_failures_skipped(self):
+        with (
+            patch.object(requests.Session, "get", autospec=True, side_effect=self._get),
+            self.assertLogs("permitpulse.connectors.city_sources", "WARNING"),
+        ):
+            document = prefetch_city_documents(["DEN"])["DEN"].result()
+
+        self.assertEqual(document.source_urls, ["https://den.example/ordinance", "https://den.example/api/rules"])
+        self.assertEqual(
+            document.source_hashes["https://den.example/ordinance"],
+            hashlib.sha256(self.pages["https://den.example/ordinance"].content).hexdigest(),
+        )
+        self.assertLess(document.content.index("register"), document.content.index("permit number"))
+        self.assertNotIn("r1", document.content)
+
+        with patch("permitpulse.services.ingestion.fetch_city_document", return_value=document):
+            snapshot = ingest_city_rules("DEN")
+        self.assertEqual(snapshot.source_urls, document.source_urls)
+
+    def test_prefetch_window_is_bounded_and_leftovers_cancelled(self):
+        started: list[str] = []
+        fetches = {}
+
+        def prefetch(city_codes, timeout=None):
+            started.extend(city_codes)
+            fetches.update({code: Mock(spec=["result", "cancel"]) for code in city_codes})
+            return {code: fetches[code] for code in city_codes}
+
+        codes = [f"C{index}" for index in range(10)]
+        with patch("permitpulse.services.city_registry.prefetch_city_documents", side_effect=prefetch):
+            with closing(iter_prefetched(codes, ahead=2)) as window:
+                for city_code, fetch in window:
+                    self.assertIs(fetch, fetches[city_code])
+                    # Only the current city and the two after it have been started.
+                    self.assertEqual(started, codes[: codes.index(city_code) + 3])
+                    if city_code == "C4":
+                        break
+        self.assertEqual([code for code, fetch in fetches.items() if fetch.cancel.called], ["C5", "C6"])
+
+    def test_required_source_failure_fails_the_city(self):
+        self.pages["https://den.example/api/rules"] = _http_response("down", status=500)
+        with (
+            patch.object(requests.Session, "get", autospec=True, side_effect=self._get),
+            self.assertRaises(requests.HTTPError),
+        ):
+            fetch_city_document("DEN")
+
+    @override_settings(CITY_FETCH_MAX_BYTES=30)
+    def test_oversized_and_truncated_responses_are_distinct_outcomes(self):
+        self.pages["https://den.example/ordinance"] = _http_response("<p>" + "Hosts must register. " * 5 + "</p>")
+        with patch.object(requests.Session, "get", autospec=True, side_effect=self._get):
+            ingest_city_rules("DEN")
+        self.assertEqual(CityIngestSchedule.objects.get(city_code="DEN").last_outcome, "oversized")
+
+        short = _http_response("<p>Register.</p>")
+        short.headers["Content-Length"] = "29"
+        self.pages["https://den.example/ordinance"] = short
+        with patch.object(requests.Session, "get", autospec=True, side_effect=self._get):
+            ingest_city_rules("DEN")
+        schedule = CityIngestSchedule.objects.get(city_code="DEN")
+        self.assertEqual((schedule.last_outcome, schedule.consecutive_failures), ("truncated", 2))
+        event = AutonomyEvent.objects.filter(action_taken="fallback_to_previous_snapshot").latest("id")
+        self.assertEqual(event.details["ingest_outcome"], "truncated")
+
+    def test_per_host_limit(self):
+        fetcher = SourceFetcher(max_workers=8, per_host=2)
+        in_flight, peak, lock = [0], [0], threading.Lock()
+
+        def get(session, url, timeout, stream=False):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return _http_response("<p>ok</p>")
+
+        sources = [SourceSpec(url=f"https://slow.example/{index}") for index in range(6)]
+        with patch.object(requests.Session, "get", autospec=True, side_effect=get):
+            document = fetcher.fetch_city("DEN", sources, timeout=5)
+
+        self.assertEqual(len(document.source_urls), 6)
+        self.assertEqual(peak[0], 2)
+
+    def test_registered_city_is_accepted_by_address_checks(self):
+        payload = {"address": "1 Larimer St", "city_code": "den", "context": {}}
+        self.assertEqual(self.client.post("/api/v1/address-checks", payload, format="json").status_code, 201)
+
+        self.city.is_active = False
+        self.city.save()
+        active_city_cache.clear()
+        self.assertEqual(self.client.post("/api/v1/address-checks", payload, format="json").status_code, 400)
+
+
+@override_settings(CIRCUIT_FAILURE_THRESHOLD=2, OPENAI_API_KEY="test-key")
+class CircuitBreakerTest(TestCase):
+    def setUp(self):
+        city = City.objects.create(code="DEN", name="Denver")
+        CitySource.objects.create(city=city, url="https://den.example/ordinance")
+
+    def _transitions(self, name):
+        return list(
+            AutonomyEvent.objects.filter(trigger=f"circuit:{name}").order_by("id").values_list("action_taken", flat=True)
+        )
+
+    def test_city_host_opens_fails_fast_and_recovers_after_probe(self):
+        name = "city_source:den.example"
+        with patch.object(requests.Session, "get", autospec=True, side_effect=requests.Timeout("slow")) as get:
+            for _ in range(2):
+                with self.assertRaises(requests.Timeout):
+                    fetch_city_document("DEN")
+            with self.assertRaises(CircuitOpenError):
+                fetch_city_document("DEN")
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(CircuitBreaker.objects.get(name=name).state, "open")
+
+        CircuitBreaker.objects.filter(name=name).update(retry_at=timezone.now() - timedelta(seconds=1))
+        with patch.object(requests.Session, "get", autospec=True, return_value=_http_response("<p>ok</p>")):
+            fetch_city_document("DEN")
+
+        self.assertEqual(CircuitBreaker.objects.get(name=name).state, "closed")
+        self.assertEqual(self._transitions(name), ["circuit_open", "circuit_half_open", "circuit_closed"])
+
+    def test_single_half_open_probe_and_failed_probe_reopens(self):
+        breaker = CircuitBreaker.objects.create(
+            name="openai", state="open", consecutive_failures=2, retry_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(blocked(["openai"]), set())
+        self.assertEqual(blocked(["openai"]), {"openai"})
+
+        record_failure("openai", requests.ConnectionError("refused"))
+        breaker.refresh_from_db()
+        self.assertEqual(breaker.state, "open")
+        self.assertGreater(breaker.retry_at, timezone.now())
+
+    def test_concurrent_failures_are_all_counted(self):
+        # Two fetches read the closed breaker before either records its failure.
+        name = "city_source:den.example"
+        CircuitBreaker.objects.create(name=name)
+        stale = [(CircuitBreaker.objects.get(name=name), False) for _ in range(2)]
+        with patch.object(CircuitBreaker.objects, "get_or_create", side_effect=stale):
+            record_failure(name, requests.Timeout("slow"))
+            record_failure(name, requests.Timeout("slow"))
+
+        breaker = CircuitBreaker.objects.get(name=name)
+        self.assertEqual((breaker.state, breaker.consecutive_failures), ("open", 2))
+        self.assertEqual(self._transitions(name), ["circuit_open"])
+
+    @patch("permitpulse.parsers.rule_parser._request_llm_clauses", side_effect=requests.Timeout("slow"))
+    def test_llm_extraction_skipped_while_openai_circuit_is_open(self, request_llm):
+        for _ in range(3):
+            self.assertEqual(_llm_schema_extract("Hosts must register."), [])
+
+        self.assertEqual(request_llm.call_count, 2)
+        self.assertEqual(self._transitions("openai"), ["circuit_open"])
+
+
+@override_settings(OPENAI_API_KEY="test-key", OPENAI_MAX_RETRIES=2)
+class LLMRateLimitTest(TestCase):
+    def setUp(self):
+        self.limiter = RateLimiter(
+            requests_per_minute=600, tokens_per_minute=100_000, max_concurrency=2, max_wait_seconds=1
+        )
+        limiter = patch("permitpulse.parsers.rule_parser.llm_limiter", self.limiter)
+        limiter.start()
+        self.addCleanup(limiter.stop)
+        self.exporter = InMemorySpanExporter()
+        configure_tracing(self.exporter)
+        self.addCleanup(configure_tracing)
+
+    def test_caller_queues_until_budget_or_times_out(self):
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=600, max_concurrency=1, max_wait_seconds=0.5)
+        with limiter.slot(600) as waited:
+            self.assertLess(waited, 0.1)
+        with limiter.slot(5) as waited:  # 5 tokens refill in 0.5s
+            self.assertGreater(waited, 0.3)
+        with self.assertRaises(RateLimitTimeout):
+            with limiter.slot(600):
+                pass
+
+    def test_429_is_retried_after_retry_after(self):
+        throttled = requests.HTTPError(response=_http_response("slow down", status=429))
+        throttled.response.headers["Retry-After"] = "0.05"
+        clause = {"clause_id": "llm-1", "category": "requirement", "requirement_text": "Register."}
+        with patch("permitpulse.parsers.rule_parser._request_llm_clauses", side_effect=[throttled, [clause]]) as call:
+            self.assertEqual(_llm_schema_extract("Hosts must register."), [clause])
+
+        self.assertEqual(call.call_count, 2)
+        span = next(span for span in self.exporter.get_finished_spans() if span.name == "parser.llm_schema_extract")
+        self.assertEqual(span.attributes["throttled"], 1)
+        self.assertGreaterEqual(span.attributes["queue_wait_ms"], 40)
+        self.assertEqual(span.attributes["limiter.requests_last_minute"], 2)
+        self.assertFalse(CircuitBreaker.objects.filter(name="openai").exclude(state="closed").exists())
+
+    @override_settings(OPENAI_MAX_RETRIES=3, CIRCUIT_FAILURE_THRESHOLD=3, OPENAI_RETRY_BASE_SECONDS=0.01)
+    def test_throttled_burst_does_not_open_openai_circuit(self):
+        throttled = requests.HTTPError(response=_http_response("slow down", status=429))
+        clause = {"clause_id": "llm-1", "category": "requirement", "requirement_text": "Register."}
+        with patch(
+            "permitpulse.parsers.rule_parser._request_llm_clauses", side_effect=[throttled] * 3 + [[clause]]
+        ) as call:
+            self.assertEqual(_llm_schema_extract("Hosts must register."), [clause])
+        self.assertEqual(call.call_count, 4)
+        self.assertFalse(CircuitBreaker.objects.filter(name="openai").exclude(state="closed").exists())
+
+        # A call that is still throttled once its retries run out counts once, not once per attempt.
+        with patch("permitpulse.parsers.rule_parser._request_llm_clauses", side_effect=throttled):
+            self.assertEqual(_llm_schema_extract("Hosts must register."), [])
+        breaker = CircuitBreaker.objects.get(name="openai")
+        self.assertEqual((breaker.state, breaker.consecutive_failures), ("closed", 1))
+
+    def test_retry_after_parsing(self):
+        self.assertEqual(retry_after_seconds({"Retry-After": "7"}, 0, 2, 60), 7)
+        self.assertEqual(retry_after_seconds({"Retry-After": "3600"}, 0, 2, 60), 60)
+        self.assertEqual(retry_after_seconds({}, 2, 2, 60), 8)
+
+
+class HTMLTextTest(TestCase):
+    HTML = (
+        "<html><head><title>Rules</title><style>p{}</style><script>var a = '<p>x</p>';</script></head><body>"
+        "<header><h1>City Hall</h1></header><nav><a href='/'>Home</a></nav>a<b>b</b>c &amp; d&nbsp;e"
+        " <!-- note --> f<br/>g<template><p>hidden</p></template> AT&T <div>  lots of\n\n space </div>"
+        "<aside>Subscribe</aside><p>Text<!--x-->more</p><footer>Contact</footer>end</body></html>"
+    )
+
+    def test_boilerplate_is_stripped_in_any_chunking(self):
+        expected = "Rules a b c & d e f g AT&T lots of space Text more end"
+        for size in (5, 1000, len(self.HTML)):
+            self.assertEqual(extract_text(iter_chunks(self.HTML, size)), expected)
+
+    # Markup that lxml and selectolax repair differently: stray and misplaced end tags, text before <html>, CDATA,
+    # implied end tags, empty elements and form fields.
+    MALFORMED = {
+        "<p>Permit</font>number</p>": "Permitnumber",
+        "<div>x</p>y</div>": "xy",
+        "lead<html><body>x</body></html>": "leadx",
+        "<p>a<![CDATA[x]]>y</p>": "a y",
+        "<p>a<textarea>b<i>c</i></textarea>d</p>": "a d",
+        "<ul><li>a<li>b</ul><p>c<div>d</div>e</p>": "a b c d e",
+        "<b>x</b></b>y<span> </span>z<br>w<p></p>v": "x y z wv",
+        "<p>a<?php x ?>b</p>": "a b",
+    }
+
+    def test_installed_backends_agree(self):
+        pages = [self.HTML, ordinance_html(random.Random(7), 50_000), *self.MALFORMED]
+        expected = [text_checksum(extract_text([page])) for page in pages]
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                self.assertEqual([text_checksum(html_to_text(page, backend)) for page in pages], expected)
+        self.assertEqual([html_to_text(page, "stdlib") for page in self.MALFORMED], list(self.MALFORMED.values()))
+        self.assertIn(available_backend("auto"), BACKENDS)
+        self.assertEqual(available_backend("stdlib"), "stdlib")
+
+
+class PatternMatcherTest(TestCase):
+    TEXT = "Hosts must Register online. Only a primary\nresidence may be rented! Syntax aside, pay taxes."
+
+    def test_clauses_carry_offsets_and_sentences(self):
+        clauses = pattern_matcher(DEFAULT_PATTERNS_FILE).extract(self.TEXT, evidence_limit=3)
+        self.assertEqual(
+            [clause["clause_id"] for clause in clauses],
+            ["registration-required", "primary-residence", "tax-registration"],
+        )
+        registration, residence, tax = clauses
+        match = registration["matches"][0]
+        self.assertEqual((match["phrase"], match["start"], match["end"]), ("register", 11, 19))
+        self.assertEqual(match["sentence"], "Hosts must Register online.")
+        self.assertEqual(residence["matches"][0]["sentence"], "Only a primary\nresidence may be rented!")
+        self.assertEqual(tax["match_count"], 1)  # "Syntax" is not a word starting with "tax".
+        self.assertEqual(tax["matches"][0]["sentence"], "Syntax aside, pay taxes.")
+
+    def test_hundreds_of_phrases_in_one_pass(self):
+        rules = [
+            PatternRule(template={"clause_id": f"r{index}"}, phrases=(f"zone {index}",)) for index in range(300)
+        ]
+        rules.append(PatternRule(template={"clause_id": "zone"}, phrases=("zone",)))
+        matcher = PatternMatcher(rules)
+        matches = list(matcher.finditer("Zone 12 and zone 250, zone 7x and zone."))
+        self.assertEqual([match.phrase for match in matches], ["zone 12", "zone 250", "zone 7", "zone"])
+        self.assertEqual(matcher.phrase_count, 301)
+
+    def test_invalid_registry_is_rejected(self):
+        with TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "patterns.json")
+            with open(path, "w") as handle:
+                json.dump([{"clause_id": "a", "category": "tax", "requirement_text": "x", "confidence": 1}], handle)
+            with self.assertRaisesMessage(ValueError, "missing phrases"):
+                load_pattern_rules(path)
+
+    @patch("permitpulse.services.ingestion.fetch_city_document")
+    def test_published_clauses_keep_match_metadata(self, fetch_city_document_mock):
+        fetch_city_document_mock.return_value = RawRuleDocument(
+            city_code="NYC", source_url="https://example.com/rules", content=f"<p>{self.TEXT}</p>"
+        )
+        snapshot = ingest_city_rules("NYC")
+        metadata = snapshot.clauses.get(clause_id="primary-residence").metadata
+        self.assertEqual(metadata["match_count"], 1)
+        self.assertEqual(metadata["matches"][0]["phrase"], "primary residence")
+
+
+@patch("permitpulse.services.maintenance.run_autonomous_recovery_cycle", return_value={"actions_executed": 1})
+@patch("permitpulse.services.maintenance.record_slo_metrics", return_value=[])
+@patch("permitpulse.services.maintenance.ingest_city_rules")
+class MaintenanceCheckpointTest(TestCase):
+    def setUp(self):
+        prefetch = patch("permitpulse.services.city_registry.prefetch_city_documents", return_value={})
+        prefetch.start()
+        self.addCleanup(prefetch.stop)
+        self.snapshot = RuleSnapshot.objects.create(city_code="NYC", version=1, checksum="c1", status="ACTIVE")
+
+    def test_zero_budget_advances_one_step_per_invocation(self, ingest, record_slo, recovery):
+        ingest.return_value = self.snapshot
+
+        first = run_daily_maintenance(budget_seconds=0)
+        self.assertEqual((first["status"], first["pending_cities"]), ("in_progress", ["LA", "SF"]))
+
+        results = [run_daily_maintenance(budget_seconds=0) for _ in range(4)]
+        self.assertEqual([result["complete"] for result in results], [False, False, False, True])
+        final = results[-1]
+        self.assertEqual((final["status"], final["snapshots_published"], final["invocations"]), ("healthy", 3, 5))
+        self.assertEqual([item["city_code"] for item in final["cities_processed"]], ["NYC", "LA", "SF"])
+
+        self.assertEqual(run_daily_maintenance()["run_id"], final["run_id"])
+        self.assertEqual(ingest.call_count, 3)
+        self.assertEqual(record_slo.call_count, 1)
+        self.assertEqual(
+            AutonomyEvent.objects.filter(action_taken="daily_maintenance_cycle", outcome="healthy").count(), 1
+        )
+
+    def test_city_cut_off_repeatedly_is_skipped(self, ingest, record_slo, recovery):
+        ingest.return_value = self.snapshot
+        MaintenanceRun.objects.create(
+            cycle_start=cycle_start(timezone.now()), checkpoint={"in_flight": {"city_code": "NYC", "attempts": 2}}
+        )
+
+        result = run_daily_maintenance()
+
+        self.assertEqual(result["status"], "degraded")
+        self.assertEqual(result["cities_processed"][0], {"city_code": "NYC", "snapshot_id": None, "status": "TIMED_OUT"})
+        self.assertEqual([call.args[0] for call in ingest.call_args_list], ["LA", "SF"])
+
+    def test_invocation_waits_for_active_lease(self, ingest, record_slo, recovery):
+        MaintenanceRun.objects.create(
+            cycle_start=cycle_start(timezone.now()),
+            lease_owner="other",
+            lease_expires_at=timezone.now() + timedelta(minutes=1),
+        )
+
+        result = run_daily_maintenance()
+
+        self.assertEqual((result["status"], result["pending_cities"]), ("in_progress", ["NYC", "LA", "SF"]))
+        ingest.assert_not_called()
+
+    def test_volatile_city_is_ingested_twice_a_day(self, ingest, record_slo, recovery):
+        def ingest_city(city_code, fetch=None):
+            record_ingest_outcome(city_code, "unchanged", self.snapshot)
+            return self.snapshot
+
+        ingest.side_effect = ingest_city
+        first = datetime(2026, 10, 19, 1, 10, tzinfo=dt_timezone.utc)
+        RuleSnapshot.objects.bulk_create(
+            RuleSnapshot(
+                city_code="NYC",
+                version=version,
+                checksum=f"c{version}",
+                status="STALE",
+                published_at=first - timedelta(hours=12 * version),
+            )
+            for version in range(2, 22)
+        )
+
+        with patch("django.utils.timezone.now", return_value=first):
+            run_daily_maintenance()
+        with patch("django.utils.timezone.now", return_value=first + timedelta(hours=6)):
+            later = run_daily_maintenance()
+
+        self.assertEqual([call.args[0] for call in ingest.call_args_list], ["NYC", "LA", "SF", "NYC"])
+        self.assertEqual([item["city_code"] for item in later["cities_processed"]], ["NYC"])
+        self.assertEqual(MaintenanceRun.objects.count(), 2)
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        self.calls = []
+        job_types = {
+            "record": JobType("record", lambda value: self.calls.append(value) or {"value": value}, priority=1),
+            "flaky": JobType("flaky", self._fail, max_attempts=2),
+        }
+        registry = patch.dict(JOB_TYPES, job_types)
+        registry.start()
+        self.addCleanup(registry.stop)
+
     @staticmethod
-    def _as_uploaded(content: str, name: str):
-        from django.core.files.uploadedfile import SimpleUploadedFile
+    def _fail():
+        raise RuntimeError("upstream unavailable")
+
+    def test_workers_run_jobs_by_priority(self):
+        enqueue("record", {"value": "low"}, priority=0)
+        enqueue("record", {"value": "high"}, priority=9)
+        enqueue("record", {"value": "later"}, run_at=timezone.now() + timedelta(hours=1))
+
+        out = StringIO()
+        call_command("run_workers", "--burst", "--job-type", "record", stdout=out, stderr=StringIO())
+
+        self.assertEqual(self.calls, ["high", "low"])
+        self.assertIn("processed=2", out.getvalue())
+        self.assertEqual(Job.objects.filter(status="succeeded").count(), 2)
+        self.assertEqual(Job.objects.get(status="queued").payload, {"value": "later"})
+
+    def test_failed_job_backs_off_then_fails(self):
+        job = enqueue("flaky")
+
+        with self.assertLogs("permitpulse.services.jobs", "ERROR"):
+            execute_job(claim_next("worker-1"))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("queued", 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("upstream unavailable", job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs("permitpulse.services.jobs", "ERROR"):
+            execute_job(claim_next("worker-1"))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("failed", 2))
+
+    def test_concurrency_limit_per_job_type(self):
+        enqueue("record", {"value": "first"})
+        enqueue("record", {"value": "second"})
+
+        self.assertIsNotNone(claim_next("worker-1"))
+        self.assertIsNone(claim_next("worker-2"))
+
+    @override_settings(JOB_QUEUE_ENABLED=True)
+    def test_queued_portfolio_import(self):
+        org = Organization.objects.create(name="Acme Hosts", slug="acme", plan="starter")
+        response = APIClient().post(
+            "/api/v1/portfolio/import",
+            data={"file": _as_uploaded("address,city_code\n1 Main St,NYC\n", "portfolio.csv")},
+            HTTP_X_ORG_SLUG=org.slug,
+        )
+        self.assertEqual((response.status_code, response.data["status"]), (202, "queued"))
+
+        call_command("run_workers", "--burst", stdout=StringIO(), stderr=StringIO())
+
+        portfolio_import = PortfolioImport.objects.get(pk=response.data["id"])
+        self.assertEqual(portfolio_import.status, "completed")
+        self.assertEqual(sum(portfolio_import.report["result_counts"].values()), 1)
+
+
+class RawDocumentArchiveTest(TestCase):
+    def setUp(self):
+        archive_dir = TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        storages = {
+            "raw_documents": {
+                "BACKEND": "django.core.files.storage.FileSystemStorage",
+                "OPTIONS": {"location": archive_dir.name},
+            }
+        }
+        storage_override = override_settings(STORAGES=storages)
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+
+    def _ingest(self, city_code: str, content: str) -> RuleSnapshot:
+        document = RawRuleDocument(city_code=city_code, source_url=f"https://example.com/{city_code}", content=content)
+        with patch("permitpulse.services.ingestion.fetch_city_document", return_value=document):
+            return ingest_city_rules(city_code)
+
+    def _reparse(self, *args) -> dict:
+        out = StringIO()
+        call_command("reparse_archive", *args, stdout=out)
+        return json.loads(out.getvalue())
+
+    def test_ingestion_archives_each_document_once(self):
+        content = "<html><body>" + "<p>Hosts must register. Tax is due monthly.</p>" * 200 + "</body></html>"
+        snapshot = self._ingest("NYC", content)
+        raw_document = snapshot.raw_document
+
+        self.assertIsNotNone(raw_document)
+        self.assertEqual(load_document(raw_document).content, content)
+        self.assertLess(raw_document.compressed_size, raw_document.raw_size)
+
+        self._ingest("NYC", content)
+        self.assertEqual(RawDocument.objects.count(), 1)
+
+    def test_reparse_reports_clause_diffs_offline(self):
+        self._ingest("NYC", "<p>Hosts must register in their primary residence.</p>")
+        self._ingest("LA", "<p>Transient occupancy tax applies.</p>")
+
+        with patch("permitpulse.parsers.rule_parser.requests.post", side_effect=AssertionError("network used")):
+            report = self._reparse("--processes", "2")
+        self.assertEqual(report["documents"], 2)
+        self.assertEqual(report["snapshots_with_changes"], 0)
+
+        changed = [
+            {
+                "clause_id": "registration-required",
+                "category": "requirement",
+                "condition_expr": {},
+                "requirement_text": "Register before listing.",
+                "confidence": 0.9,
+            },
+            {"clause_id": "night-cap", "category": "requirement", "requirement_text": "90 nights per year."},
+        ]
+        with patch("permitpulse.parsers.rule_parser._match_rule_templates", return_value=changed):
+            report = self._reparse("--processes", "0", "--city", "NYC")
+        diff = report["diffs"][0]
+        self.assertEqual((diff["city_code"], diff["checksum_changed"]), ("NYC", False))
+        self.assertEqual(diff["added"], ["night-cap"])
+        self.assertEqual(diff["removed"], ["primary-residence"])
+        self.assertEqual(diff["changed"], ["registration-required"])
+
+
+class ClauseStoreTest(TestCase):
+    def test_publishing_shares_unchanged_clause_bodies(self):
+        clauses = [
+            {"clause_id": f"c{index}", "category": "requirement", "requirement_text": f"Rule {index}.", "confidence": 0.9}
+            for index in range(3)
+        ]
+        first = RuleSnapshot.objects.create(city_code="LA", version=1, checksum="a", validation_score=0.9)
+        RuleClause.objects.create_for_snapshot(first, clauses)
+        second = RuleSnapshot.objects.create(city_code="LA", version=2, checksum="b", validation_score=0.9)
+        RuleClause.objects.create_for_snapshot(second, clauses[:2] + [{**clauses[2], "requirement_text": "Changed."}])
+
+        self.assertEqual(ClauseBody.objects.count(), 4)
+        self.assertEqual(RuleClause.objects.count(), 6)
+        first_bodies = dict(first.clauses.values_list("clause_id", "body_id"))
+        second_bodies = dict(second.clauses.values_list("clause_id", "body_id"))
+        self.assertEqual(first_bodies["c0"], second_bodies["c0"])
+        self.assertNotEqual(first_bodies["c2"], second_bodies["c2"])
+        self.assertEqual(second.clauses.get(clause_id="c2").requirement_text, "Changed.")
+
+    def test_compiled_conditions_match_interpreter(self):
+        rng = random.Random(39)
+        conditions = [condition_tree(rng, depth=3, width=3) for _ in range(50)]
+        conditions += [{}, {"field": "host.registered"}, {"op": "exists"}, {"field": "property.units", "op": "bogus"}]
+        conditions += [{"field": "property.units", "op": ["gte"]}, {"field": "property.units", "op": {"gte": 1}}]
+        for condition in conditions:
+            predicate = compile_condition(condition)
+            for _ in range(10):
+                context = sample_context(rng)
+                self.assertEqual(predicate(context), evaluate_condition(condition, context))
+        self.assertFalse(evaluate_condition({"field": "property.units", "op": ["gte"]}, {"property": {"units": 3}}))
+
+
+class FastJSONTest(TestCase):
+    def test_renderer_matches_stdlib_output(self):
+        data = {
+            "published_at": datetime(2026, 2, 27, 3, 0, 0, 123456, tzinfo=dt_timezone.utc),
+            "naive": datetime(2026, 2, 27, 3, 0),
+            "effective_date": datetime(2026, 2, 27).date(),
+            "price": Decimal("12.50"),
+            "text": "line\u2028separator \u00e9",
+            1: ["non-string key"],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_renderer_falls_back_for_big_integers_and_indent(self):
+        data = {"big": 2**70}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        indented = FastJSONRenderer().render({"a": 1}, "application/json; indent=2")
+        self.assertEqual(indented, JSONRenderer().render({"a": 1}, "application/json; indent=2"))
+
+    def test_non_finite_floats_render_as_null_with_and_without_orjson(self):
+        data = {"scores": [0.5, float("nan"), float("inf"), -float("inf")], "label": "NaN"}
+        for backend in ("orjson", "stdlib"):
+            with self.subTest(backend=backend), patch(
+                "permitpulse.fast_json.orjson", fast_json.orjson if backend == "orjson" else None
+            ):
+                self.assertEqual(FastJSONRenderer().render(data), b'{"scores":[0.5,null,null,null],"label":"NaN"}')
+                indented = FastJSONRenderer().render(data, "application/json; indent=2")
+                self.assertEqual(json.loads(indented), {"scores": [0.5, None, None, None], "label": "NaN"})
+
+    def test_parser_round_trip_and_errors(self):
+        parsed = FastJSONParser().parse(BytesIO('{"address": "1 Caf\u00e9 St", "n": 1.5}'.encode()))
+        self.assertEqual(parsed, {"address": "1 Caf\u00e9 St", "n": 1.5})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(BytesIO(b'{"n": NaN}'))
+
+
+class LatencySLOTest(TestCase):
+    def setUp(self) -> None:
+        recorder.flush()
+
+    def test_histogram_buckets_bound_relative_error(self):
+        for value in (0, 31, 32, 1000, 123456, 9_999_999):
+            upper = bucket_upper_bound_us(bucket_index(value))
+            self.assertGreaterEqual(upper, value)
+            self.assertLessEqual(upper - value, max(1, value * 0.07))
+
+        histogram = LatencyHistogram()
+        for value_ms in range(1, 101):
+            histogram.record(value_ms * 1000)
+        self.assertAlmostEqual(histogram.percentile_ms(50), 50, delta=50 * 0.07)
+        self.assertAlmostEqual(histogram.percentile_ms(99), 99, delta=99 * 0.07)
+
+    def test_requests_feed_endpoint_latency_slo(self):
+        client = APIClient()
+        for _ in range(3):
+            client.get("/api/v1/alerts")
+        client.get("/api/v1/address-checks/999999")
+        recorder.flush()
+
+        response = client.get("/api/v1/system/slo")
+        latency = {row["endpoint"]: row for row in response.data["latency"]}
+        self.assertEqual(latency["GET /api/v1/alerts"]["request_count"], 3)
+        self.assertEqual(latency["GET /api/v1/address-checks/<int:check_id>"]["error_rate"], 0.0)
+        self.assertIn("p99_ms", latency["GET /api/v1/alerts"])
+
+        metrics = record_slo_metrics()
+        self.assertIn("latency_p95_ms:GET /api/v1/alerts", {metric.metric_name for metric in metrics})
+
+
+class NearDuplicateTest(TestCase):
+    RULES = " ".join(f"Section {index}. Hosts must register unit {index} before listing it." for index in range(200))
+
+    def _ingest(self, body: str) -> RuleSnapshot:
+        document = RawRuleDocument(city_code="NYC", source_url="https://example.com/rules", content=f"<p>{body}</p>")
+        with patch("permitpulse.services.ingestion.fetch_city_document", return_value=document):
+            return ingest_city_rules("NYC")
+
+    def test_similarity_estimates(self):
+        sketch = minhash_sketch(self.RULES)
+        self.assertEqual(estimate_similarity(sketch, minhash_sketch(self.RULES)), 1.0)
+        self.assertGreater(estimate_similarity(sketch, minhash_sketch(self.RULES + " Updated today.")), 0.98)
+        self.assertLess(estimate_similarity(sketch, minhash_sketch(self.RULES[: len(self.RULES) // 2])), 0.7)
+        # With fewer than SKETCH_SIZE shingles the estimate is exact: 1 of the 3 distinct shingles is shared.
+        self.assertEqual(estimate_similarity(minhash_sketch("a b c d e f"), minhash_sketch("a b c d e g")), 1 / 3)
+
+    def test_cosmetic_change_skips_extraction(self):
+        published = self._ingest(self.RULES)
+        self.assertEqual(len(published.parsed_payload["minhash"]), SKETCH_SIZE)
+
+        with override_settings(OPENAI_API_KEY="test"), patch(
+            "permitpulse.parsers.rule_parser._request_llm_clauses", side_effect=AssertionError("extraction ran")
+        ):
+            snapshot = self._ingest(self.RULES + " Page layout refreshed.")
+            # Older snapshots have no stored sketch; the archived document stands in.
+            RuleSnapshot.objects.filter(pk=published.pk).update(parsed_payload={})
+            self.assertEqual(self._ingest(self.RULES + " Banner: office closed Monday.").pk, published.pk)
+
+        self.assertEqual(snapshot.pk, published.pk)
+        self.assertEqual(CityIngestSchedule.objects.get(city_code="NYC").last_outcome, "cosmetic")
+        events = AutonomyEvent.objects.filter(action_taken="skip_publish_cosmetic_change").order_by("id")
+        self.assertEqual(len(events), 2)
+        self.assertGreaterEqual(events[0].details["similarity"], settings.NEAR_DUPLICATE_THRESHOLD)
+        self.assertEqual(Alert.objects.count(), 0)
+
+        amended = self._ingest(self.RULES[: len(self.RULES) // 2] + " Only a primary residence may be rented.")
+        self.assertEqual(amended.version, published.version + 1)
+        event = AutonomyEvent.objects.get(action_taken="publish_new_snapshot", details__version=amended.version)
+        self.assertLess(event.details["similarity"], settings.NEAR_DUPLICATE_THRESHOLD)
+
+    def test_one_word_rule_changes_are_published(self):
+        page = self.RULES + " Stays are capped at {cap} nights per year. Hosts {verb} rent a room once they register."
+        published = self._ingest(page.format(cap=90, verb="may"))
+
+        for cap, verb, changed in ((30, "may", ["numbers"]), (30, "may not", ["rule_sentences"])):
+            with self.subTest(cap=cap, verb=verb):
+                snapshot = self._ingest(page.format(cap=cap, verb=verb))
+                self.assertEqual(snapshot.version, published.version + 1)
+                event = AutonomyEvent.objects.get(
+                    action_taken="publish_new_snapshot", details__version=snapshot.version
+                )
+                # The sketch alone would have called these cosmetic.
+                self.assertGreaterEqual(event.details["similarity"], settings.NEAR_DUPLICATE_THRESHOLD)
+                self.assertEqual(event.details["changed"], changed)
+                published = snapshot
+
+
+class TracingTest(TestCase):
+    def setUp(self) -> None:
+        self.exporter = InMemorySpanExporter()
+        configure_tracing(self.exporter)
+
+    def tearDown(self) -> None:
+        configure_tracing()
+
+    @patch("permitpulse.services.ingestion.fetch_city_document")
+    def test_ingestion_and_decision_spans(self, fetch_city_document_mock):
+        Organization.objects.create(name="Acme Hosts", slug="acme")
+        fetch_city_document_mock.return_value = RawRuleDocument(
+            city_code="NYC",
+            source_url="https://example.com/rules",
+            content="<p>Hosts must register. Only a primary residence may be rented. Pay tax.</p>",
+        )
+        snapshot = ingest_city_rules("NYC")
+        run_address_decision(DecisionInput(address="1 Trace St", city_code="NYC", context={}))
+
+        spans = {span.name: span for span in self.exporter.get_finished_spans()}
+        for name in (
+            "ingestion.city",
+            "parser.normalize_text",
+            "parser.rule_based_extract",
+            "ingestion.validate",
+            "ingestion.publish",
+            "ingestion.broadcast_alert",
+            "decision.quota",
+            "decision.snapshot_load",
+            "decision.evaluate",
+            "decision.write",
+        ):
+            self.assertIn(name, spans)
+        self.assertEqual(spans["ingestion.publish"].attributes["version"], snapshot.version)
+        self.assertEqual(spans["parser.rule_based_extract"].attributes["clause_count"], 3)
+        self.assertEqual(spans["ingestion.broadcast_alert"].attributes["alert_count"], 1)
+        self.assertEqual(spans["ingestion.validate"].parent.span_id, spans["ingestion.city"].context.span_id)
+
+
+@override_settings(QUERY_METRICS_HEADERS=True)
+class QueryBudgetTest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.org = Organization.objects.create(name="Acme Hosts", slug="acme", plan="starter")
+        self.snapshot = _create_snapshot()
+        _create_snapshot("LA")
+        _create_snapshot("SF")
+        self.check_ids = [
+            self.client.post(
+                "/api/v1/address-checks",
+                data={"address": f"{index} Budget St", "city_code": "NYC", "context": {}},
+                format="json",
+                HTTP_X_ORG_SLUG="acme",
+            ).data["id"]
+            for index in range(3)
+        ]
+
+    def _scenarios(self):
+        csv_content = "address,city_code,is_primary_residence\n" + "".join(
+            f"{index} Main St,{city_code},{index % 2 == 0}\n" for index, city_code in enumerate(["NYC", "LA", "SF"] * 4)
+        )
+        webhook = {
+            "id": "evt_budget",
+            "type": "invoice.payment_failed",
+            "data": {"object": {"metadata": {"org_slug": "acme"}}},
+        }
+        return {
+            ("address-checks", "POST"): lambda: self.client.post(
+                "/api/v1/address-checks",
+                data={"address": "9 Budget St", "city_code": "NYC", "context": {}},
+                format="json",
+                HTTP_X_ORG_SLUG="acme",
+            ),
+            ("address-checks", "GET"): lambda: self.client.get("/api/v1/address-checks", {"org": "acme"}),
+            ("address-check-detail", "GET"): lambda: self.client.get(f"/api/v1/address-checks/{self.check_ids[0]}"),
+            # Twelve rows over three cities; the budget does not depend on either.
+            ("portfolio-import", "POST"): lambda: self.client.post(
+                "/api/v1/portfolio/import",
+                data={"file": _as_uploaded(csv_content, "portfolio.csv")},
+                HTTP_X_ORG_SLUG="acme",
+            ),
+            ("city-rules-latest", "GET"): lambda: self.client.get("/api/v1/cities/NYC/rules/latest"),
+            ("alerts-list", "GET"): lambda: self.client.get("/api/v1/alerts", {"org": "acme"}),
+            ("checkout-session", "POST"): lambda: self.client.post(
+                "/api/v1/billing/checkout-session", data={"plan": "pro"}, format="json", HTTP_X_ORG_SLUG="acme"
+            ),
+            ("billing-webhook", "POST"): lambda: self.client.post(
+                "/api/v1/billing/webhook", data=json.dumps(webhook), content_type="application/json"
+            ),
+            ("autonomy-status", "GET"): lambda: self.client.get("/api/v1/system/autonomy-status"),
+            ("supabase-status", "GET"): lambda: self.client.get("/api/v1/system/supabase-status"),
+            ("system-slo", "GET"): lambda: self.client.get("/api/v1/system/slo"),
+        }
+
+    def test_every_budget_has_a_scenario(self):
+        self.assertEqual(set(QUERY_BUDGETS), set(self._scenarios()))
+
+    def test_endpoints_stay_within_query_budget(self):
+        for key, scenario in self._scenarios().items():
+            with self.subTest(endpoint=key):
+                clause_cache.clear()  # budgets cover the cold-cache case
+                active_city_cache.clear()
+                response = scenario()
+                self.assertLess(response.status_code, 500)
+                self.assertLessEqual(int(response["X-DB-Query-Count"]), QUERY_BUDGETS[key])
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0.0, PROFILING_TOKEN="profile-secret")
+class ProfilingTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_token_request_is_profiled_and_downloadable(self):
+        self.assertFalse(self.client.get("/api/v1/system/slo").has_header("X-Profile-Id"))
+
+        response = self.client.get("/api/v1/system/slo", HTTP_X_PROFILE_TOKEN="profile-secret", HTTP_X_REQUEST_ID="req-1")
+        profile_id = response["X-Profile-Id"]
+        self.assertTrue(profile_id.startswith("req-1-"))
+        self.assertEqual(ProfileRecord.objects.get().label, "GET /api/v1/system/slo")
+
+        # Reusing a request id stores a second profile instead of replacing the first.
+        self.client.get("/api/v1/alerts", HTTP_X_PROFILE_TOKEN="profile-secret", HTTP_X_REQUEST_ID="req-1")
+        self.assertEqual(ProfileRecord.objects.filter(request_id=profile_id).get().label, "GET /api/v1/system/slo")
+
+        self.assertEqual(self.client.get("/api/v1/system/profiles").status_code, 401)
+        auth = {"HTTP_AUTHORIZATION": "Bearer profile-secret"}
+        listing = self.client.get("/api/v1/system/profiles", {"limit": 1}, **auth).json()
+        self.assertEqual(len(listing["results"]), 1)
+        self.assertIsNotNone(listing["next_cursor"])
+
+        download = self.client.get(f"/api/v1/system/profiles/{profile_id}", **auth)
+        self.assertEqual(download["Content-Type"], "application/octet-stream")
+        with TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "req-1.prof")
+            with open(path, "wb") as handle:
+                handle.write(download.content)
+            self.assertGreater(pstats.Stats(path).total_calls, 0)
+
+        text = self.client.get(f"/api/v1/system/profiles/{profile_id}", {"view": "text"}, **auth)
+        self.assertIn("cumulative", text.content.decode())
 
-        return SimpleUploadedFile(name, content.encode("utf-8"), content_type="text/csv")
+    def test_profile_command_wraps_management_command(self):
+        out = StringIO()
+        call_command("profile_command", "check", stdout=out)
+        self.assertIn("profile_id=", out.getvalue())
+        self.assertEqual(ProfileRecord.objects.get().kind, "command")